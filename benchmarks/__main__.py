@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from benchmarks.suite import (
+    BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    collect_benchmarks,
+    find_regressions,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run SchemaGuard micro-benchmarks against stored baselines.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="Shrink synthetic schema sizes (e.g. 0.1)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown ratio")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    benchmarks = [b for b in collect_benchmarks(args.scale) if args.filter in b.name]
+    baseline = load_baseline(args.baseline) if args.scale == 1.0 else {}
+
+    measurements = []
+    for benchmark in benchmarks:
+        measurement = measure(benchmark, repeat=args.repeat)
+        measurements.append(measurement)
+        reference = baseline.get(measurement.name)
+        delta = f"{measurement.min_s / reference['min_s']:6.2f}x" if reference else "     new"
+        print(f"{measurement.name:40s} min {measurement.min_s * 1000:10.3f} ms  median {measurement.median_s * 1000:10.3f} ms  {delta}")
+
+    if args.json is not None:
+        args.json.write_text(json.dumps({m.name: m.as_dict() for m in measurements}, indent=2) + "\n", encoding="utf-8")
+
+    if args.save_baseline:
+        save_baseline(measurements, args.scale, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(measurements, baseline, args.threshold)
+    for measurement, ratio in regressions:
+        print(f"REGRESSION {measurement.name}: {ratio:.2f}x baseline (threshold {1 + args.threshold:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
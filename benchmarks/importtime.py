@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# Cold-start profile of SchemaGuard entry points via `python -X importtime`, each import in
+# a fresh interpreter. The core (engine, rules, reporter, loader, CLI) must stay stdlib-only.
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("fastapi", "starlette", "pydantic", "fastavro", "uvicorn", "multipart", "jinja2")
+# Cumulative microseconds for the best of several runs; generous so slow CI hosts pass, tight
+# enough that pulling the web stack (~0.5 s) back into the core fails.
+IMPORT_BUDGETS_US = {
+    "schemaguard": 200_000,
+    "schemaguard.compatibility_engine": 200_000,
+    "schemaguard.cli": 200_000,
+    "schemaguard.schema_loader": 200_000,
+    "schemaguard.service": 200_000,
+}
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_us: int
+    modules: dict[str, tuple[int, int]]
+
+    def heavy_imports(self) -> list[str]:
+        return sorted({name for name in self.modules if name.split(".")[0] in HEAVY_MODULES})
+
+    def slowest(self, limit: int) -> list[tuple[str, int]]:
+        ranked = sorted(((name, self_us) for name, (self_us, _) in self.modules.items()), key=lambda item: -item[1])
+        return ranked[:limit]
+
+
+def parse_importtime(stderr: str, module: str) -> ImportProfile:
+    modules: dict[str, tuple[int, int]] = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        stripped = name.strip()
+        modules[stripped] = (int(self_us), int(cumulative_us))
+        if stripped == module and not name.startswith("  "):
+            total = int(cumulative_us)
+    return ImportProfile(module, total, modules)
+
+
+def measure_import(module: str, *, runs: int = 3) -> ImportProfile:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    best: ImportProfile | None = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        profile = parse_importtime(completed.stderr, module)
+        if best is None or profile.total_us < best.total_us:
+            best = profile
+    assert best is not None
+    return best
+
+
+def check_budget(profile: ImportProfile, budget_us: int) -> list[str]:
+    problems = []
+    if profile.total_us > budget_us:
+        problems.append(f"{profile.module}: {profile.total_us} us exceeds budget of {budget_us} us")
+    heavy = profile.heavy_imports()
+    if heavy:
+        problems.append(f"{profile.module}: imports {', '.join(heavy)}")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure SchemaGuard cold import time against budgets.")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_US), help="Modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules (self time) to list")
+    parser.add_argument("--json", action="store_true", help="Print a JSON report")
+    args = parser.parse_args(argv)
+
+    report = []
+    problems: list[str] = []
+    for module in args.modules:
+        profile = measure_import(module, runs=args.runs)
+        budget = IMPORT_BUDGETS_US.get(module)
+        if budget is not None:
+            problems.extend(check_budget(profile, budget))
+        report.append(
+            {
+                "module": module,
+                "total_ms": round(profile.total_us / 1000, 3),
+                "budget_ms": round(budget / 1000, 3) if budget is not None else None,
+                "heavy_imports": profile.heavy_imports(),
+                "slowest": [{"module": name, "self_ms": round(us / 1000, 3)} for name, us in profile.slowest(args.top)],
+            }
+        )
+
+    if args.json:
+        sys.stdout.write(json.dumps({"imports": report, "problems": problems}, indent=2) + "\n")
+    else:
+        for entry in report:
+            budget = f" / {entry['budget_ms']:.1f} ms" if entry["budget_ms"] is not None else ""
+            print(f"{entry['module']:<40} {entry['total_ms']:>8.1f} ms{budget}")
+            for slow in entry["slowest"]:
+                print(f"    {slow['module']:<36} {slow['self_ms']:>8.1f} ms")
+        for problem in problems:
+            print(f"OVER BUDGET {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
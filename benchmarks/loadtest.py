@@ -0,0 +1,531 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from benchmarks.suite import scaled_sizes
+from benchmarks.synthetic import CASES, schema_pair
+
+
+# Drives POST /compare against a local SchemaGuard server and reports throughput,
+# latency percentiles, error rates and server CPU/RSS as JSON.
+
+REPORT_VERSION = 1
+STARTUP_TIMEOUT_SECONDS = 30.0
+# Request body formats: multipart uploads to /compare, inline JSON to /compare/json (optionally gzipped).
+BODY_FORMATS = ("multipart", "json", "json-gzip")
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    name: str
+    body: bytes
+    content_type: str
+    path: str = "/compare"
+    content_encoding: str | None = None
+    body_format: str = "multipart"
+
+
+@dataclass
+class CaseStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+def encode_multipart(old_schema: Any, new_schema: Any, mode: str) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts: list[bytes] = []
+    for field_name, schema in (("old_schema_file", old_schema), ("new_schema_file", new_schema)):
+        parts.append(
+            (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field_name}"; filename="{field_name}.avsc"\r\n'
+                "Content-Type: application/json\r\n\r\n"
+            ).encode("utf-8")
+            + json.dumps(schema).encode("utf-8")
+            + b"\r\n"
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="mode"\r\n\r\n{mode}\r\n--{boundary}--\r\n'.encode("utf-8")
+    )
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def encode_json_body(old_schema: Any, new_schema: Any, mode: str, *, compressed: bool = False) -> bytes:
+    body = json.dumps({"oldSchema": old_schema, "newSchema": new_schema, "mode": mode}).encode("utf-8")
+    return gzip.compress(body, mtime=0) if compressed else body
+
+
+def build_templates(
+    name: str,
+    old_schema: Any,
+    new_schema: Any,
+    mode: str,
+    body_formats: tuple[str, ...],
+) -> list[RequestTemplate]:
+    templates: list[RequestTemplate] = []
+    for body_format in body_formats:
+        # Case names stay "<case>/<mode>" unless several body formats are being compared.
+        label = name if len(body_formats) == 1 else f"{name}/{body_format}"
+        if body_format == "multipart":
+            body, content_type = encode_multipart(old_schema, new_schema, mode)
+            templates.append(RequestTemplate(label, body, content_type))
+        elif body_format in ("json", "json-gzip"):
+            compressed = body_format == "json-gzip"
+            templates.append(
+                RequestTemplate(
+                    label,
+                    encode_json_body(old_schema, new_schema, mode, compressed=compressed),
+                    "application/json",
+                    path="/compare/json",
+                    content_encoding="gzip" if compressed else None,
+                    body_format=body_format,
+                )
+            )
+        else:
+            raise SystemExit(f"Unknown body format {body_format!r}; choose from {', '.join(BODY_FORMATS)}")
+    return templates
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    mix: list[tuple[str, int]] = []
+    for entry in spec.split(","):
+        name, _, weight = entry.strip().partition(":")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def synthetic_templates(
+    mix: list[tuple[str, int]],
+    modes: list[str],
+    scale: float,
+    body_formats: tuple[str, ...] = ("multipart",),
+) -> list[tuple[RequestTemplate, int]]:
+    templates: list[tuple[RequestTemplate, int]] = []
+    for case, weight in mix:
+        if case not in CASES:
+            raise SystemExit(f"Unknown synthetic case {case!r}; choose from {', '.join(CASES)}")
+        old_schema, new_schema = schema_pair(case, variant=1, **scaled_sizes(case, scale))
+        for mode in modes:
+            for template in build_templates(f"{case}/{mode}", old_schema, new_schema, mode, body_formats):
+                templates.append((template, weight))
+    return templates
+
+
+def corpus_templates(
+    corpus: Path,
+    modes: list[str],
+    body_formats: tuple[str, ...] = ("multipart",),
+) -> list[tuple[RequestTemplate, int]]:
+    # Consecutive files in sorted order form (old, new) pairs, e.g. v1.avsc -> v2.avsc -> v3.avsc.
+    files = sorted(p for p in corpus.iterdir() if p.suffix in {".avsc", ".json"})
+    schemas = [json.loads(p.read_text(encoding="utf-8")) for p in files]
+    templates: list[tuple[RequestTemplate, int]] = []
+    for (old_path, old_schema), (new_path, new_schema) in zip(zip(files, schemas), zip(files[1:], schemas[1:])):
+        for mode in modes:
+            name = f"{old_path.stem}->{new_path.stem}/{mode}"
+            for template in build_templates(name, old_schema, new_schema, mode, body_formats):
+                templates.append((template, 1))
+    if not templates:
+        raise SystemExit(f"Corpus {corpus} needs at least two .avsc/.json files")
+    return templates
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def latency_summary(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+    }
+
+
+class ProcessSampler:
+    # CPU and RSS for a server process and its workers, read from /proc; falls back to
+    # getrusage for the current process when /proc is unavailable.
+
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def _pids(self) -> list[int]:
+        pids = [self.pid]
+        proc = Path("/proc")
+        if not proc.exists():
+            return pids
+        for entry in proc.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                stat = (entry / "stat").read_text()
+            except OSError:
+                continue
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            if ppid == self.pid:
+                pids.append(int(entry.name))
+        return pids
+
+    def cpu_seconds(self) -> float:
+        if not Path("/proc").exists():
+            import resource
+
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            return usage.ru_utime + usage.ru_stime
+        ticks = os.sysconf("SC_CLK_TCK")
+        total = 0.0
+        for pid in self._pids():
+            try:
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            total += (int(fields[11]) + int(fields[12])) / ticks
+        return total
+
+    def memory(self) -> dict[str, int]:
+        rss = 0
+        peak = 0
+        for pid in self._pids():
+            try:
+                status = Path(f"/proc/{pid}/status").read_text()
+            except OSError:
+                continue
+            for line in status.splitlines():
+                if line.startswith("VmRSS:"):
+                    rss += int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak += int(line.split()[1]) * 1024
+        return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(host: str, port: int) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/metrics")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit(f"SchemaGuard did not start on {host}:{port}")
+
+
+class InProcessServer:
+    def __init__(self) -> None:
+        import uvicorn
+
+        self.host = "127.0.0.1"
+        self.port = _free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config("schemaguard.main:app", host=self.host, port=self.port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.pid = os.getpid()
+
+    def __enter__(self) -> InProcessServer:
+        self.thread.start()
+        _wait_until_ready(self.host, self.port)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class SubprocessServer:
+    def __init__(self, workers: int) -> None:
+        self.host = "127.0.0.1"
+        self.port = _free_port()
+        # run.py, not bare uvicorn, so multi-worker runs get the shared cache tier.
+        self.command = [
+            sys.executable,
+            "run.py",
+            "--host",
+            self.host,
+            "--port",
+            str(self.port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ]
+        self.process: subprocess.Popen | None = None
+        self.pid = 0
+
+    def __enter__(self) -> SubprocessServer:
+        root = Path(__file__).resolve().parents[1]
+        self.process = subprocess.Popen(self.command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.pid = self.process.pid
+        _wait_until_ready(self.host, self.port)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        assert self.process is not None
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ExternalServer:
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.pid = 0
+
+    def __enter__(self) -> ExternalServer:
+        _wait_until_ready(self.host, self.port)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+def run_load(
+    host: str,
+    port: int,
+    templates: list[tuple[RequestTemplate, int]],
+    *,
+    concurrency: int,
+    duration: float | None,
+    total_requests: int | None,
+    seed: int = 0,
+) -> tuple[dict[str, CaseStats], float]:
+    stats: dict[str, CaseStats] = {template.name: CaseStats() for template, _ in templates}
+    lock = threading.Lock()
+    population = [template for template, _ in templates]
+    weights = [weight for _, weight in templates]
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def next_slot() -> bool:
+        nonlocal issued
+        with lock:
+            if total_requests is not None and issued >= total_requests:
+                return False
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            issued += 1
+            return True
+
+    def worker(worker_index: int) -> None:
+        rng = random.Random(seed + worker_index)
+        connection = http.client.HTTPConnection(host, port, timeout=300)
+        while next_slot():
+            template = rng.choices(population, weights)[0]
+            begin = time.perf_counter()
+            status = "exception"
+            headers = {"Content-Type": template.content_type}
+            if template.content_encoding:
+                headers["Content-Encoding"] = template.content_encoding
+            try:
+                connection.request("POST", template.path, body=template.body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=300)
+            elapsed = time.perf_counter() - begin
+            with lock:
+                case = stats[template.name]
+                case.latencies.append(elapsed)
+                case.statuses[status] = case.statuses.get(status, 0) + 1
+                # Incompatible reports are still 200s; any other status is an error.
+                if status != "200":
+                    case.errors += 1
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+
+def summarize_run(stats: dict[str, CaseStats], elapsed: float) -> dict[str, Any]:
+    latencies = [latency for case in stats.values() for latency in case.latencies]
+    return {
+        "requests": len(latencies),
+        "errors": sum(case.errors for case in stats.values()),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+def build_report(
+    stats: dict[str, CaseStats],
+    elapsed: float,
+    *,
+    config: dict[str, Any],
+    cpu_seconds: float | None,
+    memory: dict[str, int] | None,
+) -> dict[str, Any]:
+    all_latencies = [latency for case in stats.values() for latency in case.latencies]
+    total = len(all_latencies)
+    errors = sum(case.errors for case in stats.values())
+    report: dict[str, Any] = {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "config": config,
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 6) if total else 0.0,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 3) if elapsed else 0.0,
+        "latency": latency_summary(all_latencies),
+        "cases": {
+            name: {
+                "requests": len(case.latencies),
+                "errors": case.errors,
+                "statuses": case.statuses,
+                "latency": latency_summary(case.latencies),
+            }
+            for name, case in stats.items()
+        },
+    }
+    if cpu_seconds is not None:
+        report["server"] = {
+            # In-process runs share the interpreter with the load generator.
+            "includes_client": config.get("target") == "in-process",
+            "cpu_seconds": round(cpu_seconds, 3),
+            "cpu_utilization": round(cpu_seconds / elapsed, 3) if elapsed else 0.0,
+            **(memory or {}),
+        }
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test SchemaGuard POST /compare.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--in-process", action="store_true", help="Serve the app from a thread in this process (default)")
+    target.add_argument("--subprocess", action="store_true", help="Start run.py as a child process")
+    target.add_argument("--url", default=None, help="Drive an already running server instead")
+    parser.add_argument("--workers", type=int, default=1, help="Server workers for --subprocess")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Run time in seconds")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead")
+    parser.add_argument(
+        "--mix",
+        default="wide_record:1,recursive_types:4",
+        help="Weighted synthetic cases, e.g. wide_record:3,large_union:1",
+    )
+    parser.add_argument("--modes", default="backward", help="Comma separated compatibility modes to mix")
+    parser.add_argument("--scale", type=float, default=0.1, help="Synthetic schema size scale")
+    parser.add_argument(
+        "--bodies",
+        default="multipart",
+        help=f"Comma separated request body formats to compare ({', '.join(BODY_FORMATS)})",
+    )
+    parser.add_argument("--corpus", type=Path, default=None, help="Directory of schema versions to replay instead")
+    parser.add_argument("--seed", type=int, default=0, help="Request mix RNG seed")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report here instead of stdout")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    body_formats = tuple(body.strip() for body in args.bodies.split(",") if body.strip())
+    if args.corpus is not None:
+        templates = corpus_templates(args.corpus, modes, body_formats)
+    else:
+        templates = synthetic_templates(parse_mix(args.mix), modes, args.scale, body_formats)
+
+    if args.url:
+        server: Any = ExternalServer(args.url)
+        target = "external"
+    elif args.subprocess:
+        server = SubprocessServer(args.workers)
+        target = "subprocess"
+    else:
+        server = InProcessServer()
+        target = "in-process"
+
+    with server:
+        sampler = ProcessSampler(server.pid) if server.pid else None
+        cpu_before = sampler.cpu_seconds() if sampler else None
+        # Body formats run back to back, each with the full budget, so their throughput is comparable.
+        stats: dict[str, CaseStats] = {}
+        elapsed = 0.0
+        format_runs: dict[str, tuple[dict[str, CaseStats], float]] = {}
+        for body_format in body_formats:
+            format_stats, format_elapsed = run_load(
+                server.host,
+                server.port,
+                [(template, weight) for template, weight in templates if template.body_format == body_format],
+                concurrency=args.concurrency,
+                duration=None if args.requests else args.duration,
+                total_requests=args.requests,
+                seed=args.seed,
+            )
+            format_runs[body_format] = (format_stats, format_elapsed)
+            stats.update(format_stats)
+            elapsed += format_elapsed
+        cpu_seconds = sampler.cpu_seconds() - cpu_before if sampler and cpu_before is not None else None
+        memory = sampler.memory() if sampler else None
+
+    config = {
+        "target": target,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration if not args.requests else None,
+        "requests": args.requests,
+        "modes": modes,
+        "mix": args.mix if args.corpus is None else None,
+        "corpus": str(args.corpus) if args.corpus else None,
+        "scale": args.scale,
+        "bodies": list(body_formats),
+    }
+    report = build_report(stats, elapsed, config=config, cpu_seconds=cpu_seconds, memory=memory)
+    if len(format_runs) > 1:
+        report["body_formats"] = {
+            body_format: summarize_run(format_stats, format_elapsed)
+            for body_format, (format_stats, format_elapsed) in format_runs.items()
+        }
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output is not None:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+from benchmarks.synthetic import shared_type_fleet
+from schemaguard.compatibility_engine import CompatibilityEngine, SchemaRegistry
+from schemaguard.type_pool import NamedTypePool
+
+
+# Retained memory of a schema fleet compiled with and without the named-type pool. Every
+# subject is parsed from its own JSON text, as uploads are, so nothing is shared by accident;
+# the pool's own entries count towards the pooled figure.
+
+
+@dataclass
+class FleetMeasurement:
+    pooled: bool
+    subjects: int
+    retained_bytes: int
+    compile_s: float
+    compare_s: float
+    issues: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pooled": self.pooled,
+            "subjects": self.subjects,
+            "retained_bytes": self.retained_bytes,
+            "bytes_per_schema": self.retained_bytes // max(1, 2 * self.subjects),
+            "compile_ms": round(self.compile_s * 1000, 3),
+            "compare_ms": round(self.compare_s * 1000, 3),
+            "issues": self.issues,
+        }
+
+
+def _compile(texts: list[str], pool: NamedTypePool | None) -> list[SchemaRegistry]:
+    registries = []
+    for text in texts:
+        schema = json.loads(text)
+        if pool is not None:
+            schema = pool.intern(schema)
+        registries.append(SchemaRegistry(schema, pool=pool))
+    return registries
+
+
+def measure_fleet(subjects: int = 200, *, pooled: bool, variant: int = 2) -> FleetMeasurement:
+    old_texts = [json.dumps(schema) for schema in shared_type_fleet(subjects, variant=0)]
+    new_texts = [json.dumps(schema) for schema in shared_type_fleet(subjects, variant=variant)]
+    # Tracing slows allocation several-fold, so compile time comes from an untraced pass.
+    pool = NamedTypePool() if pooled else None
+    started = time.perf_counter()
+    old_registries = _compile(old_texts, pool)
+    new_registries = _compile(new_texts, pool)
+    compile_s = time.perf_counter() - started
+
+    pool = NamedTypePool() if pooled else None
+    del old_registries, new_registries
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        old_registries = _compile(old_texts, pool)
+        new_registries = _compile(new_texts, pool)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    issues = 0
+    started = time.perf_counter()
+    for old_registry, new_registry in zip(old_registries, new_registries):
+        engine = CompatibilityEngine(None, None, "backward", writer_registry=old_registry, reader_registry=new_registry)
+        issues += len(engine.run())
+    compare_s = time.perf_counter() - started
+    return FleetMeasurement(pooled, subjects, retained, compile_s, compare_s, issues)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare retained memory of cached schemas with and without the type pool."
+    )
+    parser.add_argument("--subjects", type=int, default=200, help="Subjects in the synthetic fleet (two versions each)")
+    parser.add_argument("--variant", type=int, default=2, choices=(1, 2), help="1: compatible revision, 2: breaking")
+    parser.add_argument("--json", action="store_true", help="Print a JSON report")
+    args = parser.parse_args(argv)
+
+    plain = measure_fleet(args.subjects, pooled=False, variant=args.variant)
+    pooled = measure_fleet(args.subjects, pooled=True, variant=args.variant)
+    if plain.issues != pooled.issues:
+        print(f"MISMATCH pooled run reported {pooled.issues} issues, plain run {plain.issues}", file=sys.stderr)
+        return 1
+    reduction = 1 - pooled.retained_bytes / plain.retained_bytes
+
+    if args.json:
+        report = {"plain": plain.as_dict(), "pooled": pooled.as_dict(), "reduction": round(reduction, 4)}
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    else:
+        for measurement in (plain, pooled):
+            entry = measurement.as_dict()
+            label = "pooled" if measurement.pooled else "plain"
+            print(
+                f"{label:<8} {entry['bytes_per_schema']:>8} B/schema  compile {entry['compile_ms']:>9.1f} ms"
+                f"  compare {entry['compare_ms']:>9.1f} ms  ({entry['issues']} issues)"
+            )
+        print(f"retained memory per cached schema down {reduction:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.synthetic import CASES, schema_pair
+from schemaguard.compatibility_engine import SchemaRegistry, check_compatibility
+from schemaguard.reporter import build_report
+from schemaguard.schema_loader import validate_avro_schema
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+MIN_SAMPLE_SECONDS = 0.05
+
+# Full-size parameters per case; --scale shrinks them for quick local runs.
+CASE_SIZES: dict[str, dict[str, int]] = {
+    "wide_record": {"fields": 10_000},
+    "deep_record": {"depth": 500},
+    "large_union": {"branches": 500},
+    "huge_enum": {"symbols": 50_000},
+    "aliased_namespaces": {"types": 1_000},
+    "recursive_types": {"width": 50},
+}
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    run: Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Measurement:
+    name: str
+    min_s: float
+    median_s: float
+    loops: int
+
+    def as_dict(self) -> dict:
+        return {"min_s": self.min_s, "median_s": self.median_s, "loops": self.loops}
+
+
+def scaled_sizes(case: str, scale: float) -> dict[str, int]:
+    return {key: max(2, int(value * scale)) for key, value in CASE_SIZES[case].items()}
+
+
+def collect_benchmarks(scale: float = 1.0) -> list[Benchmark]:
+    benchmarks: list[Benchmark] = []
+    for case in CASES:
+        sizes = scaled_sizes(case, scale)
+        old_schema, new_schema = schema_pair(case, variant=1, **sizes)
+        _, broken_schema = schema_pair(case, variant=2, **sizes)
+        broken_errors = check_compatibility(old_schema, broken_schema, "full")
+
+        benchmarks.append(Benchmark(f"registry/{case}", lambda s=old_schema: SchemaRegistry(s)))
+        for mode in ("backward", "forward", "full"):
+            benchmarks.append(
+                Benchmark(
+                    f"check_{mode}/{case}",
+                    lambda o=old_schema, n=new_schema, m=mode: check_compatibility(o, n, m),
+                )
+            )
+        benchmarks.append(Benchmark(f"validate/{case}", lambda s=old_schema: validate_avro_schema(s, "Bench")))
+        benchmarks.append(
+            Benchmark(f"report/{case}", lambda e=broken_errors: json.dumps(build_report(e)).encode("utf-8"))
+        )
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int = 5) -> Measurement:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            benchmark.run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or loops >= 1_000_000:
+            break
+        loops *= 10
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            benchmark.run()
+        samples.append((time.perf_counter() - start) / loops)
+    return Measurement(benchmark.name, min(samples), statistics.median(samples), loops)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def save_baseline(measurements: list[Measurement], scale: float, path: Path = BASELINE_PATH) -> None:
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "results": {m.name: m.as_dict() for m in measurements},
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def find_regressions(
+    measurements: list[Measurement],
+    baseline: dict[str, dict],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[tuple[Measurement, float]]:
+    regressions: list[tuple[Measurement, float]] = []
+    for measurement in measurements:
+        reference = baseline.get(measurement.name)
+        if not reference:
+            continue
+        ratio = measurement.min_s / reference["min_s"]
+        if ratio > 1 + threshold:
+            regressions.append((measurement, ratio))
+    return regressions
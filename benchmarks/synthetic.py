@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Callable
+
+
+# Deterministic synthetic Avro schemas for benchmarks and load tests.
+# Every generator takes ``variant``: 0 is the baseline schema, 1 an evolved,
+# backward-compatible revision (promotions, defaulted additions), 2 a revision that
+# breaks many fields so that report building has something to serialize.
+
+FIELD_TYPES = ("int", "long", "float", "double", "string", "bytes", "boolean")
+PROMOTED = {"int": "long", "long": "double", "float": "double", "string": "bytes", "bytes": "string"}
+BROKEN = {"int": "string", "long": "int", "float": "int", "double": "float", "string": "int", "bytes": "int", "boolean": "int"}
+
+
+def _revise(field_type: str, index: int, variant: int) -> str:
+    if variant == 1 and index % 10 == 0:
+        return PROMOTED.get(field_type, field_type)
+    if variant == 2 and index % 2 == 0:
+        return BROKEN[field_type]
+    return field_type
+
+
+def _added_fields(variant: int, count: int = 3) -> list[dict[str, Any]]:
+    if variant != 1:
+        return []
+    return [{"name": f"added_{index}", "type": ["null", "string"], "default": None} for index in range(count)]
+
+
+def wide_record(fields: int = 10_000, variant: int = 0, seed: int = 0) -> dict[str, Any]:
+    rng = random.Random(seed)
+    types = [rng.choice(FIELD_TYPES) for _ in range(fields)]
+    return {
+        "type": "record",
+        "name": "WideRecord",
+        "namespace": "bench.wide",
+        "fields": [{"name": f"f{index}", "type": _revise(t, index, variant)} for index, t in enumerate(types)]
+        + _added_fields(variant),
+    }
+
+
+def deep_record(depth: int = 500, variant: int = 0) -> dict[str, Any]:
+    leaf_type = {0: "int", 1: "long", 2: "string"}[variant]
+    node: dict[str, Any] = {
+        "type": "record",
+        "name": f"Level{depth}",
+        "fields": [{"name": "value", "type": leaf_type}],
+    }
+    for level in range(depth - 1, -1, -1):
+        node = {
+            "type": "record",
+            "name": f"Level{level}",
+            "fields": [{"name": "id", "type": "long"}, {"name": "child", "type": node}],
+        }
+    node["namespace"] = "bench.deep"
+    return node
+
+
+def large_union(branches: int = 500, variant: int = 0) -> dict[str, Any]:
+    members: list[Any] = ["null"]
+    for index in range(branches):
+        members.append(
+            {
+                "type": "record",
+                "name": f"Branch{index}",
+                "fields": [{"name": "payload", "type": _revise("int", index, variant)}],
+            }
+        )
+    if variant == 1:
+        # Reordered reader branches force real scans instead of first-branch hits.
+        members = [members[0]] + list(reversed(members[1:]))
+    return {
+        "type": "record",
+        "name": "UnionHolder",
+        "namespace": "bench.union",
+        "fields": [{"name": "choice", "type": members, "default": None}],
+    }
+
+
+def huge_enum(symbols: int = 50_000, variant: int = 0) -> dict[str, Any]:
+    names = [f"S{index}" for index in range(symbols)]
+    if variant == 1:
+        names.extend(f"X{index}" for index in range(10))
+    elif variant == 2:
+        names = names[::2]
+    return {
+        "type": "record",
+        "name": "EnumHolder",
+        "namespace": "bench.enum",
+        "fields": [{"name": "status", "type": {"type": "enum", "name": "Status", "symbols": names}}],
+    }
+
+
+def aliased_namespaces(types: int = 1_000, variant: int = 0) -> dict[str, Any]:
+    # Each named type lives in its own namespace; the evolved revision renames
+    # every type and keeps the old full name as an alias, so resolution goes
+    # through alias tables rather than direct name matches.
+    fields: list[dict[str, Any]] = []
+    for index in range(types):
+        namespace = f"bench.ns{index % 50}.sub{index}"
+        name = f"Type{index}" if variant == 0 else f"RenamedType{index}"
+        definition: dict[str, Any] = {
+            "type": "record",
+            "name": name,
+            "namespace": namespace,
+            "fields": [{"name": "value", "type": _revise("int", index, variant)}],
+        }
+        if variant:
+            definition["aliases"] = [f"{namespace}.Type{index}", f"Legacy{index}"]
+        fields.append({"name": f"t{index}", "type": definition})
+        fields.append({"name": f"t{index}_ref", "type": ["null", f"{namespace}.{name}"], "default": None})
+    return {"type": "record", "name": "AliasHolder", "namespace": "bench.alias", "fields": fields}
+
+
+def recursive_types(width: int = 50, variant: int = 0) -> dict[str, Any]:
+    # A tree of mutually recursive records: Node -> [Node], Node -> Edge -> Node.
+    node_fields: list[dict[str, Any]] = [
+        {"name": f"attr{index}", "type": _revise("int", index, variant)} for index in range(width)
+    ]
+    node_fields.append({"name": "children", "type": {"type": "array", "items": "Node"}})
+    node_fields.append(
+        {
+            "name": "edge",
+            "type": [
+                "null",
+                {
+                    "type": "record",
+                    "name": "Edge",
+                    "fields": [{"name": "weight", "type": "double"}, {"name": "target", "type": ["null", "Node"], "default": None}],
+                },
+            ],
+            "default": None,
+        }
+    )
+    return {"type": "record", "name": "Node", "namespace": "bench.recursive", "fields": node_fields}
+
+
+def _common_types(variant: int) -> dict[str, dict[str, Any]]:
+    money_fields: list[dict[str, Any]] = [
+        {"name": "units", "type": "long", "doc": "Whole units of the currency."},
+        {"name": "nanos", "type": "int", "doc": "Billionths of a unit."},
+        {"name": "currency", "type": "string", "doc": "ISO 4217 code."},
+    ]
+    if variant == 1:
+        money_fields.append({"name": "rounding", "type": ["null", "string"], "default": None})
+    elif variant == 2:
+        money_fields[0] = {"name": "units", "type": "int"}
+    address = {
+        "type": "record",
+        "name": "Address",
+        "namespace": "com.acme.common",
+        "doc": "Postal address shared by every customer-facing subject.",
+        "fields": [
+            {"name": name, "type": "string", "doc": f"Address {name.replace('_', ' ')}."}
+            for name in ("line1", "line2", "city", "region", "postal_code", "country")
+        ]
+        + [
+            {
+                "name": "kind",
+                "type": {"type": "enum", "name": "AddressKind", "symbols": ["HOME", "WORK", "BILLING", "SHIPPING"]},
+            }
+        ],
+    }
+    money = {"type": "record", "name": "Money", "namespace": "com.acme.common", "fields": money_fields}
+    envelope = {
+        "type": "record",
+        "name": "Envelope",
+        "namespace": "com.acme.common",
+        "fields": [
+            {"name": "event_id", "type": {"type": "fixed", "name": "EventId", "size": 16}},
+            {"name": "occurred_at", "type": {"type": "long", "logicalType": "timestamp-millis"}},
+            {"name": "source", "type": "string"},
+            {"name": "headers", "type": {"type": "map", "values": "string"}, "default": {}},
+        ],
+    }
+    return {"address": address, "money": money, "envelope": envelope}
+
+
+def shared_type_fleet(subjects: int = 200, variant: int = 0) -> list[dict[str, Any]]:
+    # Many subjects that embed the same common types verbatim, as generated code tends to
+    # produce; ``variant`` revises the common Money type the same way in every subject.
+    fleet = []
+    for index in range(subjects):
+        common = _common_types(variant)
+        fields: list[dict[str, Any]] = [{"name": "envelope", "type": common["envelope"]}]
+        fields.extend(
+            {"name": f"attr{index}_{position}", "type": _revise(field_type, position, variant)}
+            for position, field_type in enumerate(FIELD_TYPES)
+        )
+        fields.append({"name": "amount", "type": common["money"]})
+        fields.append({"name": "address", "type": ["null", common["address"]], "default": None})
+        fleet.append(
+            {"type": "record", "name": f"Subject{index}", "namespace": f"com.acme.s{index}", "fields": fields}
+        )
+    return fleet
+
+
+CASES: dict[str, Callable[..., Any]] = {
+    "wide_record": wide_record,
+    "deep_record": deep_record,
+    "large_union": large_union,
+    "huge_enum": huge_enum,
+    "aliased_namespaces": aliased_namespaces,
+    "recursive_types": recursive_types,
+}
+
+
+def schema_pair(case: str, *, variant: int = 1, **size: int) -> tuple[Any, Any]:
+    generate = CASES[case]
+    return generate(variant=0, **size), generate(variant=variant, **size)
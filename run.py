@@ -1,18 +1,110 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
+import os
 
 import uvicorn
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Run SchemaGuard development server.")
+    parser = argparse.ArgumentParser(description="Run the SchemaGuard server.")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind")
-    parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    parser.add_argument("--reload", action="store_true", help="Enable auto-reload (development, single worker)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default="auto", help="Event loop implementation")
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default="auto", help="HTTP/1.1 parser")
+    parser.add_argument(
+        "--timeout-graceful-shutdown",
+        type=int,
+        default=30,
+        help="Seconds in-flight requests get to finish on shutdown before connections are closed",
+    )
+    parser.add_argument("--timeout-keep-alive", type=int, default=5, help="Idle keep-alive connection timeout")
+    parser.add_argument("--limit-concurrency", type=int, default=None, help="Connections per worker before 503")
+    parser.add_argument("--limit-max-requests", type=int, default=None, help="Recycle a worker after this many requests")
+    parser.add_argument("--backlog", type=int, default=2048, help="Listen socket backlog")
+    parser.add_argument(
+        "--shared-cache",
+        default=None,
+        help="sqlite file shared by all workers for schema/verdict caching "
+        "(default with --workers > 1: a file in a private per-user 0700 directory; 'off' disables)",
+    )
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        help="Estimated bytes all in-flight /compare requests may hold per worker (default 512 MiB)",
+    )
+    parser.add_argument(
+        "--memory-queue-seconds",
+        type=float,
+        default=None,
+        help="How long a request waits for budget before getting 503 (default 5)",
+    )
+    parser.add_argument("--trace-memory", action="store_true", help="Report per-phase peak memory via tracemalloc")
+    parser.add_argument(
+        "--shard-workers",
+        type=int,
+        default=None,
+        help="Processes one very large comparison may be sharded across (default 0: never shard)",
+    )
+    parser.add_argument(
+        "--warm-from",
+        action="append",
+        metavar="PATH",
+        help="Snapshot, .avsc file or directory of .avsc files each worker loads before serving (repeatable)",
+    )
+    parser.add_argument("--snapshot-to", metavar="PATH", help="Write each worker's caches to this snapshot on shutdown")
     args = parser.parse_args()
+    if args.reload and args.workers > 1:
+        parser.error("--reload runs a single process; drop --workers")
+    for option, module in (("loop", "uvloop"), ("http", "httptools")):
+        if getattr(args, option) == module and importlib.util.find_spec(module) is None:
+            parser.error(f"--{option} {module} requires the {module} package (pip install {module})")
 
-    uvicorn.run("schemaguard.main:app", host=args.host, port=args.port, reload=args.reload)
+    # Settings travel through the environment so reload and worker processes see them too.
+    if args.memory_budget is not None:
+        os.environ["SCHEMAGUARD_MEMORY_BUDGET_BYTES"] = str(args.memory_budget)
+    if args.memory_queue_seconds is not None:
+        os.environ["SCHEMAGUARD_MEMORY_QUEUE_SECONDS"] = str(args.memory_queue_seconds)
+    if args.trace_memory:
+        os.environ["SCHEMAGUARD_TRACE_MEMORY"] = "1"
+    if args.warm_from:
+        os.environ["SCHEMAGUARD_WARM_FROM"] = os.pathsep.join(os.path.abspath(path) for path in args.warm_from)
+    if args.snapshot_to:
+        os.environ["SCHEMAGUARD_SNAPSHOT_TO"] = os.path.abspath(args.snapshot_to)
+    if args.shard_workers is not None:
+        os.environ["SCHEMAGUARD_SHARD_WORKERS"] = str(args.shard_workers)
+    shared_cache = args.shared_cache
+    if shared_cache is None and args.workers > 1:
+        # Imported here: a single in-process worker must read SCHEMAGUARD_SHARED_CACHE after it is set.
+        from schemaguard.shared_cache import default_cache_path
+
+        try:
+            shared_cache = default_cache_path(args.port)
+        except OSError as exc:
+            parser.error(f"no private directory for the shared cache ({exc}); pass --shared-cache PATH or off")
+    if shared_cache and shared_cache != "off":
+        os.environ["SCHEMAGUARD_SHARED_CACHE"] = shared_cache
+
+    uvicorn.run(
+        "schemaguard.main:app",
+        host=args.host,
+        port=args.port,
+        reload=args.reload,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.timeout_graceful_shutdown,
+        timeout_keep_alive=args.timeout_keep_alive,
+        limit_concurrency=args.limit_concurrency,
+        limit_max_requests=args.limit_max_requests,
+        backlog=args.backlog,
+        log_level=args.log_level,
+    )
 
 
 if __name__ == "__main__":
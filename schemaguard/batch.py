@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from schemaguard import shared_cache
+from schemaguard.cache import SCHEMA_CACHE, schema_fingerprint
+from schemaguard.compatibility_engine import SchemaRegistry
+from schemaguard.instrumentation import BATCH_PAIRS
+from schemaguard.reporter import CompatibilityIssue, build_report, issue
+from schemaguard.rules import normalize_mode
+from schemaguard.schema_loader import MAX_SCHEMA_BYTES, inline_schema_size_issue
+from schemaguard.service import cached_verdict, compare_compiled, compile_schema, install_schema
+
+
+# Many independent (old, new, mode) pairs in one request. Schemas are deduplicated by
+# fingerprint and compiled once per batch; pairs run on a bounded thread pool shared by
+# all batches, and results are yielded in completion order.
+
+BATCH_MAX_PAIRS = int(os.environ.get("SCHEMAGUARD_BATCH_MAX_PAIRS", "1000"))
+BATCH_WORKERS = int(os.environ.get("SCHEMAGUARD_BATCH_WORKERS", "4"))
+MAX_BATCH_BODY_BYTES = 16 * MAX_SCHEMA_BYTES
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class BatchPair:
+    index: int
+    id: Any
+    old: str | None = None  # fingerprint
+    new: str | None = None
+    mode: str | None = None
+    error: CompatibilityIssue | None = None
+
+
+@dataclass
+class BatchRequest:
+    pairs: list[BatchPair]
+    schemas: dict[str, Any] = field(default_factory=dict)  # fingerprint -> inline schema
+    labels: dict[str, str] = field(default_factory=dict)  # fingerprint -> label for validation issues
+
+
+@dataclass
+class BatchStats:
+    pairs: int = 0
+    schemas: int = 0
+    resolved: int = 0
+    cached: int = 0
+    compatible: int = 0
+    incompatible: int = 0
+    invalid: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pairs": self.pairs,
+            "uniqueSchemas": self.schemas,
+            "schemasResolved": self.resolved,
+            "cachedVerdicts": self.cached,
+            "compatible": self.compatible,
+            "incompatible": self.incompatible,
+            "invalid": self.invalid,
+            "seconds": round(time.perf_counter() - self.started, 4),
+            "limits": {"maxPairs": BATCH_MAX_PAIRS, "maxBodyBytes": MAX_BATCH_BODY_BYTES, "workers": BATCH_WORKERS},
+        }
+
+
+def batch_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, BATCH_WORKERS), thread_name_prefix="schemaguard-batch")
+        return _executor
+
+
+def _invalid(description: str, body: Any) -> tuple[None, list[CompatibilityIssue]]:
+    return None, [
+        issue(
+            path="request",
+            issue_type="INVALID_REQUEST_BODY",
+            writer_type=type(body).__name__,
+            reader_type='{"pairs": [{"old"|"oldSchema", "new"|"newSchema", "mode", "id"}], "schemas", "mode"}',
+            description=description,
+        )
+    ]
+
+
+def parse_batch_request(body: Any) -> tuple[BatchRequest | None, list[CompatibilityIssue]]:
+    if not isinstance(body, dict) or not isinstance(body.get("pairs"), list):
+        return _invalid("Batch request must be a JSON object with a pairs list.", body)
+    named = body.get("schemas", {})
+    if not isinstance(named, dict):
+        return _invalid("schemas must map schema IDs to schemas.", body)
+    if len(body["pairs"]) > BATCH_MAX_PAIRS:
+        return None, [
+            issue(
+                path="pairs",
+                issue_type="BATCH_TOO_LARGE",
+                writer_type=str(len(body["pairs"])),
+                reader_type=f"<= {BATCH_MAX_PAIRS} pairs",
+                description=(
+                    f"Batch has {len(body['pairs'])} pairs; split it into batches of at most {BATCH_MAX_PAIRS}."
+                ),
+            )
+        ]
+
+    request = BatchRequest(pairs=[])
+    named_fingerprints: dict[str, str] = {}
+    oversized: dict[str, CompatibilityIssue] = {}
+
+    def add(schema: Any, label: str) -> str:
+        fingerprint = schema_fingerprint(schema)
+        if fingerprint not in request.schemas and fingerprint not in oversized:
+            too_large = inline_schema_size_issue(schema, label)
+            if too_large is not None:
+                oversized[fingerprint] = too_large
+                return fingerprint
+        request.schemas.setdefault(fingerprint, schema)
+        request.labels.setdefault(fingerprint, label)
+        return fingerprint
+
+    def reference(entry: dict[str, Any], side: str, index: int) -> str | None:
+        if f"{side}Schema" in entry:
+            return add(entry[f"{side}Schema"], f"pairs[{index}].{side}Schema")
+        ref = entry.get(side)
+        if not isinstance(ref, str):
+            return None
+        if ref in named:
+            if ref not in named_fingerprints:
+                named_fingerprints[ref] = add(named[ref], ref)
+            return named_fingerprints[ref]
+        # Anything else is a fingerprint from an earlier response (X-*-Schema-Fingerprint).
+        return ref
+
+    default_mode = body.get("mode", "")
+    for index, entry in enumerate(body["pairs"]):
+        pair = BatchPair(index=index, id=entry.get("id") if isinstance(entry, dict) else None)
+        request.pairs.append(pair)
+        if not isinstance(entry, dict):
+            pair.error = _invalid("Each pair must be a JSON object.", entry)[1][0]
+            continue
+        pair.old = reference(entry, "old", index)
+        pair.new = reference(entry, "new", index)
+        if pair.old is None or pair.new is None:
+            pair.error = _invalid('Each pair needs "old" or "oldSchema" and "new" or "newSchema".', entry)[1][0]
+            continue
+        if pair.old in oversized or pair.new in oversized:
+            pair.error = oversized.get(pair.old) or oversized[pair.new]
+            continue
+        mode = entry.get("mode", default_mode)
+        try:
+            pair.mode = normalize_mode(mode if isinstance(mode, str) else "")
+        except ValueError as exc:
+            pair.error = issue(
+                path=f"pairs[{index}].mode",
+                issue_type="INVALID_MODE",
+                writer_type=str(mode),
+                reader_type="backward|forward|full",
+                description=str(exc),
+            )
+    return request, []
+
+
+def _compile(request: BatchRequest, fingerprint: str) -> tuple[SchemaRegistry | None, list[CompatibilityIssue]]:
+    schema = request.schemas.get(fingerprint)
+    if schema is not None:
+        return compile_schema(schema, request.labels[fingerprint], fingerprint)
+    registry = SCHEMA_CACHE.get(fingerprint)
+    if registry is not None:
+        return registry, []
+    shared = shared_cache.SHARED_CACHE
+    known = shared.get_schema(fingerprint) if shared is not None else None
+    if known is not None:
+        return install_schema(fingerprint, known), []
+    return None, [
+        issue(
+            path="schema",
+            issue_type="UNKNOWN_SCHEMA_ID",
+            writer_type=fingerprint,
+            reader_type="schemas key or known fingerprint",
+            description="Not a key of schemas and not the fingerprint of a schema this service has compiled.",
+        )
+    ]
+
+
+def _result(pair: BatchPair, status: int, errors: list[CompatibilityIssue], started: float) -> dict[str, Any]:
+    result: dict[str, Any] = {"index": pair.index, "id": pair.id, "status": status, "mode": pair.mode}
+    if pair.old is not None and pair.new is not None:
+        result["oldFingerprint"] = pair.old
+        result["newFingerprint"] = pair.new
+    result.update(build_report(errors))
+    result["ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+async def run_batch(request: BatchRequest, stats: BatchStats) -> AsyncIterator[dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    executor = batch_executor()
+    compiled: dict[str, asyncio.Future] = {}
+    stats.pairs = len(request.pairs)
+    stats.schemas = len(request.schemas)
+
+    def compile_once(fingerprint: str) -> asyncio.Future:
+        # Futures are created on the event loop thread only, so each schema compiles once.
+        if fingerprint not in compiled:
+            compiled[fingerprint] = loop.run_in_executor(executor, _compile, request, fingerprint)
+        return compiled[fingerprint]
+
+    async def run(pair: BatchPair) -> dict[str, Any]:
+        started = time.perf_counter()
+        if pair.error is not None:
+            return _result(pair, 413 if pair.error.issueType == "FILE_TOO_LARGE" else 400, [pair.error], started)
+        cached = cached_verdict(pair.old, pair.new, pair.mode)
+        if cached is not None:
+            stats.cached += 1
+            return _result(pair, 200, cached, started)
+        (old_registry, old_errors), (new_registry, new_errors) = await asyncio.gather(
+            compile_once(pair.old), compile_once(pair.new)
+        )
+        if old_errors or new_errors:
+            errors = old_errors + new_errors
+            status = 404 if any(err.issueType == "UNKNOWN_SCHEMA_ID" for err in errors) else 400
+            return _result(pair, status, errors, started)
+        errors = await loop.run_in_executor(
+            executor,
+            lambda: compare_compiled(
+                old_registry, new_registry, old_fingerprint=pair.old, new_fingerprint=pair.new, mode=pair.mode
+            ),
+        )
+        return _result(pair, 200, errors, started)
+
+    tasks = [asyncio.ensure_future(run(pair)) for pair in request.pairs]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            if result["status"] != 200:
+                outcome = "invalid"
+                stats.invalid += 1
+            elif result["compatible"]:
+                outcome = "compatible"
+                stats.compatible += 1
+            else:
+                outcome = "incompatible"
+                stats.incompatible += 1
+            BATCH_PAIRS.inc(outcome=outcome)
+            yield result
+    finally:
+        # A client that disconnects mid-stream should not leave queued comparisons behind.
+        for task in tasks:
+            task.cancel()
+        stats.resolved = len(compiled)
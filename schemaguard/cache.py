@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+from schemaguard.instrumentation import record_cache_lookups
+
+
+# Bump when rule changes alter reports, so cached verdicts and client ETags go stale.
+VERDICT_VERSION = "1"
+
+SCHEMA_CACHE_SIZE = int(os.environ.get("SCHEMAGUARD_SCHEMA_CACHE_SIZE", "256"))
+VERDICT_CACHE_SIZE = int(os.environ.get("SCHEMAGUARD_VERDICT_CACHE_SIZE", "4096"))
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def schema_fingerprint(schema: Any) -> str:
+    # SHA-256 of canonical JSON. Avro's Parsing Canonical Form would drop defaults,
+    # aliases and logical types, all of which change compatibility verdicts. ASCII escapes keep
+    # lone surrogates (valid in JSON text, not in UTF-8) hashable.
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+    return hashlib.sha256(canonical.encode("ascii")).hexdigest()
+
+
+def verdict_key(old_fingerprint: str, new_fingerprint: str, mode: str) -> tuple[str, str, str]:
+    return (old_fingerprint, new_fingerprint, mode)
+
+
+def verdict_etag(old_fingerprint: str, new_fingerprint: str, mode: str, variant: str = "") -> str:
+    digest = hashlib.sha256(f"{VERDICT_VERSION}:{old_fingerprint}:{new_fingerprint}:{mode}".encode("ascii"))
+    suffix = f"-{variant}" if variant else ""
+    return f'"{digest.hexdigest()[:40]}{suffix}"'
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is None:
+            record_cache_lookups(self.name, hits=0, misses=1)
+        else:
+            record_cache_lookups(self.name, hits=1, misses=0)
+        return value
+
+    def peek(self, key: K) -> V | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: K, value: V) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def items(self) -> list[tuple[K, V]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# fingerprint -> compiled SchemaRegistry; membership also means the schema passed validation.
+SCHEMA_CACHE: LRUCache[str, Any] = LRUCache("schema", SCHEMA_CACHE_SIZE)
+# (old fingerprint, new fingerprint, mode) -> list[CompatibilityIssue]
+VERDICT_CACHE: LRUCache[tuple[str, str, str], list] = LRUCache("verdict", VERDICT_CACHE_SIZE)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from schemaguard.cache import schema_fingerprint
+from schemaguard.hooks import ExplainHook
+from schemaguard.reporter import CompatibilityIssue, build_report, issue
+from schemaguard.resolution_plan import build_resolution_plan
+from schemaguard.rules import VALID_MODES
+from schemaguard.schema_loader import parse_json_bytes, validate_avro_schema
+from schemaguard.service import compare_compiled, compile_schema
+from schemaguard.snapshot import warm_caches, write_snapshot
+
+
+EXIT_COMPATIBLE = 0
+EXIT_INCOMPATIBLE = 1
+EXIT_INVALID_INPUT = 2
+
+
+def read_schema_file(path: Path, schema_label: str) -> tuple[Any | None, list[CompatibilityIssue]]:
+    try:
+        payload = path.read_bytes()
+    except OSError as exc:
+        return None, [
+            issue(
+                path=schema_label,
+                issue_type="INVALID_UPLOAD",
+                writer_type="file",
+                reader_type="readable-file",
+                description=f"Failed to read schema file: {exc}",
+            )
+        ]
+
+    schema, parse_error = parse_json_bytes(payload)
+    if parse_error:
+        return None, [
+            issue(
+                path=schema_label,
+                issue_type="INVALID_SCHEMA_JSON",
+                writer_type="file",
+                reader_type="valid-json",
+                description=parse_error,
+            )
+        ]
+    return schema, []
+
+
+def load_schema_file(path: Path, schema_label: str) -> tuple[Any | None, list[CompatibilityIssue]]:
+    schema, errors = read_schema_file(path, schema_label)
+    if errors:
+        return None, errors
+    validation_errors = validate_avro_schema(schema, schema_label)
+    if validation_errors:
+        return None, validation_errors
+    return schema, []
+
+
+def _print_json(payload: Any) -> None:
+    json.dump(payload, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _print_warm_progress(source: str, done: int, total: int) -> None:
+    sys.stderr.write(f"warming {source}: {done}/{total}\n")
+
+
+def _warm(sources: list[str] | None) -> None:
+    if not sources:
+        return
+    report = warm_caches(sources, progress=_print_warm_progress)
+    sys.stderr.write(
+        f"warmed {report.schemas} schemas and {report.verdicts} verdicts in {report.seconds:.3f}s"
+        f" ({len(report.failed)} failed)\n"
+    )
+    for failure in report.failed:
+        sys.stderr.write(f"  {failure}\n")
+
+
+def _run_compare(args: argparse.Namespace) -> int:
+    _warm(args.warm_from)
+    # Schemas go through the service caches, so a warm snapshot skips validation and
+    # may answer the whole comparison from a cached verdict.
+    registries = []
+    for path, label in ((args.old_schema, "OldSchema"), (args.new_schema, "NewSchema")):
+        schema, errors = read_schema_file(Path(path), label)
+        if not errors:
+            fingerprint = schema_fingerprint(schema)
+            registry, errors = compile_schema(schema, label, fingerprint)
+        if errors:
+            _print_json(build_report(errors))
+            return EXIT_INVALID_INPUT
+        registries.append((registry, fingerprint))
+
+    (old_registry, old_fingerprint), (new_registry, new_fingerprint) = registries
+    hook = ExplainHook() if args.explain else None
+    errors = compare_compiled(
+        old_registry,
+        new_registry,
+        old_fingerprint=old_fingerprint,
+        new_fingerprint=new_fingerprint,
+        mode=args.mode,
+        hook=hook,
+        workers=args.workers,
+    )
+    payload = build_report(errors)
+    if args.plan:
+        payload["resolutionPlan"] = build_resolution_plan(old_registry, new_registry, args.mode)
+    if hook is not None:
+        payload["explain"] = hook.report(limit=args.top)
+    _print_json(payload)
+    if args.snapshot_to:
+        write_snapshot(args.snapshot_to)
+    return EXIT_INCOMPATIBLE if errors else EXIT_COMPATIBLE
+
+
+def _run_replay(args: argparse.Namespace) -> int:
+    schemas = []
+    for path, label in ((args.old_schema, "OldSchema"), (args.new_schema, "NewSchema")):
+        schema, errors = load_schema_file(Path(path), label)
+        if errors:
+            _print_json(build_report(errors))
+            return EXIT_INVALID_INPUT
+        schemas.append(schema)
+
+    # Imported here: replay needs fastavro, which the compare path avoids loading up front.
+    from schemaguard.replay import replay
+
+    report = replay(
+        schemas[0],
+        schemas[1],
+        args.mode,
+        data_files=args.data,
+        samples=args.samples,
+        max_records=args.max_records,
+        max_seconds=args.max_seconds,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    payload = build_report(report.issues)
+    payload["replay"] = report.as_dict()
+    _print_json(payload)
+    return EXIT_INCOMPATIBLE if report.issues else EXIT_COMPATIBLE
+
+
+def _run_watch(args: argparse.Namespace) -> int:
+    root = Path(args.directory).resolve()
+    if not root.is_dir():
+        print(f"schemaguard watch: {args.directory} is not a directory", file=sys.stderr)
+        return EXIT_INVALID_INPUT
+
+    from schemaguard.watch import run_watch
+
+    try:
+        run_watch(
+            root,
+            args.mode,
+            against=Path(args.against).resolve() if args.against else None,
+            debounce=args.debounce,
+            polling=args.poll,
+            poll_interval=args.poll_interval,
+        )
+    except KeyboardInterrupt:
+        pass
+    return EXIT_COMPATIBLE
+
+
+def _run_snapshot(args: argparse.Namespace) -> int:
+    report = warm_caches(args.warm_from, progress=_print_warm_progress)
+    size = write_snapshot(args.output)
+    _print_json({**report.as_dict(), "output": args.output, "bytes": size})
+    return EXIT_INVALID_INPUT if report.failed else EXIT_COMPATIBLE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="schemaguard", description="SchemaGuard command line tools.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    compare = subcommands.add_parser("compare", help="Compare two Avro schema files")
+    compare.add_argument("old_schema", help="Old Avro schema JSON file")
+    compare.add_argument("new_schema", help="New Avro schema JSON file")
+    compare.add_argument("--mode", choices=sorted(VALID_MODES), default="backward", help="Compatibility mode")
+    compare.add_argument(
+        "--explain",
+        action="store_true",
+        help="Include per-path visit counts, union trials and cumulative time, sorted by cost",
+    )
+    compare.add_argument("--top", type=int, default=None, help="Limit explain output to the N costliest paths")
+    compare.add_argument(
+        "--plan",
+        action="store_true",
+        help="Include the writer->reader resolution plan (field maps, defaults, union remapping, promotions)",
+    )
+    compare.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Shard one very large comparison across this many processes (ignored with --explain)",
+    )
+    compare.add_argument(
+        "--warm-from",
+        action="append",
+        metavar="PATH",
+        help="Snapshot, .avsc file or directory of .avsc files to load into the caches first (repeatable)",
+    )
+    compare.add_argument("--snapshot-to", metavar="PATH", help="Write the caches to a snapshot after comparing")
+    compare.set_defaults(handler=_run_compare)
+
+    replay = subcommands.add_parser(
+        "replay", help="Decode sample records written with one schema using the other (needs fastavro)"
+    )
+    replay.add_argument("old_schema", help="Old Avro schema JSON file")
+    replay.add_argument("new_schema", help="New Avro schema JSON file")
+    replay.add_argument("--mode", choices=sorted(VALID_MODES), default="backward", help="Compatibility mode")
+    replay.add_argument(
+        "--data",
+        action="append",
+        metavar="FILE",
+        help="Avro object container file to decode with the reader schema (repeatable)",
+    )
+    replay.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="Records to generate from the writer schema per direction (default 1000, 0 with --data)",
+    )
+    replay.add_argument("--max-records", type=int, default=100_000, help="Records read from --data per direction")
+    replay.add_argument("--max-seconds", type=float, default=None, help="Stop scheduling work after this long")
+    replay.add_argument("--workers", type=int, default=0, help="Decode in this many processes")
+    replay.add_argument("--seed", type=int, default=0, help="Seed for generated records")
+    replay.set_defaults(handler=_run_replay)
+
+    watch = subcommands.add_parser("watch", help="Re-check .avsc files in a directory whenever they change")
+    watch.add_argument("directory", help="Directory of .avsc files (watched recursively)")
+    watch.add_argument("--mode", choices=sorted(VALID_MODES), default="backward", help="Compatibility mode")
+    watch.add_argument(
+        "--against",
+        metavar="DIR",
+        help="Baseline directory with the same layout (default: each file's content when watching starts)",
+    )
+    watch.add_argument("--debounce", type=float, default=0.2, help="Quiet seconds that end a burst of edits")
+    watch.add_argument("--poll", action="store_true", help="Poll file stats instead of using inotify")
+    watch.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between polls")
+    watch.set_defaults(handler=_run_watch)
+
+    snapshot = subcommands.add_parser("snapshot", help="Build a cache snapshot from schemas and older snapshots")
+    snapshot.add_argument("output", help="Snapshot file to write")
+    snapshot.add_argument(
+        "--warm-from",
+        action="append",
+        metavar="PATH",
+        required=True,
+        help="Snapshot, .avsc file or directory of .avsc files to include (repeatable)",
+    )
+    snapshot.set_defaults(handler=_run_snapshot)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import os
+import sys
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
 
+from schemaguard.hooks import EngineHook
+from schemaguard.instrumentation import SCHEMA_NODES, phase, record_cache_lookups
 from schemaguard.reporter import CompatibilityIssue, issue
 from schemaguard.rules import logical_type, primitive_compatible, type_label
 
+if TYPE_CHECKING:
+    from schemaguard.type_pool import NamedTypePool
+
 
 COMPLEX_TYPES = {"record", "enum", "fixed", "array", "map"}
+# Interpreter frames the engine may need per level of JSON nesting (union trials are the deepest path).
+FRAMES_PER_NESTING_LEVEL = 3
+# Deepest JSON nesting accepted anywhere. The recursion limit is sized for it once, at import,
+# so no input can move it (a limit raised per request would let each one nest deeper).
+MAX_NESTING_DEPTH = int(os.environ.get("SCHEMAGUARD_MAX_NESTING_DEPTH", "5000"))
+RECURSION_LIMIT = 1000 + MAX_NESTING_DEPTH * FRAMES_PER_NESTING_LEVEL
+
+
+class SchemaTooDeep(ValueError):
+    pass
 
 
 @dataclass
@@ -18,14 +35,19 @@ class NameInfo:
 
 
 class SchemaRegistry:
-    def __init__(self, schema: Any):
+    def __init__(self, schema: Any, pool: NamedTypePool | None = None):
         self.schema = schema
+        # Named types interned by the pool carry their NameInfo; it is shared, not rebuilt.
+        self.pool = pool
         self.named_types: dict[str, dict[str, Any]] = {}
         self.alias_to_fullname: dict[str, str] = {}
         self.node_name_info: dict[int, NameInfo] = {}
+        self.node_count = 0
+        self.depth = check_nesting_depth(schema)
         self._collect(schema, default_namespace=None)
 
     def _collect(self, node: Any, default_namespace: str | None) -> None:
+        self.node_count += 1
         if isinstance(node, list):
             for branch in node:
                 self._collect(branch, default_namespace)
@@ -43,19 +65,24 @@ class SchemaRegistry:
             return
 
         if node_type in {"record", "enum", "fixed"}:
-            fullname = self._resolve_name(
-                name=node.get("name"),
-                explicit_namespace=node.get("namespace"),
-                default_namespace=default_namespace,
-            )
-            if not fullname:
-                return
-            namespace = self._namespace_for_fullname(fullname)
-            aliases = self._resolve_aliases(
-                aliases=node.get("aliases", []),
-                namespace=namespace,
-            )
-            info = NameInfo(fullname=fullname, namespace=namespace, aliases=aliases)
+            pooled = self.pool.lookup(node) if self.pool is not None else None
+            if pooled is not None:
+                info = pooled.info
+            else:
+                fullname = self._resolve_name(
+                    name=node.get("name"),
+                    explicit_namespace=node.get("namespace"),
+                    default_namespace=default_namespace,
+                )
+                if not fullname:
+                    return
+                namespace = self._namespace_for_fullname(fullname)
+                aliases = self._resolve_aliases(
+                    aliases=node.get("aliases", []),
+                    namespace=namespace,
+                )
+                info = NameInfo(fullname=fullname, namespace=namespace, aliases=aliases)
+            fullname, namespace, aliases = info.fullname, info.namespace, info.aliases
             self.node_name_info[id(node)] = info
             self.named_types[fullname] = node
             for alias in aliases:
@@ -76,7 +103,7 @@ class SchemaRegistry:
 
         if isinstance(node_type, str):
             resolved, _ = self.resolve_reference(node_type, default_namespace)
-            if resolved is not None:
+            if resolved is not None and id(resolved) not in self.node_name_info:
                 self._collect(resolved, default_namespace)
 
     @staticmethod
@@ -99,7 +126,8 @@ class SchemaRegistry:
             return None
         return fullname.rsplit(".", 1)[0]
 
-    def _resolve_aliases(self, aliases: Any, namespace: str | None) -> set[str]:
+    @staticmethod
+    def _resolve_aliases(aliases: Any, namespace: str | None) -> set[str]:
         resolved: set[str] = set()
         if not isinstance(aliases, list):
             return resolved
@@ -177,25 +205,109 @@ class SchemaRegistry:
             return info.fullname.rsplit(".", 1)[1]
         return info.fullname
 
+
 class CompatibilityEngine:
-    def __init__(self, writer_schema: Any, reader_schema: Any, direction: str):
-        self.writer_registry = SchemaRegistry(writer_schema)
-        self.reader_registry = SchemaRegistry(reader_schema)
+    def __init__(
+        self,
+        writer_schema: Any,
+        reader_schema: Any,
+        direction: str,
+        *,
+        writer_registry: SchemaRegistry | None = None,
+        reader_registry: SchemaRegistry | None = None,
+        hook: EngineHook | None = None,
+    ):
+        self.writer_registry = writer_registry or SchemaRegistry(writer_schema)
+        self.reader_registry = reader_registry or SchemaRegistry(reader_schema)
         self.direction = direction
         self.errors: list[CompatibilityIssue] = []
+        # Union branch trial verdicts, shared with the throwaway branch engines of one run.
+        self.branch_cache: dict[tuple[int, int, str | None, str | None], bool] = {}
+        self.branch_cache_hits = 0
+        self.branch_cache_misses = 0
+        # Record pairs on the current comparison stack. Meeting one again means a recursive
+        # type; it is assumed compatible there and any real break is reported by the outer visit.
+        self.in_progress: dict[tuple[int, int], int] = {}  # pair -> stack depth
+        self.assumptions = 0
+        # Stack depth of the outermost pair an assumption leaned on.
+        self.assumed_depth = sys.maxsize
+        self.hook = hook
+        # Verdicts between pooled named types hold in any top-level schema; observed runs
+        # report every node, so they always walk.
+        pool = self.writer_registry.pool
+        self.type_pool = pool if hook is None and pool is not None and pool is self.reader_registry.pool else None
+        if hook is not None:
+            # Shadow the class method so unobserved runs pay nothing per node.
+            self._compare = self._compare_observed
 
     def run(self) -> list[CompatibilityIssue]:
-        root_name = self.writer_registry.short_name_for_node(self.writer_registry.schema)
-        root_path = root_name or "RootSchema"
         self._compare(
             writer_node=self.writer_registry.schema,
             reader_node=self.reader_registry.schema,
-            path=root_path,
+            path=self.root_path(),
             writer_namespace=None,
             reader_namespace=None,
         )
         return self.errors
 
+    def root_path(self) -> str:
+        return self.writer_registry.short_name_for_node(self.writer_registry.schema) or "RootSchema"
+
+    def root_records(self) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        # The root pair when run() would go straight into _compare_record without reporting
+        # anything at the root itself; only then can the root's fields be compared piecewise.
+        writer_node = self.writer_registry.schema
+        reader_node = self.reader_registry.schema
+        if self._as_union(writer_node) is not None or self._as_union(reader_node) is not None:
+            return None
+        writer_resolved, _ = self.writer_registry.resolve_node(writer_node, None)
+        reader_resolved, _ = self.reader_registry.resolve_node(reader_node, None)
+        if writer_resolved is None or reader_resolved is None:
+            return None
+        if logical_type(writer_resolved) != logical_type(reader_resolved):
+            return None
+        if self._kind(writer_resolved) != "record" or self._kind(reader_resolved) != "record":
+            return None
+        if not self._named_types_compatible(writer_resolved, reader_resolved):
+            return None
+        return writer_resolved, reader_resolved
+
+    def run_shard(
+        self,
+        fields: tuple[int, int],
+        branches: tuple[int, int] | None = None,
+    ) -> list[CompatibilityIssue]:
+        # Reader fields [start, end) of the root record; with branches, only writer union
+        # branches [start, end) of the single field fields[0]. Concatenating the shards of a
+        # plan in order reproduces run() exactly.
+        records = self.root_records()
+        if records is None:
+            raise ValueError("Root schemas are not a comparable record pair; shards need a record root.")
+        writer_record, reader_record = records
+        self.in_progress[(id(writer_record), id(reader_record))] = 0
+        if branches is None:
+            self._compare_record(
+                writer_record=writer_record,
+                reader_record=reader_record,
+                path=self.root_path(),
+                field_range=fields,
+            )
+            return self.errors
+
+        field_name, reader_field = list(self.fields_by_name(reader_record).items())[fields[0]]
+        writer_field = self.fields_by_name(writer_record)[field_name]
+        self._compare_union(
+            writer_union=self._as_union(writer_field.get("type")),
+            reader_union=self._as_union(reader_field.get("type")),
+            writer_node=writer_field.get("type"),
+            reader_node=reader_field.get("type"),
+            path=f"{self.root_path()}.{field_name}",
+            writer_namespace=self.writer_registry.namespace_for_node(writer_record),
+            reader_namespace=self.reader_registry.namespace_for_node(reader_record),
+            branch_range=branches,
+        )
+        return self.errors
+
     def _add_error(
         self,
         *,
@@ -215,6 +327,30 @@ class CompatibilityEngine:
             )
         )
 
+    def _compare_observed(
+        self,
+        *,
+        writer_node: Any,
+        reader_node: Any,
+        path: str,
+        writer_namespace: str | None,
+        reader_namespace: str | None,
+    ) -> bool:
+        self.hook.on_enter(path, writer_node, reader_node)
+        compatible = False
+        try:
+            compatible = CompatibilityEngine._compare(
+                self,
+                writer_node=writer_node,
+                reader_node=reader_node,
+                path=path,
+                writer_namespace=writer_namespace,
+                reader_namespace=reader_namespace,
+            )
+            return compatible
+        finally:
+            self.hook.on_exit(path, compatible)
+
     def _compare(
         self,
         *,
@@ -319,11 +455,23 @@ class CompatibilityEngine:
                 return False
 
         if writer_kind == "record":
-            return self._compare_record(
-                writer_record=writer_resolved,
-                reader_record=reader_resolved,
-                path=path,
-            )
+            pair = (id(writer_resolved), id(reader_resolved))
+            depth = self.in_progress.get(pair)
+            if depth is not None:
+                self.assumptions += 1
+                self.assumed_depth = min(self.assumed_depth, depth)
+                return True
+            if self.type_pool is not None:
+                return self._compare_pooled_record(writer_resolved, reader_resolved, path)
+            self.in_progress[pair] = len(self.in_progress)
+            try:
+                return self._compare_record(
+                    writer_record=writer_resolved,
+                    reader_record=reader_resolved,
+                    path=path,
+                )
+            finally:
+                del self.in_progress[pair]
         if writer_kind == "array":
             return self._compare(
                 writer_node=writer_resolved.get("items"),
@@ -378,23 +526,77 @@ class CompatibilityEngine:
             return True
         return False
 
-    def _compare_record(self, *, writer_record: dict[str, Any], reader_record: dict[str, Any], path: str) -> bool:
-        writer_fields = {
-            field["name"]: field
-            for field in writer_record.get("fields", [])
-            if isinstance(field, dict) and isinstance(field.get("name"), str)
-        }
-        reader_fields = {
+    def _compare_pooled_record(self, writer_record: dict[str, Any], reader_record: dict[str, Any], path: str) -> bool:
+        key = self.type_pool.pair_key(writer_record, reader_record, self.direction)
+        if key is not None and self._stack_reaches(writer_record, reader_record):
+            # The unpooled walk would cut recursion off at that enclosing pair, so neither a
+            # verdict computed without this stack nor one computed with it holds elsewhere.
+            key = None
+        if key is not None:
+            cached = self.type_pool.verdict(key)
+            if cached is not None:
+                compatible, issues = cached
+                self.errors.extend(replace(entry, path=path + entry.path) for entry in issues)
+                return compatible
+
+        pair = (id(writer_record), id(reader_record))
+        depth = self.in_progress[pair] = len(self.in_progress)
+        errors_before, outer_assumed = len(self.errors), self.assumed_depth
+        self.assumed_depth = sys.maxsize
+        try:
+            compatible = self._compare_record(writer_record=writer_record, reader_record=reader_record, path=path)
+        finally:
+            del self.in_progress[pair]
+            visit_assumed, self.assumed_depth = self.assumed_depth, min(outer_assumed, self.assumed_depth)
+        # Assuming this pair itself is the usual recursive case; leaning on an enclosing pair
+        # makes the verdict specific to this stack.
+        if key is not None and visit_assumed >= depth:
+            issues = tuple(replace(entry, path=entry.path[len(path) :]) for entry in self.errors[errors_before:])
+            self.type_pool.verdicts.put(key, (compatible, issues))
+        return compatible
+
+    def _stack_reaches(self, writer_record: dict[str, Any], reader_record: dict[str, Any]) -> bool:
+        if not self.in_progress:
+            return False
+        writer_names = self.type_pool.records_within(writer_record, self.writer_registry)
+        reader_names = self.type_pool.records_within(reader_record, self.reader_registry)
+        writer_info = self.writer_registry.node_name_info
+        reader_info = self.reader_registry.node_name_info
+        for writer_id, reader_id in self.in_progress:
+            writer = writer_info.get(writer_id)
+            reader = reader_info.get(reader_id)
+            if writer is not None and reader is not None:
+                if writer.fullname in writer_names and reader.fullname in reader_names:
+                    return True
+        return False
+
+    @staticmethod
+    def fields_by_name(record: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        return {
             field["name"]: field
-            for field in reader_record.get("fields", [])
+            for field in record.get("fields", [])
             if isinstance(field, dict) and isinstance(field.get("name"), str)
         }
 
+    def _compare_record(
+        self,
+        *,
+        writer_record: dict[str, Any],
+        reader_record: dict[str, Any],
+        path: str,
+        field_range: tuple[int, int] | None = None,
+    ) -> bool:
+        writer_fields = self.fields_by_name(writer_record)
+        reader_fields = self.fields_by_name(reader_record)
+        reader_items: Any = reader_fields.items()
+        if field_range is not None:
+            reader_items = list(reader_items)[field_range[0] : field_range[1]]
+
         writer_ns = self.writer_registry.namespace_for_node(writer_record)
         reader_ns = self.reader_registry.namespace_for_node(reader_record)
         compatible = True
 
-        for field_name, reader_field in reader_fields.items():
+        for field_name, reader_field in reader_items:
             field_path = f"{path}.{field_name}"
             writer_field = writer_fields.get(field_name)
 
@@ -453,10 +655,12 @@ class CompatibilityEngine:
         path: str,
         writer_namespace: str | None,
         reader_namespace: str | None,
+        branch_range: tuple[int, int] | None = None,
     ) -> bool:
         if writer_union is None and reader_union is not None:
             for branch in reader_union:
                 if self._branch_compatible(
+                    path=path,
                     writer_node=writer_node,
                     reader_node=branch,
                     writer_namespace=writer_namespace,
@@ -474,8 +678,9 @@ class CompatibilityEngine:
 
         if writer_union is not None and reader_union is None:
             ok = True
-            for index, branch in enumerate(writer_union):
+            for index, branch in self._indexed(writer_union, branch_range):
                 if self._branch_compatible(
+                    path=f"{path}[{index}]",
                     writer_node=branch,
                     reader_node=reader_node,
                     writer_namespace=writer_namespace,
@@ -494,9 +699,10 @@ class CompatibilityEngine:
 
         if writer_union is not None and reader_union is not None:
             ok = True
-            for index, writer_branch in enumerate(writer_union):
+            for index, writer_branch in self._indexed(writer_union, branch_range):
                 branch_ok = any(
                     self._branch_compatible(
+                        path=f"{path}[{index}]",
                         writer_node=writer_branch,
                         reader_node=reader_branch,
                         writer_namespace=writer_namespace,
@@ -521,22 +727,56 @@ class CompatibilityEngine:
     def _branch_compatible(
         self,
         *,
+        path: str,
         writer_node: Any,
         reader_node: Any,
         writer_namespace: str | None,
         reader_namespace: str | None,
     ) -> bool:
-        branch_engine = CompatibilityEngine(writer_node, reader_node, self.direction)
-        branch_engine.writer_registry = self.writer_registry
-        branch_engine.reader_registry = self.reader_registry
+        key = (id(writer_node), id(reader_node), writer_namespace, reader_namespace)
+        cached = self.branch_cache.get(key)
+        if cached is not None:
+            self.branch_cache_hits += 1
+            if self.hook is not None:
+                self.hook.on_cache_hit(path, "union_branch")
+            return cached
+        self.branch_cache_misses += 1
+        if self.hook is not None:
+            self.hook.on_union_trial(path, writer_node, reader_node)
+
+        branch_engine = CompatibilityEngine(
+            writer_node,
+            reader_node,
+            self.direction,
+            writer_registry=self.writer_registry,
+            reader_registry=self.reader_registry,
+            hook=self.hook,
+        )
+        branch_engine.branch_cache = self.branch_cache
+        branch_engine.in_progress = self.in_progress
         branch_engine._compare(
             writer_node=writer_node,
             reader_node=reader_node,
-            path="branch",
+            path=path,
             writer_namespace=writer_namespace,
             reader_namespace=reader_namespace,
         )
-        return len(branch_engine.errors) == 0
+        self.branch_cache_hits += branch_engine.branch_cache_hits
+        self.branch_cache_misses += branch_engine.branch_cache_misses
+        self.assumptions += branch_engine.assumptions
+        self.assumed_depth = min(self.assumed_depth, branch_engine.assumed_depth)
+        compatible = len(branch_engine.errors) == 0
+        # Verdicts that leaned on a recursive assumption only hold inside the enclosing visit.
+        if branch_engine.assumptions == 0:
+            self.branch_cache[key] = compatible
+        return compatible
+
+    @staticmethod
+    def _indexed(items: list[Any], index_range: tuple[int, int] | None) -> Any:
+        if index_range is None:
+            return enumerate(items)
+        start, end = index_range
+        return zip(range(start, end), items[start:end])
 
     @staticmethod
     def _as_union(node: Any) -> list[Any] | None:
@@ -568,16 +808,115 @@ class CompatibilityEngine:
         return "unknown"
 
 
-def check_compatibility(old_schema: Any, new_schema: Any, mode: str) -> list[CompatibilityIssue]:
+def nesting_depth(node: Any) -> int:
+    deepest = 0
+    stack = [(node, 1)]
+    while stack:
+        current, depth = stack.pop()
+        if depth > deepest:
+            deepest = depth
+        if isinstance(current, dict):
+            stack.extend((child, depth + 1) for child in current.values() if isinstance(child, (dict, list)))
+        elif isinstance(current, list):
+            stack.extend((child, depth + 1) for child in current if isinstance(child, (dict, list)))
+    return deepest
+
+
+def json_node_count(node: Any) -> int:
+    # Objects and arrays in parsed schema JSON: a pre-compile bound on registry nodes.
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            count += 1
+            stack.extend(child for child in current.values() if isinstance(child, (dict, list)))
+        elif isinstance(current, list):
+            count += 1
+            stack.extend(child for child in current if isinstance(child, (dict, list)))
+    return count
+
+
+def check_nesting_depth(schema: Any) -> int:
+    depth = nesting_depth(schema)
+    if depth > MAX_NESTING_DEPTH:
+        raise SchemaTooDeep(f"Schema nesting depth {depth} exceeds the maximum of {MAX_NESTING_DEPTH}.")
+    return depth
+
+
+def ensure_recursion_headroom() -> None:
+    # The engine, json and fastavro recurse once or more per schema level; deep generated
+    # schemas need more than the interpreter default. Never lowered, so embedders can go higher.
+    if sys.getrecursionlimit() < RECURSION_LIMIT:
+        sys.setrecursionlimit(RECURSION_LIMIT)
+
+
+ensure_recursion_headroom()
+
+
+def compile_registries(old_schema: Any, new_schema: Any) -> tuple[SchemaRegistry, SchemaRegistry]:
+    with phase("registry"):
+        old_registry = SchemaRegistry(old_schema)
+        new_registry = SchemaRegistry(new_schema)
+    SCHEMA_NODES.observe(old_registry.node_count)
+    SCHEMA_NODES.observe(new_registry.node_count)
+    return old_registry, new_registry
+
+
+def check_compatibility(
+    old_schema: Any,
+    new_schema: Any,
+    mode: str,
+    *,
+    hook: EngineHook | None = None,
+    old_registry: SchemaRegistry | None = None,
+    new_registry: SchemaRegistry | None = None,
+    workers: int = 0,
+) -> list[CompatibilityIssue]:
     mode_clean = mode.strip().lower()
     errors: list[CompatibilityIssue] = []
 
+    if old_registry is None or new_registry is None:
+        old_registry, new_registry = compile_registries(old_schema, new_schema)
+
+    if workers > 1 and hook is None:
+        # Imported here so the single-process path never loads multiprocessing.
+        from schemaguard.parallel import check_compatibility_sharded
+
+        with phase("compare"):
+            sharded = check_compatibility_sharded(old_registry, new_registry, mode_clean, workers=workers)
+        if sharded is not None:
+            return sharded
+
+    engines: list[CompatibilityEngine] = []
     if mode_clean in {"backward", "full"}:
-        backward = CompatibilityEngine(writer_schema=old_schema, reader_schema=new_schema, direction="backward")
-        errors.extend(backward.run())
+        engines.append(
+            CompatibilityEngine(
+                writer_schema=old_schema,
+                reader_schema=new_schema,
+                direction="backward",
+                writer_registry=old_registry,
+                reader_registry=new_registry,
+                hook=hook,
+            )
+        )
 
     if mode_clean in {"forward", "full"}:
-        forward = CompatibilityEngine(writer_schema=new_schema, reader_schema=old_schema, direction="forward")
-        errors.extend(forward.run())
+        engines.append(
+            CompatibilityEngine(
+                writer_schema=new_schema,
+                reader_schema=old_schema,
+                direction="forward",
+                writer_registry=new_registry,
+                reader_registry=old_registry,
+                hook=hook,
+            )
+        )
+
+    with phase("compare"):
+        for engine in engines:
+            errors.extend(engine.run())
+    for engine in engines:
+        record_cache_lookups("union_branch", hits=engine.branch_cache_hits, misses=engine.branch_cache_misses)
 
     return errors
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import io
+import os
+import zlib
+from functools import lru_cache
+from typing import Any, Iterable, Iterator
+
+
+# Reports smaller than this are sent as-is; compression overhead outweighs the savings.
+COMPRESSION_MIN_BYTES = int(os.environ.get("SCHEMAGUARD_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str) -> Any | None:
+    # brotli and zstandard are optional and only imported once a request needs them.
+    try:
+        return importlib.import_module(name)
+    except Exception:  # pragma: no cover
+        return None
+
+
+def available_encodings() -> list[str]:
+    # Server preference order when the client accepts several with equal weight.
+    encodings = []
+    if _optional_module("zstandard") is not None:
+        encodings.append("zstd")
+    if _optional_module("brotli") is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    weights: dict[str, float] = {}
+    for entry in accept_encoding.split(","):
+        token, _, params = entry.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[token] = weight
+
+    best: str | None = None
+    best_weight = 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    brotli = _optional_module("brotli")
+    zstandard = _optional_module("zstandard")
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def iter_compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    brotli = _optional_module("brotli")
+    zstandard = _optional_module("zstandard")
+    if encoding == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+        return
+    if encoding == "br" and brotli is not None:
+        stream = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            out = stream.process(chunk)
+            if out:
+                yield out
+        yield stream.finish()
+        return
+    if encoding == "zstd" and zstandard is not None:
+        zstd_stream = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        for chunk in chunks:
+            out = zstd_stream.compress(chunk)
+            if out:
+                yield out
+        yield zstd_stream.flush()
+        return
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+# Request bodies: the size limit applies to decompressed bytes, and no call may produce more
+# than the limit allows, so a small compressed payload cannot expand past it in memory.
+
+
+def request_encodings() -> list[str]:
+    encodings = ["identity", "gzip"]
+    if _optional_module("zstandard") is not None:
+        encodings.append("zstd")
+    return encodings
+
+
+class StreamDecoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding or "identity"
+        zstandard = _optional_module("zstandard")
+        if self.encoding == "gzip":
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "zstd" and zstandard is not None:
+            self._zstd_input = bytearray()
+        elif self.encoding != "identity":
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def feed(self, chunk: bytes, max_length: int) -> bytes:
+        # Returns at most max_length + 1 bytes; more than max_length means the limit was hit.
+        if self.encoding == "identity":
+            return chunk
+        if self.encoding == "gzip":
+            return self._zlib.decompress(chunk, max_length + 1)
+        # zstd's incremental decoder has no output cap (one RLE block expands 4 bytes to 128 KiB),
+        # so the compressed input is kept (callers cap it) and decoded by finish().
+        self._zstd_input += chunk
+        return b""
+
+    def finish(self, max_length: int) -> bytes:
+        # The rest of the output, again at most max_length + 1 bytes; raises on a truncated body.
+        if self.encoding == "gzip" and not self._zlib.eof:
+            raise ValueError("Truncated gzip request body.")
+        if self.encoding == "zstd":
+            return _decode_zstd(bytes(self._zstd_input), max_length)
+        return b""
+
+
+def _decode_zstd(data: bytes, max_length: int) -> bytes:
+    zstandard = _optional_module("zstandard")
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+    out = reader.read(max_length + 1)
+    if len(out) > max_length:
+        return out
+    # The reader stops quietly where the input does, so a frame cut short looks complete.
+    # With the output known to fit, decoding frame by frame to check each one ends is bounded.
+    remaining = data
+    while remaining:
+        frame = zstandard.ZstdDecompressor().decompressobj()
+        frame.decompress(remaining)
+        if not frame.eof:
+            raise ValueError("Truncated zstd request body.")
+        remaining = frame.unused_data
+    return out
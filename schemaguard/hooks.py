@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+
+# No-op base for CompatibilityEngine observers; subclasses override only what they need.
+class EngineHook:
+    def on_enter(self, path: str, writer_node: Any, reader_node: Any) -> None:
+        pass
+
+    def on_exit(self, path: str, compatible: bool) -> None:
+        pass
+
+    def on_union_trial(self, path: str, writer_node: Any, reader_node: Any) -> None:
+        pass
+
+    def on_cache_hit(self, path: str, cache: str) -> None:
+        pass
+
+
+@dataclass
+class PathStats:
+    path: str
+    visits: int = 0
+    union_trials: int = 0
+    cache_hits: int = 0
+    cumulative_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "visits": self.visits,
+            "unionTrials": self.union_trials,
+            "cacheHits": self.cache_hits,
+            "cumulativeMs": round(self.cumulative_seconds * 1000, 3),
+        }
+
+
+class ExplainHook(EngineHook):
+    def __init__(self) -> None:
+        self.stats: dict[str, PathStats] = {}
+        self._started: list[float] = []
+
+    def _stats_for(self, path: str) -> PathStats:
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = PathStats(path=path)
+            self.stats[path] = stats
+        return stats
+
+    def on_enter(self, path: str, writer_node: Any, reader_node: Any) -> None:
+        self._stats_for(path).visits += 1
+        self._started.append(time.perf_counter())
+
+    def on_exit(self, path: str, compatible: bool) -> None:
+        elapsed = time.perf_counter() - self._started.pop()
+        self._stats_for(path).cumulative_seconds += elapsed
+
+    def on_union_trial(self, path: str, writer_node: Any, reader_node: Any) -> None:
+        self._stats_for(path).union_trials += 1
+
+    def on_cache_hit(self, path: str, cache: str) -> None:
+        self._stats_for(path).cache_hits += 1
+
+    def report(self, limit: int | None = None) -> list[dict]:
+        ordered = sorted(self.stats.values(), key=lambda s: (-s.cumulative_seconds, -s.visits, s.path))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [stats.as_dict() for stats in ordered]
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+# Seconds; tuned for sub-millisecond parses up to multi-second giant comparisons.
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTE_BUCKETS = tuple(float(2**exponent) for exponent in range(16, 34, 2))  # 64 KiB .. 8 GiB
+
+# Debug mode: per-phase peak memory via tracemalloc. Tracing slows allocation-heavy code
+# noticeably and peaks are process-wide, so concurrent requests blur each other's numbers.
+TRACE_MEMORY = os.environ.get("SCHEMAGUARD_TRACE_MEMORY", "") == "1"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    phases: dict[str, float] = field(default_factory=dict)
+    peak_bytes: dict[str, int] = field(default_factory=dict)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_peak(self, name: str, nbytes: int) -> None:
+        self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), nbytes)
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing_header(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items()]
+        entries.extend(f'{name}-mem;desc="peak {nbytes} B"' for name, nbytes in self.peak_bytes.items())
+        entries.append(f"total;dur={self.total() * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar("schemaguard_request_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    baseline = None
+    if TRACE_MEMORY:
+        # Imported only in debug mode: tracemalloc pulls in pickle, fnmatch and linecache.
+        import tracemalloc
+
+        if tracemalloc.is_tracing():
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+        if baseline is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            timings.add_peak(name, max(0, peak - baseline))
+
+
+def start_memory_tracing() -> None:
+    if not TRACE_MEMORY:
+        return
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def value(self) -> float:
+        return self._value
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self._value)}",
+        ]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        # label values -> (per-bucket counts, sum, count)
+        self._series: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        metric = Gauge(name, help_text)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+        labelnames: tuple[str, ...] = (),
+    ) -> Histogram:
+        metric = Histogram(name, help_text, buckets, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "schemaguard_requests_total",
+    "Requests handled, by endpoint and HTTP status.",
+    labelnames=("endpoint", "status"),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "schemaguard_request_duration_seconds",
+    "End-to-end request handling time.",
+    labelnames=("endpoint",),
+)
+PHASE_SECONDS = REGISTRY.histogram(
+    "schemaguard_phase_duration_seconds",
+    "Time spent per request phase (upload, parse, validate, registry, compare, serialize).",
+    labelnames=("phase",),
+)
+SCHEMA_NODES = REGISTRY.histogram(
+    "schemaguard_schema_nodes",
+    "Schema nodes visited while compiling a SchemaRegistry.",
+    buckets=COUNT_BUCKETS,
+)
+REPORT_ISSUES = REGISTRY.histogram(
+    "schemaguard_report_issues",
+    "Compatibility issues per completed comparison.",
+    buckets=COUNT_BUCKETS,
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "schemaguard_cache_lookups_total",
+    "Cache lookups by cache and result (hit|miss); hit rate is hit / (hit + miss).",
+    labelnames=("cache", "result"),
+)
+
+PHASE_PEAK_BYTES = REGISTRY.histogram(
+    "schemaguard_phase_peak_bytes",
+    "Peak traced allocation per request phase (only with SCHEMAGUARD_TRACE_MEMORY=1).",
+    buckets=BYTE_BUCKETS,
+    labelnames=("phase",),
+)
+REQUEST_ESTIMATED_BYTES = REGISTRY.histogram(
+    "schemaguard_request_estimated_bytes",
+    "Estimated memory footprint per admitted request (upload size and compiled node count).",
+    buckets=BYTE_BUCKETS,
+)
+MEMORY_IN_FLIGHT = REGISTRY.gauge(
+    "schemaguard_memory_in_flight_bytes",
+    "Estimated bytes currently reserved against the memory budget.",
+)
+MEMORY_REJECTIONS = REGISTRY.counter(
+    "schemaguard_memory_rejections_total",
+    "Requests refused with 503 by the memory budget (too large or queue timeout).",
+)
+TYPE_POOL_ENTRIES = REGISTRY.gauge(
+    "schemaguard_type_pool_entries",
+    "Distinct named types held by the shared type pool.",
+)
+JOBS_QUEUED = REGISTRY.gauge(
+    "schemaguard_jobs_queued",
+    "Jobs waiting for a worker in the local job pool.",
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "schemaguard_jobs_finished_total",
+    "Jobs that reached a final state, by status (succeeded|failed|cancelled).",
+    labelnames=("status",),
+)
+BATCH_PAIRS = REGISTRY.counter(
+    "schemaguard_batch_pairs_total",
+    "Pairs answered by /compare/batch, by outcome (compatible|incompatible|invalid).",
+    labelnames=("outcome",),
+)
+WARMUP_SECONDS = REGISTRY.gauge(
+    "schemaguard_warmup_seconds",
+    "Duration of the last cache warm-up from snapshots or .avsc directories.",
+)
+WARMUP_ENTRIES = REGISTRY.counter(
+    "schemaguard_warmup_entries_total",
+    "Entries handled by cache warm-up, by kind (schema|verdict|failed).",
+    labelnames=("kind",),
+)
+
+
+def record_cache_lookups(cache: str, *, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_LOOKUPS.inc(hits, cache=cache, result="hit")
+    if misses:
+        CACHE_LOOKUPS.inc(misses, cache=cache, result="miss")
+
+
+def observe_request(endpoint: str, status_code: int, timings: RequestTimings) -> None:
+    REQUESTS.inc(endpoint=endpoint, status=str(status_code))
+    REQUEST_SECONDS.observe(timings.total(), endpoint=endpoint)
+    for name, seconds in timings.phases.items():
+        PHASE_SECONDS.observe(seconds, phase=name)
+    for name, nbytes in timings.peak_bytes.items():
+        PHASE_PEAK_BYTES.observe(nbytes, phase=name)
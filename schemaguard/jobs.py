@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from schemaguard.cache import schema_fingerprint
+from schemaguard.hooks import EngineHook
+from schemaguard.instrumentation import JOBS_FINISHED, JOBS_QUEUED
+from schemaguard.reporter import CompatibilityIssue, build_report, issue
+from schemaguard.rules import normalize_mode
+from schemaguard.schema_loader import MAX_SCHEMA_BYTES
+from schemaguard.service import cached_verdict, compare_compiled, compile_schema, store_verdict
+
+if TYPE_CHECKING:
+    from schemaguard.memory_budget import Reservation
+
+
+# Long comparisons run on a bounded pool of local worker threads, outside the request
+# that submitted them. Jobs live in memory only; finished jobs expire after JOB_TTL_SECONDS,
+# or sooner once more than JOB_MAX_RETAINED jobs are kept. A job holds its request's memory
+# reservation, and its schemas, only until it finishes.
+
+JOB_WORKERS = int(os.environ.get("SCHEMAGUARD_JOB_WORKERS", "2"))
+JOB_QUEUE_LIMIT = int(os.environ.get("SCHEMAGUARD_JOB_QUEUE_LIMIT", "100"))
+JOB_TTL_SECONDS = float(os.environ.get("SCHEMAGUARD_JOB_TTL_SECONDS", "3600"))
+JOB_MAX_RETAINED = int(os.environ.get("SCHEMAGUARD_JOB_MAX_RETAINED", "1000"))
+# How long shutdown waits for running jobs to reach a cancellation check.
+JOB_SHUTDOWN_SECONDS = 5.0
+DEFAULT_PRIORITY = 5
+# Transitive jobs carry every version inline.
+MAX_JOB_BODY_BYTES = 16 * MAX_SCHEMA_BYTES
+JOB_KINDS = ("compare", "transitive")
+# Engine nodes between cancellation checks and progress updates.
+CANCEL_CHECK_NODES = 256
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class InvalidJobInput(Exception):
+    def __init__(self, errors: list[CompatibilityIssue]):
+        super().__init__(errors[0].description)
+        self.errors = errors
+
+
+@dataclass
+class JobRequest:
+    kind: str
+    schemas: list[Any]
+    mode: str
+    priority: int = DEFAULT_PRIORITY
+
+    def pairs(self) -> list[tuple[int, int]]:
+        # compare: schemas[0] -> schemas[1]. transitive: every earlier version -> the latest.
+        latest = len(self.schemas) - 1
+        return [(index, latest) for index in range(latest)]
+
+
+@dataclass
+class PairResult:
+    old: int
+    new: int
+    errors: list[CompatibilityIssue] = field(default_factory=list)
+    done: bool = False
+
+    def as_dict(self) -> dict:
+        result: dict[str, Any] = {"old": self.old, "new": self.new, "done": self.done}
+        if self.done:
+            result.update(build_report(self.errors))
+        elif self.errors:
+            result["partialIssues"] = [asdict(err) for err in self.errors]
+        return result
+
+
+@dataclass
+class Job:
+    id: str
+    request: JobRequest
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    nodes_visited: int = 0
+    pairs: list[PairResult] = field(default_factory=list)
+    error: CompatibilityIssue | None = None
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    reservation: Reservation | None = None
+
+    def as_dict(self) -> dict:
+        payload: dict[str, Any] = {
+            "id": self.id,
+            "kind": self.request.kind,
+            "mode": self.request.mode,
+            "priority": self.request.priority,
+            "status": self.status,
+            "createdAt": self.created,
+            "startedAt": self.started,
+            "finishedAt": self.finished,
+            "progress": {
+                "nodesVisited": self.nodes_visited,
+                "pairsDone": sum(1 for pair in self.pairs if pair.done),
+                "pairsTotal": len(self.pairs),
+            },
+            "pairs": [pair.as_dict() for pair in self.pairs],
+        }
+        if self.status == SUCCEEDED:
+            payload["compatible"] = all(not pair.errors for pair in self.pairs)
+        if self.error is not None:
+            payload["error"] = asdict(self.error)
+        return payload
+
+
+class ProgressHook(EngineHook):
+    def __init__(self, job: Job):
+        self.job = job
+
+    def on_enter(self, path: str, writer_node: Any, reader_node: Any) -> None:
+        self.job.nodes_visited += 1
+        if self.job.nodes_visited % CANCEL_CHECK_NODES == 0 and self.job.cancel_requested.is_set():
+            raise JobCancelled(self.job.id)
+
+
+def parse_job_request(body: Any) -> tuple[JobRequest | None, list[CompatibilityIssue]]:
+    def invalid(description: str) -> tuple[None, list[CompatibilityIssue]]:
+        return None, [
+            issue(
+                path="request",
+                issue_type="INVALID_REQUEST_BODY",
+                writer_type=type(body).__name__,
+                reader_type='{"kind", "mode", "oldSchema"/"newSchema" | "schemas", "priority"}',
+                description=description,
+            )
+        ]
+
+    if not isinstance(body, dict):
+        return invalid("Job request must be a JSON object.")
+    kind = body.get("kind", "compare")
+    if kind not in JOB_KINDS:
+        return invalid(f"kind must be one of: {', '.join(JOB_KINDS)}.")
+    mode = body.get("mode")
+    try:
+        mode = normalize_mode(mode) if isinstance(mode, str) else normalize_mode("")
+    except ValueError as exc:
+        return None, [
+            issue(
+                path="mode",
+                issue_type="INVALID_MODE",
+                writer_type=str(mode),
+                reader_type="backward|forward|full",
+                description=str(exc),
+            )
+        ]
+    priority = body.get("priority", DEFAULT_PRIORITY)
+    if not isinstance(priority, int) or isinstance(priority, bool) or not 0 <= priority <= 9:
+        return invalid("priority must be an integer from 0 (first) to 9 (last).")
+
+    if kind == "compare":
+        if "oldSchema" not in body or "newSchema" not in body:
+            return invalid("compare jobs need oldSchema and newSchema.")
+        schemas = [body["oldSchema"], body["newSchema"]]
+    else:
+        schemas = body.get("schemas")
+        if not isinstance(schemas, list) or len(schemas) < 2:
+            return invalid("transitive jobs need schemas: a list of at least two versions, oldest first.")
+    return JobRequest(kind=kind, schemas=schemas, mode=mode, priority=priority), []
+
+
+class JobManager:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        queue_limit: int = JOB_QUEUE_LIMIT,
+        ttl_seconds: float = JOB_TTL_SECONDS,
+        max_retained: int = JOB_MAX_RETAINED,
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.ttl_seconds = ttl_seconds
+        self.max_retained = max_retained
+        self.jobs: dict[str, Job] = {}
+        self._queue: list[tuple[int, int, Job]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+
+    def submit(self, request: JobRequest, reservation: Reservation | None = None) -> Job:
+        # On success the job owns the reservation and releases it when it finishes.
+        job = Job(id=uuid.uuid4().hex, request=request, reservation=reservation)
+        job.pairs = [PairResult(old, new) for old, new in request.pairs()]
+        with self._condition:
+            self._expire_locked()
+            if len(self._queue) >= self.queue_limit:
+                raise JobQueueFull(f"Job queue is full ({self.queue_limit} waiting jobs).")
+            self.jobs[job.id] = job
+            # Lower priority numbers run first; equal priorities run in submission order.
+            heapq.heappush(self._queue, (request.priority, next(self._sequence), job))
+            JOBS_QUEUED.set(len(self._queue))
+            self._ensure_workers_locked()
+            self._condition.notify()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._condition:
+            self._expire_locked()
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINAL_STATES:
+                return job
+            job.cancel_requested.set()
+            if job.status == QUEUED:
+                self._queue = [entry for entry in self._queue if entry[2] is not job]
+                heapq.heapify(self._queue)
+                JOBS_QUEUED.set(len(self._queue))
+                self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        with self._condition:
+            self._stopping = True
+            for job in self.jobs.values():
+                job.cancel_requested.set()
+            for _, _, job in self._queue:
+                if job.status == QUEUED:
+                    self._finish(job, CANCELLED)
+            self._queue.clear()
+            JOBS_QUEUED.set(0)
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _ensure_workers_locked(self) -> None:
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"schemaguard-job-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _expire_locked(self) -> None:
+        horizon = time.time() - self.ttl_seconds
+        finished = [job for job in self.jobs.values() if job.finished is not None]
+        # Oldest first; the retention cap only ever drops finished jobs.
+        finished.sort(key=lambda job: job.finished)
+        excess = len(self.jobs) - self.max_retained
+        for index, job in enumerate(finished):
+            if job.finished < horizon or index < excess:
+                del self.jobs[job.id]
+
+    def _next_job(self) -> Job | None:
+        with self._condition:
+            while True:
+                while self._queue:
+                    _, _, job = heapq.heappop(self._queue)
+                    JOBS_QUEUED.set(len(self._queue))
+                    if job.status == QUEUED:
+                        job.status = RUNNING
+                        job.started = time.time()
+                        return job
+                if self._stopping:
+                    return None
+                self._condition.wait()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                run_job(job)
+                self._finish(job, SUCCEEDED)
+            except JobCancelled:
+                self._finish(job, CANCELLED)
+            except InvalidJobInput as exc:
+                job.error = exc.errors[0]
+                self._finish(job, FAILED)
+            except Exception as exc:
+                job.error = issue(
+                    path="job",
+                    issue_type="JOB_FAILED",
+                    writer_type=job.request.kind,
+                    reader_type="completed-job",
+                    description=f"{type(exc).__name__}: {exc}",
+                )
+                self._finish(job, FAILED)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished = time.time()
+        # Results stay readable until expiry; the inputs are not needed any more.
+        job.request.schemas = []
+        if job.reservation is not None:
+            job.reservation.release()
+            job.reservation = None
+        JOBS_FINISHED.inc(status=status)
+
+
+def run_job(job: Job) -> None:
+    request = job.request
+    directions = ["backward", "forward"] if request.mode == "full" else [request.mode]
+    fingerprints = [schema_fingerprint(schema) for schema in request.schemas]
+    registries: dict[int, Any] = {}
+    hook = ProgressHook(job)
+
+    def registry_for(index: int) -> Any:
+        if index not in registries:
+            registry, errors = compile_schema(request.schemas[index], f"Schema[{index}]", fingerprints[index])
+            if errors:
+                raise InvalidJobInput(errors)
+            registries[index] = registry
+        return registries[index]
+
+    for pair in job.pairs:
+        if job.cancel_requested.is_set():
+            raise JobCancelled(job.id)
+        old_fp, new_fp = fingerprints[pair.old], fingerprints[pair.new]
+        cached = cached_verdict(old_fp, new_fp, request.mode)
+        if cached is not None:
+            pair.errors = list(cached)
+        else:
+            old_registry, new_registry = registry_for(pair.old), registry_for(pair.new)
+            # Directions run separately so the first one's issues are visible while the second runs.
+            for direction in directions:
+                pair.errors.extend(
+                    compare_compiled(
+                        old_registry,
+                        new_registry,
+                        old_fingerprint=old_fp,
+                        new_fingerprint=new_fp,
+                        mode=direction,
+                        hook=hook,
+                    )
+                )
+            if len(directions) > 1:
+                store_verdict(old_fp, new_fp, request.mode, pair.errors)
+        pair.done = True
+
+
+JOB_MANAGER = JobManager()
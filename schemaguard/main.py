@@ -1,75 +1,573 @@
 from __future__ import annotations
 
+import json
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from fastapi import FastAPI, File, Form, Request, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, File, Form, Query, Request, UploadFile
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.types import Receive, Scope, Send
 
-from schemaguard.compatibility_engine import check_compatibility
-from schemaguard.reporter import CompatibilityIssue, build_report, issue
+from schemaguard.batch import MAX_BATCH_BODY_BYTES, BatchRequest, BatchStats, parse_batch_request, run_batch
+from schemaguard.cache import schema_fingerprint, verdict_etag
+from schemaguard.compatibility_engine import json_node_count
+from schemaguard.compression import COMPRESSION_MIN_BYTES, compress, iter_compressed, negotiate_encoding
+from schemaguard.hooks import ExplainHook
+from schemaguard.instrumentation import (
+    PROMETHEUS_CONTENT_TYPE,
+    MEMORY_REJECTIONS,
+    REGISTRY,
+    REPORT_ISSUES,
+    RequestTimings,
+    collect_timings,
+    observe_request,
+    phase,
+    start_memory_tracing,
+)
+from schemaguard.jobs import JOB_MANAGER, JOB_SHUTDOWN_SECONDS, MAX_JOB_BODY_BYTES, JobQueueFull, parse_job_request
+from schemaguard.memory_budget import MEMORY_BUDGET, MemoryBudgetExceeded, Reservation, estimate_request_bytes
+from schemaguard.resolution_plan import PLAN_VERSION, build_resolution_plan
+from schemaguard.reporter import NDJSON_MEDIA_TYPE, CompatibilityIssue, build_report, issue, iter_report_ndjson
 from schemaguard.rules import normalize_mode
-from schemaguard.schema_loader import load_schema_upload, validate_avro_schema
+from schemaguard.schema_loader import MAX_COMPARE_BODY_BYTES, MAX_SCHEMA_BYTES, load_compare_body, load_json_body, load_schema_upload
+from schemaguard.service import cached_verdict, compare_compiled, compile_schema
+from schemaguard.snapshot import SNAPSHOT_TO, WARM_FROM, warm_caches, write_snapshot
 
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 
-app = FastAPI(title="SchemaGuard", version="2.0.0")
+# uvicorn configures this logger, so startup progress shows up next to its own lines.
+logger = logging.getLogger("uvicorn.error")
+
+
+def _log_warm_progress(source: str, done: int, total: int) -> None:
+    logger.info("Warming caches from %s: %d/%d", source, done, total)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Each worker warms before it accepts traffic, so the first requests after a deploy hit.
+    if WARM_FROM:
+        report = warm_caches(WARM_FROM, progress=_log_warm_progress)
+        logger.info(
+            "Warmed %d schemas and %d verdicts in %.3fs (%d failed)",
+            report.schemas,
+            report.verdicts,
+            report.seconds,
+            len(report.failed),
+        )
+        for failure in report.failed:
+            logger.warning("Warm-up skipped %s", failure)
+    yield
+    # Queued jobs are cancelled, running ones stop at their next check.
+    JOB_MANAGER.shutdown(timeout=JOB_SHUTDOWN_SECONDS)
+    if SNAPSHOT_TO:
+        size = write_snapshot(SNAPSHOT_TO)
+        logger.info("Wrote cache snapshot %s (%d bytes)", SNAPSHOT_TO, size)
+
+
+app = FastAPI(title="SchemaGuard", version="2.0.0", lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+start_memory_tracing()
+
+RETRY_AFTER_SECONDS = 1
 
 
 def _error_status_code(errors: list[CompatibilityIssue]) -> int:
     if any(err.issueType == "FILE_TOO_LARGE" for err in errors):
         return 413
+    if any(err.issueType == "UNSUPPORTED_CONTENT_ENCODING" for err in errors):
+        return 415
     return 400
 
 
+@dataclass
+class Evaluation:
+    status_code: int
+    errors: list[CompatibilityIssue] = field(default_factory=list)
+    old_fingerprint: str | None = None
+    new_fingerprint: str | None = None
+    mode: str | None = None
+    with_plan: bool = False
+    plan: dict[str, Any] | None = None
+
+
+def _upload_bytes(*files: UploadFile) -> int:
+    return sum(file.size if file.size is not None else MAX_SCHEMA_BYTES for file in files)
+
+
+def _invalid_mode_issue(mode: str, exc: ValueError) -> CompatibilityIssue:
+    return issue(
+        path="mode",
+        issue_type="INVALID_MODE",
+        writer_type=mode,
+        reader_type="backward|forward|full",
+        description=str(exc),
+    )
+
+
+def _memory_budget_issue(exc: MemoryBudgetExceeded) -> CompatibilityIssue:
+    return issue(
+        path="request",
+        issue_type="MEMORY_BUDGET_EXCEEDED",
+        writer_type="request",
+        reader_type=f"<= {MEMORY_BUDGET.limit_bytes} bytes in flight",
+        description=str(exc),
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
     return templates.TemplateResponse(request=request, name="index.html", context={})
 
 
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _representation(request: Request, with_plan: bool = False) -> tuple[bool, str | None, str]:
+    ndjson = _wants_ndjson(request)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    # Strong ETags must differ per representation (format, content coding, resolution plan).
+    variant = "-".join(part for part in (f"plan{PLAN_VERSION}" if with_plan else "", "ndjson" if ndjson else "", encoding or "") if part)
+    return ndjson, encoding, variant
+
+
+def _current_etag(request: Request, evaluation: Evaluation) -> str:
+    _, _, variant = _representation(request, evaluation.with_plan)
+    return verdict_etag(evaluation.old_fingerprint, evaluation.new_fingerprint, evaluation.mode, variant)
+
+
+def _matches_etag(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # No "*": a wildcard would answer 304 for schemas that were never validated.
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _report_response(
+    request: Request,
+    evaluation: Evaluation,
+    extra: dict[str, Any],
+    *,
+    cacheable: bool,
+) -> Response:
+    ndjson, encoding, variant = _representation(request, evaluation.with_plan)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if evaluation.old_fingerprint and evaluation.new_fingerprint:
+        headers["X-Old-Schema-Fingerprint"] = evaluation.old_fingerprint
+        headers["X-New-Schema-Fingerprint"] = evaluation.new_fingerprint
+    if cacheable and evaluation.status_code == 200:
+        headers["ETag"] = verdict_etag(
+            evaluation.old_fingerprint, evaluation.new_fingerprint, evaluation.mode, variant
+        )
+
+    if evaluation.status_code == 200 and ndjson:
+        chunks = iter_report_ndjson(evaluation.errors, extra)
+        if encoding:
+            chunks = iter_compressed(chunks, encoding)
+            headers["Content-Encoding"] = encoding
+        return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    with phase("serialize"):
+        payload = {**build_report(evaluation.errors), **extra}
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if encoding and len(body) >= COMPRESSION_MIN_BYTES:
+        with phase("compress"):
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=evaluation.status_code, media_type="application/json", headers=headers)
+
+
+async def _respond(
+    request: Request,
+    endpoint: str,
+    upload_bytes: int,
+    hook: ExplainHook | None,
+    evaluate: Callable[[Reservation], Awaitable[Evaluation]],
+) -> Response:
+    with collect_timings() as timings:
+        try:
+            async with MEMORY_BUDGET.admit(estimate_request_bytes(upload_bytes)) as reservation:
+                evaluation = await evaluate(reservation)
+                if evaluation.status_code == 304:
+                    response = Response(status_code=304, headers={"ETag": _current_etag(request, evaluation)})
+                else:
+                    extra: dict[str, Any] = {}
+                    if evaluation.plan is not None:
+                        extra["resolutionPlan"] = evaluation.plan
+                    if hook is not None and evaluation.status_code == 200:
+                        extra["explain"] = hook.report()
+                    # Explain output carries timings, so it is never a stable, cacheable representation.
+                    response = _report_response(request, evaluation, extra, cacheable=hook is None)
+        except MemoryBudgetExceeded as exc:
+            MEMORY_REJECTIONS.inc()
+            evaluation = Evaluation(503, [_memory_budget_issue(exc)])
+            response = JSONResponse(
+                status_code=503,
+                content=build_report(evaluation.errors),
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+
+    if evaluation.status_code == 200:
+        REPORT_ISSUES.observe(len(evaluation.errors))
+    observe_request(endpoint, evaluation.status_code, timings)
+    response.headers["Server-Timing"] = timings.server_timing_header()
+    return response
+
+
 @app.post("/compare")
 async def compare(
+    request: Request,
     old_schema_file: UploadFile = File(...),
     new_schema_file: UploadFile = File(...),
     mode: str = Form(...),
-) -> JSONResponse:
+    explain: bool = False,
+    plan: bool = False,
+) -> Response:
+    hook = ExplainHook() if explain else None
+    upload_bytes = _upload_bytes(old_schema_file, new_schema_file)
+
+    async def evaluate(reservation: Reservation) -> Evaluation:
+        return await _evaluate_uploads(
+            request,
+            old_schema_file,
+            new_schema_file,
+            mode,
+            hook=hook,
+            reservation=reservation,
+            upload_bytes=upload_bytes,
+            with_plan=plan,
+        )
+
+    return await _respond(request, "compare", upload_bytes, hook, evaluate)
+
+
+@app.post("/compare/json")
+async def compare_json(request: Request, explain: bool = False, plan: bool = False) -> Response:
+    # Same report as /compare, but both schemas arrive inline as
+    # {"oldSchema": ..., "newSchema": ..., "mode": ...}, optionally gzip/zstd encoded.
+    hook = ExplainHook() if explain else None
+    content_encoding = request.headers.get("content-encoding", "")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and not content_encoding:
+        upload_bytes = min(int(content_length), MAX_COMPARE_BODY_BYTES)
+    else:
+        upload_bytes = MAX_COMPARE_BODY_BYTES
+
+    async def evaluate(reservation: Reservation) -> Evaluation:
+        body, body_errors = await load_compare_body(request.stream(), content_encoding)
+        if body_errors:
+            return Evaluation(_error_status_code(body_errors), body_errors)
+        try:
+            normalized_mode = normalize_mode(body["mode"])
+        except ValueError as exc:
+            return Evaluation(400, [_invalid_mode_issue(body["mode"], exc)])
+        return await _evaluate_schemas(
+            request,
+            body["oldSchema"],
+            body["newSchema"],
+            normalized_mode,
+            hook=hook,
+            reservation=reservation,
+            upload_bytes=upload_bytes,
+            with_plan=plan,
+        )
+
+    return await _respond(request, "compare_json", upload_bytes, hook, evaluate)
+
+
+async def _evaluate_uploads(
+    request: Request,
+    old_schema_file: UploadFile,
+    new_schema_file: UploadFile,
+    mode: str,
+    *,
+    hook: ExplainHook | None = None,
+    reservation: Reservation | None = None,
+    upload_bytes: int = 0,
+    with_plan: bool = False,
+) -> Evaluation:
     try:
         normalized_mode = normalize_mode(mode)
     except ValueError as exc:
-        payload = build_report(
-            [
-                issue(
-                    path="mode",
-                    issue_type="INVALID_MODE",
-                    writer_type=mode,
-                    reader_type="backward|forward|full",
-                    description=str(exc),
-                )
-            ]
+        return Evaluation(
+            400,
+            [_invalid_mode_issue(mode, exc)],
         )
-        return JSONResponse(status_code=400, content=payload)
 
     old_schema, old_errors = await load_schema_upload(old_schema_file, "OldSchema")
     if old_errors:
-        return JSONResponse(status_code=_error_status_code(old_errors), content=build_report(old_errors))
+        return Evaluation(_error_status_code(old_errors), old_errors)
 
     new_schema, new_errors = await load_schema_upload(new_schema_file, "NewSchema")
     if new_errors:
-        return JSONResponse(status_code=_error_status_code(new_errors), content=build_report(new_errors))
+        return Evaluation(_error_status_code(new_errors), new_errors)
+
+    return await _evaluate_schemas(
+        request,
+        old_schema,
+        new_schema,
+        normalized_mode,
+        hook=hook,
+        reservation=reservation,
+        upload_bytes=upload_bytes,
+        with_plan=with_plan,
+    )
+
+
+async def _evaluate_schemas(
+    request: Request,
+    old_schema: Any,
+    new_schema: Any,
+    mode: str,
+    *,
+    hook: ExplainHook | None,
+    reservation: Reservation | None,
+    upload_bytes: int,
+    with_plan: bool = False,
+) -> Evaluation:
+    with phase("fingerprint"):
+        old_fingerprint = schema_fingerprint(old_schema)
+        new_fingerprint = schema_fingerprint(new_schema)
+    evaluation = Evaluation(
+        200, old_fingerprint=old_fingerprint, new_fingerprint=new_fingerprint, mode=mode, with_plan=with_plan
+    )
+
+    # The ETag is a pure function of the inputs, so a match needs no validation or comparison.
+    if hook is None and _matches_etag(request.headers.get("if-none-match"), _current_etag(request, evaluation)):
+        evaluation.status_code = 304
+        return evaluation
+
+    # Admit the compiled size before compiling: counted afterwards, it would admit nothing.
+    if reservation is not None:
+        await reservation.resize(
+            estimate_request_bytes(upload_bytes, json_node_count(old_schema) + json_node_count(new_schema))
+        )
 
-    old_validation_errors = validate_avro_schema(old_schema, "OldSchema")
+    old_registry, old_validation_errors = compile_schema(old_schema, "OldSchema", old_fingerprint)
     if old_validation_errors:
-        return JSONResponse(status_code=400, content=build_report(old_validation_errors))
+        return Evaluation(400, old_validation_errors)
 
-    new_validation_errors = validate_avro_schema(new_schema, "NewSchema")
+    new_registry, new_validation_errors = compile_schema(new_schema, "NewSchema", new_fingerprint)
     if new_validation_errors:
-        return JSONResponse(status_code=400, content=build_report(new_validation_errors))
+        return Evaluation(400, new_validation_errors)
+
+    evaluation.errors = compare_compiled(
+        old_registry,
+        new_registry,
+        old_fingerprint=old_fingerprint,
+        new_fingerprint=new_fingerprint,
+        mode=mode,
+        hook=hook,
+    )
+    if with_plan:
+        with phase("plan"):
+            evaluation.plan = build_resolution_plan(old_registry, new_registry, mode)
+    return evaluation
+
+
+@app.api_route("/compare/verdict", methods=["GET", "HEAD"])
+async def compare_verdict(
+    old: str = Query(..., description="Old schema fingerprint (X-Old-Schema-Fingerprint)"),
+    new: str = Query(..., description="New schema fingerprint (X-New-Schema-Fingerprint)"),
+    mode: str = Query(...),
+) -> Response:
+    try:
+        normalized_mode = normalize_mode(mode)
+    except ValueError as exc:
+        return JSONResponse(
+            status_code=400,
+            content=build_report([_invalid_mode_issue(mode, exc)]),
+        )
+
+    errors = cached_verdict(old, new, normalized_mode)
+    if errors is None:
+        return JSONResponse(
+            status_code=404,
+            content=build_report(
+                [
+                    issue(
+                        path="verdict",
+                        issue_type="VERDICT_UNKNOWN",
+                        writer_type=old,
+                        reader_type=new,
+                        description="No cached verdict for these fingerprints; POST /compare with the schemas.",
+                    )
+                ]
+            ),
+        )
+
+    headers = {
+        "ETag": verdict_etag(old, new, normalized_mode),
+        "X-Schema-Compatible": "true" if not errors else "false",
+        "X-Total-Errors": str(len(errors)),
+    }
+    return JSONResponse(content={"compatible": not errors, "totalErrors": len(errors)}, headers=headers)
+
+
+@app.post("/compare/batch")
+async def compare_batch(request: Request) -> Response:
+    # Many pairs per request; one NDJSON line per pair in completion order, then a batch summary.
+    content_encoding = request.headers.get("content-encoding", "")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and not content_encoding:
+        upload_bytes = min(int(content_length), MAX_BATCH_BODY_BYTES)
+    else:
+        upload_bytes = MAX_BATCH_BODY_BYTES
+
+    reservation = MEMORY_BUDGET.admit(estimate_request_bytes(upload_bytes))
+    handed_off = False
+    with collect_timings() as timings:
+        try:
+            await reservation.__aenter__()
+            body, body_errors = await load_json_body(request.stream(), content_encoding, MAX_BATCH_BODY_BYTES)
+            if not body_errors:
+                batch, body_errors = parse_batch_request(body)
+            if not body_errors:
+                # Held until the response has been sent, not just until this handler returns.
+                response = _ReservedStreamingResponse(
+                    _iter_batch(batch), reservation, timings, media_type=NDJSON_MEDIA_TYPE
+                )
+                handed_off = True
+                return response
+            status_code = _error_status_code(body_errors)
+            headers = None
+        except MemoryBudgetExceeded as exc:
+            MEMORY_REJECTIONS.inc()
+            body_errors = [_memory_budget_issue(exc)]
+            status_code = 503
+            headers = {"Retry-After": str(RETRY_AFTER_SECONDS)}
+        finally:
+            if not handed_off:
+                await reservation.__aexit__(None, None, None)
+    observe_request("compare_batch", status_code, timings)
+    return JSONResponse(status_code=status_code, content=build_report(body_errors), headers=headers)
+
+
+async def _iter_batch(batch: BatchRequest) -> AsyncIterator[bytes]:
+    stats = BatchStats()
+    async for result in run_batch(batch, stats):
+        yield (json.dumps(result, separators=(",", ":")) + "\n").encode("utf-8")
+    yield (json.dumps({"batch": stats.as_dict()}, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _ReservedStreamingResponse(StreamingResponse):
+    # Releases the memory reservation however sending ends: completed, client gone, or the
+    # body never iterated at all.
+    def __init__(
+        self, content: AsyncIterator[bytes], reservation: Reservation, timings: RequestTimings, **kwargs: Any
+    ):
+        super().__init__(content, **kwargs)
+        self.reservation = reservation
+        self.timings = timings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.reservation.__aexit__(None, None, None)
+            observe_request("compare_batch", 200, self.timings)
+
+
+def _job_not_found(job_id: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=404,
+        content=build_report(
+            [
+                issue(
+                    path="job",
+                    issue_type="JOB_NOT_FOUND",
+                    writer_type=job_id,
+                    reader_type="known-job",
+                    description="Unknown job id, or the job finished and its result expired.",
+                )
+            ]
+        ),
+    )
+
+
+@app.post("/jobs")
+async def submit_job(request: Request) -> Response:
+    content_encoding = request.headers.get("content-encoding", "")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and not content_encoding:
+        upload_bytes = min(int(content_length), MAX_JOB_BODY_BYTES)
+    else:
+        upload_bytes = MAX_JOB_BODY_BYTES
+
+    # A queued job keeps its schemas in memory, so the job, not this handler, ends the reservation.
+    reservation = MEMORY_BUDGET.admit(estimate_request_bytes(upload_bytes))
+    handed_off = False
+    with collect_timings() as timings:
+        try:
+            await reservation.__aenter__()
+            body, body_errors = await load_json_body(request.stream(), content_encoding, MAX_JOB_BODY_BYTES)
+            if not body_errors:
+                job_request, body_errors = parse_job_request(body)
+            if body_errors:
+                response = JSONResponse(status_code=_error_status_code(body_errors), content=build_report(body_errors))
+            else:
+                job = JOB_MANAGER.submit(job_request, reservation)
+                handed_off = True
+                response = JSONResponse(status_code=202, content=job.as_dict(), headers={"Location": f"/jobs/{job.id}"})
+        except MemoryBudgetExceeded as exc:
+            MEMORY_REJECTIONS.inc()
+            response = JSONResponse(
+                status_code=503,
+                content=build_report([_memory_budget_issue(exc)]),
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        except JobQueueFull as exc:
+            response = JSONResponse(
+                status_code=429,
+                content=build_report(
+                    [
+                        issue(
+                            path="request",
+                            issue_type="JOB_QUEUE_FULL",
+                            writer_type="job",
+                            reader_type=f"<= {JOB_MANAGER.queue_limit} queued jobs",
+                            description=str(exc),
+                        )
+                    ]
+                ),
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        finally:
+            if not handed_off:
+                await reservation.__aexit__(None, None, None)
+
+    observe_request("jobs", response.status_code, timings)
+    response.headers["Server-Timing"] = timings.server_timing_header()
+    return response
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Response:
+    job = JOB_MANAGER.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return JSONResponse(content=job.as_dict())
+
 
-    errors = check_compatibility(old_schema=old_schema, new_schema=new_schema, mode=normalized_mode)
-    return JSONResponse(status_code=200, content=build_report(errors))
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str) -> Response:
+    job = JOB_MANAGER.cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return JSONResponse(status_code=202, content=job.as_dict())
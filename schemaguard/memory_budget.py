@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from types import TracebackType
+
+from schemaguard.instrumentation import MEMORY_IN_FLIGHT, REQUEST_ESTIMATED_BYTES
+
+
+# Bytes a request holds per uploaded byte: raw chunks, the joined payload, the decoded
+# str, the parsed dict and fastavro's parsed schema (calibrated with tracemalloc on the
+# synthetic benchmark schemas).
+UPLOAD_AMPLIFICATION = 16
+# Bytes per compiled schema node for the two registries and per-node comparison state.
+BYTES_PER_NODE = 1024
+
+DEFAULT_BUDGET_BYTES = int(os.environ.get("SCHEMAGUARD_MEMORY_BUDGET_BYTES", str(512 * 1024 * 1024)))
+DEFAULT_QUEUE_SECONDS = float(os.environ.get("SCHEMAGUARD_MEMORY_QUEUE_SECONDS", "5"))
+
+
+class MemoryBudgetExceeded(Exception):
+    pass
+
+
+def estimate_request_bytes(upload_bytes: int, node_count: int = 0) -> int:
+    return upload_bytes * UPLOAD_AMPLIFICATION + node_count * BYTES_PER_NODE
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes: int = DEFAULT_BUDGET_BYTES, queue_seconds: float = DEFAULT_QUEUE_SECONDS):
+        self.limit_bytes = limit_bytes
+        self.queue_seconds = queue_seconds
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def try_reserve(self, nbytes: int) -> bool:
+        with self._lock:
+            if self.in_use + nbytes > self.limit_bytes:
+                return False
+            self.in_use += nbytes
+            MEMORY_IN_FLIGHT.set(self.in_use)
+            return True
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self.in_use -= nbytes
+            MEMORY_IN_FLIGHT.set(self.in_use)
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        # Wake every waiter; each one re-checks whether its reservation fits now.
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    async def reserve(self, nbytes: int, already_held: int = 0) -> None:
+        if already_held + nbytes > self.limit_bytes:
+            raise MemoryBudgetExceeded(
+                f"Request needs an estimated {already_held + nbytes} bytes, "
+                f"more than the {self.limit_bytes} byte memory budget."
+            )
+        deadline = time.monotonic() + self.queue_seconds
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = loop.create_future()
+            with self._lock:
+                if self.in_use + nbytes <= self.limit_bytes:
+                    self.in_use += nbytes
+                    MEMORY_IN_FLIGHT.set(self.in_use)
+                    return
+                self._waiters.append((loop, waiter))
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                raise MemoryBudgetExceeded(
+                    f"Memory budget of {self.limit_bytes} bytes stayed exhausted for {self.queue_seconds:g}s."
+                ) from None
+
+    def admit(self, nbytes: int) -> Reservation:
+        return Reservation(self, nbytes)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class Reservation:
+    def __init__(self, budget: MemoryBudget, nbytes: int):
+        self.budget = budget
+        self.nbytes = nbytes
+        self.held = 0
+
+    async def __aenter__(self) -> Reservation:
+        await self.budget.reserve(self.nbytes)
+        self.held = self.nbytes
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.release()
+
+    def release(self) -> None:
+        # Synchronous and idempotent, so a worker thread can end a reservation handed to it.
+        if self.held:
+            REQUEST_ESTIMATED_BYTES.observe(self.held)
+            self.budget.release(self.held)
+            self.held = 0
+
+    async def resize(self, nbytes: int) -> None:
+        # Only growth needs admission; the refined estimate replaces the upload-size guess.
+        extra = nbytes - self.held
+        if extra <= 0:
+            return
+        if self.budget.try_reserve(extra):
+            self.held = nbytes
+            return
+        # Waiting while holding would let concurrent growers block each other until all time
+        # out, so the current share goes back and the whole estimate queues like a new request.
+        held, self.held = self.held, 0
+        self.budget.release(held)
+        await self.budget.reserve(nbytes)
+        self.held = nbytes
+
+
+MEMORY_BUDGET = MemoryBudget()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from schemaguard.compatibility_engine import CompatibilityEngine, SchemaRegistry
+from schemaguard.reporter import CompatibilityIssue
+
+
+# Splits one giant comparison across processes: the root record's reader fields become
+# contiguous shards, and a field holding a large writer union is split by branch range.
+# Workers receive both schemas once, as compact JSON in the pool initializer, and build
+# their own registries; tasks only carry (direction, field range, branch range).
+
+SHARD_WORKERS = int(os.environ.get("SCHEMAGUARD_SHARD_WORKERS", "0"))
+# Below this many cost units (about a second of single-process work), process start-up
+# costs more than it saves.
+SHARD_MIN_UNITS = int(os.environ.get("SCHEMAGUARD_SHARD_MIN_UNITS", "100000"))
+UNION_SHARD_MIN_BRANCHES = 64
+SHARDS_PER_WORKER = 4
+
+_worker_registries: dict[str, SchemaRegistry] = {}
+
+
+@dataclass(frozen=True)
+class Shard:
+    direction: str
+    fields: tuple[int, int]
+    branches: tuple[int, int] | None = None
+
+
+def directions_for(mode: str) -> list[str]:
+    mode_clean = mode.strip().lower()
+    return [direction for direction in ("backward", "forward") if mode_clean in {direction, "full"}]
+
+
+def _engine(direction: str, old_registry: SchemaRegistry, new_registry: SchemaRegistry) -> CompatibilityEngine:
+    if direction == "backward":
+        return CompatibilityEngine(None, None, "backward", writer_registry=old_registry, reader_registry=new_registry)
+    return CompatibilityEngine(None, None, "forward", writer_registry=new_registry, reader_registry=old_registry)
+
+
+def _union_size(node: Any) -> int:
+    if isinstance(node, list):
+        return len(node)
+    if isinstance(node, dict) and isinstance(node.get("type"), list):
+        return len(node["type"])
+    return 1
+
+
+def _chunks(start: int, end: int, size: int) -> list[tuple[int, int]]:
+    return [(low, min(low + size, end)) for low in range(start, end, size)]
+
+
+def plan_shards(
+    old_registry: SchemaRegistry,
+    new_registry: SchemaRegistry,
+    mode: str,
+    workers: int,
+) -> list[Shard] | None:
+    shards: list[Shard] = []
+    for direction in directions_for(mode):
+        engine = _engine(direction, old_registry, new_registry)
+        records = engine.root_records()
+        if records is None:
+            return None
+        writer_record, reader_record = records
+        writer_fields = engine.fields_by_name(writer_record)
+        reader_fields = list(engine.fields_by_name(reader_record).items())
+
+        # Cost units per reader field: a writer union is compared branch by branch against
+        # the reader union, so it weighs writer branches x reader branches.
+        weights = []
+        branch_costs = []
+        for field_name, reader_field in reader_fields:
+            writer_field = writer_fields.get(field_name)
+            writer_branches = _union_size(writer_field.get("type")) if writer_field is not None else 1
+            branch_costs.append(_union_size(reader_field.get("type")))
+            weights.append(writer_branches * branch_costs[-1])
+        if sum(weights) < SHARD_MIN_UNITS:
+            return None
+
+        target = max(1, sum(weights) // (workers * SHARDS_PER_WORKER))
+        start = 0
+        load = 0
+        for index, weight in enumerate(weights):
+            writer_branches = weight // branch_costs[index]
+            if writer_branches >= UNION_SHARD_MIN_BRANCHES and weight > target:
+                if start < index:
+                    shards.append(Shard(direction, (start, index)))
+                for branches in _chunks(0, writer_branches, max(1, target // branch_costs[index])):
+                    shards.append(Shard(direction, (index, index + 1), branches))
+                start, load = index + 1, 0
+                continue
+            load += weight
+            if load >= target:
+                shards.append(Shard(direction, (start, index + 1)))
+                start, load = index + 1, 0
+        if start < len(weights):
+            shards.append(Shard(direction, (start, len(weights))))
+    return shards
+
+
+def _init_worker(old_json: bytes, new_json: bytes) -> None:
+    _worker_registries["old"] = SchemaRegistry(json.loads(old_json))
+    _worker_registries["new"] = SchemaRegistry(json.loads(new_json))
+
+
+def _run_shard(shard: Shard) -> list[CompatibilityIssue]:
+    engine = _engine(shard.direction, _worker_registries["old"], _worker_registries["new"])
+    return engine.run_shard(shard.fields, shard.branches)
+
+
+def check_compatibility_sharded(
+    old_registry: SchemaRegistry,
+    new_registry: SchemaRegistry,
+    mode: str,
+    *,
+    workers: int,
+) -> list[CompatibilityIssue] | None:
+    shards = plan_shards(old_registry, new_registry, mode, workers)
+    if not shards or len(shards) < 2:
+        return None
+
+    # Loaded on first use so importing the service never pulls in multiprocessing.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        old_json = json.dumps(old_registry.schema, separators=(",", ":")).encode("utf-8")
+        new_json = json.dumps(new_registry.schema, separators=(",", ":")).encode("utf-8")
+    except RecursionError:
+        # Too deep to ship to workers as JSON; the in-process engine copes up to MAX_NESTING_DEPTH.
+        return None
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)),
+        # The server runs job and request threads; forking them mid-flight is not safe.
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(old_json, new_json),
+    ) as pool:
+        # map() yields in submission order, so issues come back exactly as a single run orders them.
+        results = pool.map(_run_shard, shards, chunksize=1)
+        errors: list[CompatibilityIssue] = []
+        for shard_errors in results:
+            errors.extend(shard_errors)
+    return errors
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import copy
+import io
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from schemaguard.parallel import directions_for
+from schemaguard.reporter import CompatibilityIssue, issue
+
+
+# Empirical check next to the static rules: records written with one schema (sampled from
+# Avro object container files, or generated from the writer schema) are decoded with the
+# other through fastavro's schema resolution. Work is cut into chunks of raw record bytes or
+# generator seeds, so a process pool never needs more than the schemas and one chunk.
+
+REPLAY_SAMPLES = 1000  # generated records per direction when no data files are given
+REPLAY_MAX_RECORDS = 100_000  # records read from data files per direction
+REPLAY_CHUNK_RECORDS = 500
+# Failures per chunk traced back to a field path; further ones reuse the path of a
+# failure with the same message, or fall back to the root.
+LOCALIZE_PER_CHUNK = 8
+
+_worker_schemas: dict[str, Any] = {}
+_worker_parsed: dict[str, Any] = {}
+
+
+class ReplayUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ReplayChunk:
+    direction: str
+    source: str
+    writer: str  # key into the worker schemas: "old", "new" or "file:<n>"
+    reader: str
+    first: int
+    count: int
+    seed: int | None = None
+    payload: bytes | None = None
+
+
+@dataclass
+class ChunkResult:
+    chunk: ReplayChunk
+    records: int
+    failures: list[tuple[int, str, str]]  # (record index, path, "ErrorType: message")
+
+
+@dataclass
+class ReplayReport:
+    issues: list[CompatibilityIssue] = field(default_factory=list)
+    records: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+    truncated: bool = False
+    sources: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "records": self.records,
+            "failures": self.failures,
+            "seconds": round(self.seconds, 3),
+            "recordsPerSecond": round(self.records / self.seconds) if self.seconds else None,
+            "truncated": self.truncated,
+            "sources": self.sources,
+        }
+
+
+def _fastavro() -> Any:
+    try:
+        import fastavro
+        import fastavro.utils
+    except Exception as exc:  # pragma: no cover
+        raise ReplayUnavailable("Replay verification needs fastavro (pip install fastavro).") from exc
+    return fastavro
+
+
+def root_path(schema: Any) -> str:
+    # Same root label as CompatibilityEngine.root_path(), so replay and static issues line up.
+    if isinstance(schema, dict) and isinstance(schema.get("name"), str):
+        return schema["name"].rsplit(".", 1)[-1]
+    return "RootSchema"
+
+
+def _writer_for(direction: str) -> tuple[str, str]:
+    return ("old", "new") if direction == "backward" else ("new", "old")
+
+
+def read_file_schemas(paths: list[str]) -> dict[str, Any]:
+    fastavro = _fastavro()
+    schemas: dict[str, Any] = {}
+    for index, path in enumerate(paths):
+        with open(path, "rb") as handle:
+            schemas[f"file:{index}"] = fastavro.reader(handle).writer_schema
+    return schemas
+
+
+def plan_chunks(
+    paths: list[str],
+    mode: str,
+    *,
+    samples: int,
+    max_records: int,
+    chunk_records: int,
+    seed: int,
+) -> Iterator[ReplayChunk]:
+    # Lazy: data files are read block by block only as fast as the pool consumes chunks.
+    for direction in directions_for(mode):
+        writer, reader = _writer_for(direction)
+        for first in range(0, samples, chunk_records):
+            count = min(chunk_records, samples - first)
+            yield ReplayChunk(direction, "generated", writer, reader, first, count, seed=seed + first)
+        remaining = max_records
+        for index, path in enumerate(paths):
+            if remaining <= 0:
+                break
+            for chunk in _file_chunks(path, f"file:{index}", direction, reader, remaining, chunk_records):
+                remaining -= chunk.count
+                yield chunk
+
+
+def _file_chunks(
+    path: str,
+    writer: str,
+    direction: str,
+    reader: str,
+    limit: int,
+    chunk_records: int,
+) -> Iterator[ReplayChunk]:
+    fastavro = _fastavro()
+    pending: list[bytes] = []
+    pending_records = 0
+    first = 0
+    with open(path, "rb") as handle:
+        # block_reader decompresses each block; blocks hold whole records, so their bytes concatenate.
+        for block in fastavro.block_reader(handle):
+            if first + pending_records >= limit:
+                break
+            take = min(block.num_records, limit - first - pending_records)
+            if take < block.num_records:
+                block_bytes = _leading_records(block.bytes_.getvalue(), writer_schema=block.writer_schema, count=take)
+            else:
+                block_bytes = block.bytes_.getvalue()
+            pending.append(block_bytes)
+            pending_records += take
+            if pending_records >= chunk_records:
+                yield ReplayChunk(direction, path, writer, reader, first, pending_records, payload=b"".join(pending))
+                first += pending_records
+                pending, pending_records = [], 0
+    if pending_records:
+        yield ReplayChunk(direction, path, writer, reader, first, pending_records, payload=b"".join(pending))
+
+
+def _leading_records(data: bytes, *, writer_schema: Any, count: int) -> bytes:
+    fastavro = _fastavro()
+    buffer = io.BytesIO(data)
+    for _ in range(count):
+        fastavro.schemaless_reader(buffer, writer_schema, None)
+    return data[: buffer.tell()]
+
+
+def init_worker(schemas_json: bytes) -> None:
+    _worker_schemas.clear()
+    _worker_parsed.clear()
+    _worker_schemas.update(json.loads(schemas_json))
+
+
+def _parsed(key: str) -> Any:
+    if key not in _worker_parsed:
+        _worker_parsed[key] = _fastavro().parse_schema(_worker_schemas[key])
+    return _worker_parsed[key]
+
+
+def _project(schema: dict[str, Any], names: list[str]) -> dict[str, Any]:
+    # Reader schema that keeps only the field path `names`; the writer's other fields are skipped.
+    projected = copy.deepcopy(schema)
+    node = projected
+    for name in names:
+        node["fields"] = [entry for entry in node["fields"] if entry.get("name") == name]
+        node = node["fields"][0]["type"]
+    return projected
+
+
+def _fails(record: bytes, writer: Any, reader: dict[str, Any]) -> bool:
+    fastavro = _fastavro()
+    try:
+        parsed_reader = fastavro.parse_schema(reader)
+    except Exception:
+        # Dropping fields can drop a named type another field still references.
+        return False
+    try:
+        fastavro.schemaless_reader(io.BytesIO(record), writer, parsed_reader)
+    except Exception:
+        return True
+    return False
+
+
+def localize(record: bytes, writer: Any, reader_schema: Any, root: str) -> str:
+    # Narrow the reader one field at a time until no single field reproduces the failure.
+    names: list[str] = []
+    node = reader_schema
+    while isinstance(node, dict) and node.get("type") == "record":
+        for entry in node.get("fields", []):
+            if _fails(record, writer, _project(reader_schema, names + [entry["name"]])):
+                names.append(entry["name"])
+                node = entry["type"]
+                break
+        else:
+            break
+    return ".".join([root, *names])
+
+
+def replay_chunk(chunk: ReplayChunk) -> ChunkResult:
+    fastavro = _fastavro()
+    writer = _parsed(chunk.writer)
+    reader = _parsed(chunk.reader)
+    reader_schema = _worker_schemas[chunk.reader]
+    root = root_path(_worker_schemas[chunk.writer])
+
+    if chunk.payload is None:
+        # fastavro's generator draws from the global RNG, so seed it and put the caller's state back:
+        # replay runs in-process when workers <= 1.
+        state = random.getstate()
+        random.seed(chunk.seed)
+        try:
+            records = []
+            for datum in fastavro.utils.generate_many(writer, chunk.count):
+                buffer = io.BytesIO()
+                fastavro.schemaless_writer(buffer, writer, datum)
+                records.append(buffer.getvalue())
+        finally:
+            random.setstate(state)
+        stream = io.BytesIO(b"".join(records))
+    else:
+        stream = io.BytesIO(chunk.payload)
+
+    failures: list[tuple[int, str, str]] = []
+    paths_by_message: dict[str, str] = {}
+    for offset in range(chunk.count):
+        start = stream.tell()
+        try:
+            fastavro.schemaless_reader(stream, writer, reader)
+            continue
+        except Exception as exc:
+            message = f"{type(exc).__name__}: {exc}"
+        # Re-read with the writer alone to find where this record ends.
+        stream.seek(start)
+        try:
+            fastavro.schemaless_reader(stream, writer, None)
+        except Exception as exc:
+            # Corrupt for its own writer too: where the next record starts is unknown, so report
+            # this one and stop the chunk here.
+            failures.append(
+                (chunk.first + offset, root, f"{message} (undecodable with the writer schema: {type(exc).__name__})")
+            )
+            return ChunkResult(chunk, offset + 1, failures)
+        record = stream.getvalue()[start : stream.tell()]
+        path = paths_by_message.get(message)
+        if path is None:
+            path = localize(record, writer, reader_schema, root) if len(paths_by_message) < LOCALIZE_PER_CHUNK else root
+            paths_by_message[message] = path
+        failures.append((chunk.first + offset, path, message))
+    return ChunkResult(chunk, chunk.count, failures)
+
+
+def _results(
+    chunks: Iterator[ReplayChunk],
+    schemas_json: bytes,
+    workers: int,
+    deadline: float,
+    report: ReplayReport,
+) -> Iterator[ChunkResult]:
+    if workers <= 1:
+        init_worker(schemas_json)
+        for chunk in chunks:
+            if time.monotonic() > deadline:
+                report.truncated = True
+                return
+            yield replay_chunk(chunk)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(schemas_json,),
+    ) as pool:
+        # A small window of chunks in flight keeps memory flat however large the data files are.
+        in_flight = []
+        for chunk in chunks:
+            if time.monotonic() > deadline:
+                report.truncated = True
+                break
+            in_flight.append(pool.submit(replay_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.pop(0).result()
+        for future in in_flight:
+            yield future.result()
+
+
+def replay(
+    old_schema: Any,
+    new_schema: Any,
+    mode: str,
+    *,
+    data_files: list[str] | None = None,
+    samples: int | None = None,
+    max_records: int = REPLAY_MAX_RECORDS,
+    chunk_records: int = REPLAY_CHUNK_RECORDS,
+    max_seconds: float | None = None,
+    workers: int = 0,
+    seed: int = 0,
+) -> ReplayReport:
+    paths = [str(Path(path)) for path in data_files or []]
+    if samples is None:
+        samples = 0 if paths else REPLAY_SAMPLES
+    schemas = {"old": old_schema, "new": new_schema, **read_file_schemas(paths)}
+    schemas_json = json.dumps(schemas, separators=(",", ":")).encode("utf-8")
+    chunks = plan_chunks(paths, mode, samples=samples, max_records=max_records, chunk_records=chunk_records, seed=seed)
+
+    report = ReplayReport()
+    started = time.monotonic()
+    deadline = started + max_seconds if max_seconds is not None else float("inf")
+    # (direction, writer, path, error type) -> [failures, first record, first message, source]
+    grouped: dict[tuple[str, str, str, str], list[Any]] = {}
+    for result in _results(chunks, schemas_json, workers, deadline, report):
+        chunk = result.chunk
+        source_key = f"{chunk.direction}:{chunk.source}"
+        report.sources[source_key] = report.sources.get(source_key, 0) + result.records
+        report.records += result.records
+        report.failures += len(result.failures)
+        for record_index, path, message in result.failures:
+            key = (chunk.direction, chunk.writer, path, message.split(":", 1)[0])
+            entry = grouped.setdefault(key, [0, record_index, message, chunk.source])
+            entry[0] += 1
+    report.seconds = time.monotonic() - started
+
+    for (direction, writer, path, _), (count, record_index, message, source) in grouped.items():
+        records = report.sources[f"{direction}:{source}"]
+        report.issues.append(
+            issue(
+                path=path,
+                issue_type="REPLAY_DECODE_FAILED",
+                writer_type=writer if writer in {"old", "new"} else source,
+                reader_type=_writer_for(direction)[1],
+                description=(
+                    f"{direction}: {count} of {records} {source} records failed to decode; "
+                    f"first was record {record_index}: {message}"
+                ),
+            )
+        )
+    return report
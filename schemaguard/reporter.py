@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import json
 from dataclasses import asdict, dataclass
+from typing import Any, Iterator
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_LINES_PER_CHUNK = 512
 
 
 @dataclass(frozen=True)
@@ -38,3 +44,14 @@ def build_report(errors: list[CompatibilityIssue]) -> dict:
         "errors": [asdict(e) for e in errors],
     }
 
+
+def iter_report_ndjson(errors: list[CompatibilityIssue], extra: dict[str, Any] | None = None) -> Iterator[bytes]:
+    # First line: the report without its error list; then one issue per line, so clients
+    # can render incrementally and the server never builds the whole document at once.
+    header: dict[str, Any] = {"compatible": not errors, "totalErrors": len(errors)}
+    if extra:
+        header.update(extra)
+    yield (json.dumps(header) + "\n").encode("utf-8")
+    for start in range(0, len(errors), NDJSON_LINES_PER_CHUNK):
+        chunk = errors[start : start + NDJSON_LINES_PER_CHUNK]
+        yield "".join(json.dumps(asdict(e)) + "\n" for e in chunk).encode("utf-8")
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from typing import Any
+
+from schemaguard.compatibility_engine import CompatibilityEngine, SchemaRegistry
+from schemaguard.parallel import directions_for
+from schemaguard.rules import logical_type, primitive_compatible, type_label
+
+
+# Serializable writer->reader resolution plan: everything a decoder would otherwise work out
+# from both schemas at runtime. Record plans are keyed "writer fullname=>reader fullname",
+# so recursive types refer to themselves by key. Actions:
+#   {"kind": "primitive", "type": T[, "promote": R]}
+#   {"kind": "record", "plan": key}
+#   {"kind": "array", "items": action} / {"kind": "map", "values": action}
+#   {"kind": "enum", "symbolMap": [reader index | null per writer symbol][, "default": reader index]}
+#   {"kind": "fixed", "size": N}
+#   {"kind": "union", "branches": [reader index | null per writer branch], "resolve": [action | null]}
+#   {"kind": "fromUnion", "resolve": [action per writer branch]}   (writer union, reader not)
+#   {"kind": "toUnion", "branch": reader index, "resolve": action}   (reader union, writer not)
+#   {"kind": "error", "writer": label, "reader": label}
+
+PLAN_VERSION = 1
+
+
+class ResolutionPlanner(CompatibilityEngine):
+    # Reuses the engine's name resolution and cached union-branch verdicts; issues are still
+    # reported by the regular run, the planner only records how each pair resolves.
+
+    def __init__(self, writer_registry: SchemaRegistry, reader_registry: SchemaRegistry, direction: str):
+        super().__init__(None, None, direction, writer_registry=writer_registry, reader_registry=reader_registry)
+        self.records: dict[str, dict[str, Any]] = {}
+        self.unresolved = 0
+
+    def plan(self) -> dict[str, Any]:
+        root = self._action(self.writer_registry.schema, self.reader_registry.schema, None, None)
+        return {"compatible": self.unresolved == 0, "root": root, "records": self.records}
+
+    def _error(self, writer_node: Any, reader_node: Any) -> dict[str, Any]:
+        self.unresolved += 1
+        return {"kind": "error", "writer": type_label(writer_node), "reader": type_label(reader_node)}
+
+    def _compatible(self, writer_node: Any, reader_node: Any, writer_ns: str | None, reader_ns: str | None) -> bool:
+        return self._branch_compatible(
+            path="plan",
+            writer_node=writer_node,
+            reader_node=reader_node,
+            writer_namespace=writer_ns,
+            reader_namespace=reader_ns,
+        )
+
+    def _action(self, writer_node: Any, reader_node: Any, writer_ns: str | None, reader_ns: str | None) -> dict[str, Any]:
+        writer_union = self._as_union(writer_node)
+        reader_union = self._as_union(reader_node)
+        if writer_union is not None and reader_union is not None:
+            branches: list[int | None] = []
+            resolve: list[dict[str, Any] | None] = []
+            for writer_branch in writer_union:
+                # Avro picks the first reader branch that matches.
+                match = next(
+                    (
+                        index
+                        for index, reader_branch in enumerate(reader_union)
+                        if self._compatible(writer_branch, reader_branch, writer_ns, reader_ns)
+                    ),
+                    None,
+                )
+                branches.append(match)
+                self.unresolved += match is None
+                resolve.append(
+                    None if match is None else self._action(writer_branch, reader_union[match], writer_ns, reader_ns)
+                )
+            return {"kind": "union", "branches": branches, "resolve": resolve}
+        if writer_union is not None:
+            return {
+                "kind": "fromUnion",
+                "resolve": [self._action(branch, reader_node, writer_ns, reader_ns) for branch in writer_union],
+            }
+        if reader_union is not None:
+            for index, reader_branch in enumerate(reader_union):
+                if self._compatible(writer_node, reader_branch, writer_ns, reader_ns):
+                    return {
+                        "kind": "toUnion",
+                        "branch": index,
+                        "resolve": self._action(writer_node, reader_branch, writer_ns, reader_ns),
+                    }
+            return self._error(writer_node, reader_node)
+
+        writer_resolved, writer_ns = self.writer_registry.resolve_node(writer_node, writer_ns)
+        reader_resolved, reader_ns = self.reader_registry.resolve_node(reader_node, reader_ns)
+        if writer_resolved is None or reader_resolved is None:
+            return self._error(writer_node, reader_node)
+        if logical_type(writer_resolved) != logical_type(reader_resolved):
+            return self._error(writer_resolved, reader_resolved)
+
+        writer_kind = self._kind(writer_resolved)
+        reader_kind = self._kind(reader_resolved)
+        if writer_kind == "primitive" and reader_kind == "primitive":
+            writer_primitive = self._primitive_name(writer_resolved)
+            reader_primitive = self._primitive_name(reader_resolved)
+            if not primitive_compatible(writer_primitive, reader_primitive):
+                return self._error(writer_resolved, reader_resolved)
+            action = {"kind": "primitive", "type": writer_primitive}
+            if reader_primitive != writer_primitive:
+                action["promote"] = reader_primitive
+            return action
+        if writer_kind != reader_kind:
+            return self._error(writer_resolved, reader_resolved)
+        if writer_kind in {"record", "enum", "fixed"} and not self._named_types_compatible(
+            writer_resolved, reader_resolved
+        ):
+            return self._error(writer_resolved, reader_resolved)
+
+        if writer_kind == "record":
+            return {"kind": "record", "plan": self._record_plan(writer_resolved, reader_resolved)}
+        if writer_kind == "array":
+            items = self._action(writer_resolved.get("items"), reader_resolved.get("items"), writer_ns, reader_ns)
+            return {"kind": "array", "items": items}
+        if writer_kind == "map":
+            values = self._action(writer_resolved.get("values"), reader_resolved.get("values"), writer_ns, reader_ns)
+            return {"kind": "map", "values": values}
+        if writer_kind == "enum":
+            reader_symbols = list(reader_resolved.get("symbols", []))
+            positions = {symbol: index for index, symbol in enumerate(reader_symbols)}
+            action = {
+                "kind": "enum",
+                "symbolMap": [positions.get(symbol) for symbol in writer_resolved.get("symbols", [])],
+            }
+            if reader_resolved.get("default") in positions:
+                action["default"] = positions[reader_resolved["default"]]
+            # The static rules reject removed symbols even when the reader has a default.
+            self.unresolved += None in action["symbolMap"]
+            return action
+        if writer_kind == "fixed" and writer_resolved.get("size") == reader_resolved.get("size"):
+            return {"kind": "fixed", "size": writer_resolved.get("size")}
+        return self._error(writer_resolved, reader_resolved)
+
+    def _record_plan(self, writer_record: dict[str, Any], reader_record: dict[str, Any]) -> str:
+        writer_name = self.writer_registry.node_name_info[id(writer_record)].fullname
+        reader_name = self.reader_registry.node_name_info[id(reader_record)].fullname
+        key = f"{writer_name}=>{reader_name}"
+        if key in self.records:
+            return key
+        plan: dict[str, Any] = {"writer": writer_name, "reader": reader_name}
+        # Registered before the fields are walked, so recursive references stop here.
+        self.records[key] = plan
+
+        writer_fields = [entry for entry in writer_record.get("fields", []) if isinstance(entry, dict)]
+        reader_fields = [entry for entry in reader_record.get("fields", []) if isinstance(entry, dict)]
+        reader_index = {entry.get("name"): index for index, entry in enumerate(reader_fields)}
+        writer_ns = self.writer_registry.namespace_for_node(writer_record)
+        reader_ns = self.reader_registry.namespace_for_node(reader_record)
+
+        field_map: list[int] = []
+        fields: list[dict[str, Any]] = []
+        for index, writer_field in enumerate(writer_fields):
+            target = reader_index.get(writer_field.get("name"), -1)
+            field_map.append(target)
+            if target >= 0:
+                fields.append(
+                    {
+                        "name": writer_field.get("name"),
+                        "writer": index,
+                        "reader": target,
+                        "resolve": self._action(
+                            writer_field.get("type"), reader_fields[target].get("type"), writer_ns, reader_ns
+                        ),
+                    }
+                )
+
+        written = {entry.get("name") for entry in writer_fields}
+        defaults = []
+        missing = []
+        for index, reader_field in enumerate(reader_fields):
+            if reader_field.get("name") in written:
+                continue
+            if "default" in reader_field:
+                defaults.append({"reader": index, "name": reader_field.get("name"), "value": reader_field["default"]})
+            else:
+                missing.append(reader_field.get("name"))
+
+        plan["fieldMap"] = field_map
+        plan["skip"] = [index for index, target in enumerate(field_map) if target < 0]
+        plan["defaults"] = defaults
+        plan["fields"] = fields
+        if missing:
+            plan["missing"] = missing
+            self.unresolved += len(missing)
+        return key
+
+
+def build_resolution_plan(old_registry: SchemaRegistry, new_registry: SchemaRegistry, mode: str) -> dict[str, Any]:
+    directions = {}
+    for direction in directions_for(mode):
+        if direction == "backward":
+            planner = ResolutionPlanner(old_registry, new_registry, direction)
+        else:
+            planner = ResolutionPlanner(new_registry, old_registry, direction)
+        directions[direction] = planner.plan()
+    return {"planVersion": PLAN_VERSION, "directions": directions}
@@ -1,19 +1,34 @@
 from __future__ import annotations
 
 import json
-from typing import Any
-
-from fastapi import UploadFile
+from typing import TYPE_CHECKING, Any, AsyncIterable, Callable
 
+from schemaguard.compatibility_engine import MAX_NESTING_DEPTH, nesting_depth
+from schemaguard.compression import StreamDecoder, request_encodings
+from schemaguard.instrumentation import phase
 from schemaguard.reporter import CompatibilityIssue, issue
 
-try:
-    from fastavro import parse_schema
-except Exception:  # pragma: no cover
-    parse_schema = None
+if TYPE_CHECKING:
+    from fastapi import UploadFile
+
+_UNSET: Any = object()
+# fastavro costs more to import than the whole engine, so it is loaded on first validation.
+_parse_schema: Callable[[Any], Any] | None = _UNSET
+
+
+def load_parse_schema() -> Callable[[Any], Any] | None:
+    global _parse_schema
+    if _parse_schema is _UNSET:
+        try:
+            from fastavro import parse_schema
+        except Exception:  # pragma: no cover
+            parse_schema = None
+        _parse_schema = parse_schema
+    return _parse_schema
 
 
 MAX_SCHEMA_BYTES = 1024 * 1024  # 1 MiB
+MAX_COMPARE_BODY_BYTES = 2 * MAX_SCHEMA_BYTES + 1024  # both schemas plus the envelope
 CHUNK_SIZE = 64 * 1024
 
 
@@ -24,9 +39,16 @@ def parse_json_bytes(payload: bytes) -> tuple[Any | None, str | None]:
         return None, "Schema file must be UTF-8 encoded."
 
     try:
-        return json.loads(text), None
+        value = json.loads(text)
     except json.JSONDecodeError as exc:
         return None, f"Invalid JSON: {exc.msg} (line {exc.lineno}, column {exc.colno})."
+    except RecursionError:
+        return None, f"JSON nesting exceeds the maximum depth of {MAX_NESTING_DEPTH}."
+    # Checked here, before fingerprinting, validation or the engine recurse over it.
+    depth = nesting_depth(value)
+    if depth > MAX_NESTING_DEPTH:
+        return None, f"JSON nesting depth {depth} exceeds the maximum of {MAX_NESTING_DEPTH}."
+    return value, None
 
 
 async def _read_upload_with_limit(file: UploadFile, limit_bytes: int) -> tuple[bytes | None, str | None]:
@@ -47,7 +69,8 @@ async def _read_upload_with_limit(file: UploadFile, limit_bytes: int) -> tuple[b
 
 async def load_schema_upload(file: UploadFile, schema_label: str) -> tuple[Any | None, list[CompatibilityIssue]]:
     try:
-        payload, size_error = await _read_upload_with_limit(file, MAX_SCHEMA_BYTES)
+        with phase("upload"):
+            payload, size_error = await _read_upload_with_limit(file, MAX_SCHEMA_BYTES)
     except Exception as exc:
         return None, [
             issue(
@@ -70,7 +93,8 @@ async def load_schema_upload(file: UploadFile, schema_label: str) -> tuple[Any |
             )
         ]
 
-    schema, parse_error = parse_json_bytes(payload)
+    with phase("parse"):
+        schema, parse_error = parse_json_bytes(payload)
     if parse_error:
         return None, [
             issue(
@@ -85,10 +109,38 @@ async def load_schema_upload(file: UploadFile, schema_label: str) -> tuple[Any |
     return schema, []
 
 
+def inline_schema_size_issue(schema: Any, schema_label: str) -> CompatibilityIssue | None:
+    # Schemas embedded in a larger JSON body get the same 1 MiB cap as uploads, measured on
+    # their compact JSON form (the body limit alone would let one schema take all of it).
+    size = len(json.dumps(schema, separators=(",", ":")))
+    if size <= MAX_SCHEMA_BYTES:
+        return None
+    return issue(
+        path=schema_label,
+        issue_type="FILE_TOO_LARGE",
+        writer_type="schema",
+        reader_type=f"<= {MAX_SCHEMA_BYTES} bytes",
+        description=f"Schema is {size} bytes as compact JSON, over the max size of {MAX_SCHEMA_BYTES} bytes.",
+    )
+
+
 def validate_avro_schema(schema: Any, schema_label: str) -> list[CompatibilityIssue]:
+    depth = nesting_depth(schema)
+    if depth > MAX_NESTING_DEPTH:
+        return [
+            issue(
+                path=schema_label,
+                issue_type="SCHEMA_TOO_DEEP",
+                writer_type=str(depth),
+                reader_type=f"<= {MAX_NESTING_DEPTH} levels",
+                description=f"Schema nesting depth {depth} exceeds the maximum of {MAX_NESTING_DEPTH}.",
+            )
+        ]
+    parse_schema = load_parse_schema()
     if parse_schema is not None:
         try:
-            parse_schema(schema)
+            with phase("validate"):
+                parse_schema(schema)
             return []
         except Exception as exc:
             return [
@@ -113,3 +165,131 @@ def validate_avro_schema(schema: Any, schema_label: str) -> list[CompatibilityIs
             )
         ]
     return []
+
+
+async def _read_body_with_limit(
+    chunks: AsyncIterable[bytes],
+    content_encoding: str,
+    limit_bytes: int,
+) -> tuple[bytes | None, str | None]:
+    decoder = StreamDecoder(content_encoding)
+    parts: list[bytes] = []
+    total = 0
+    received = 0
+    # Compression never grows data by more than this, so a longer encoded body cannot fit.
+    encoded_limit = limit_bytes + limit_bytes // 128 + 1024
+    size_error = f"Request body exceeds max size of {limit_bytes} bytes after decompression."
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > encoded_limit:
+            return None, size_error
+        decoded = decoder.feed(chunk, limit_bytes - total)
+        total += len(decoded)
+        if total > limit_bytes:
+            return None, size_error
+        parts.append(decoded)
+    decoded = decoder.finish(limit_bytes - total)
+    total += len(decoded)
+    if total > limit_bytes:
+        return None, size_error
+    parts.append(decoded)
+
+    return b"".join(parts), None
+
+
+async def load_json_body(
+    chunks: AsyncIterable[bytes],
+    content_encoding: str = "",
+    limit_bytes: int = MAX_COMPARE_BODY_BYTES,
+) -> tuple[Any | None, list[CompatibilityIssue]]:
+    encoding = content_encoding.strip().lower() or "identity"
+    if encoding not in request_encodings():
+        return None, [
+            issue(
+                path="request",
+                issue_type="UNSUPPORTED_CONTENT_ENCODING",
+                writer_type=encoding,
+                reader_type="|".join(request_encodings()),
+                description=f"Unsupported request Content-Encoding: {encoding}.",
+            )
+        ]
+
+    try:
+        with phase("upload"):
+            payload, size_error = await _read_body_with_limit(chunks, encoding, limit_bytes)
+    except Exception as exc:
+        return None, [
+            issue(
+                path="request",
+                issue_type="INVALID_UPLOAD",
+                writer_type=encoding,
+                reader_type="readable-body",
+                description=f"Failed to read request body: {exc}",
+            )
+        ]
+
+    if size_error:
+        return None, [
+            issue(
+                path="request",
+                issue_type="FILE_TOO_LARGE",
+                writer_type="body",
+                reader_type=f"<= {limit_bytes} bytes",
+                description=size_error,
+            )
+        ]
+
+    with phase("parse"):
+        body, parse_error = parse_json_bytes(payload)
+    if parse_error:
+        return None, [
+            issue(
+                path="request",
+                issue_type="INVALID_SCHEMA_JSON",
+                writer_type="body",
+                reader_type="valid-json",
+                description=parse_error,
+            )
+        ]
+
+    return body, []
+
+
+async def load_compare_body(
+    chunks: AsyncIterable[bytes],
+    content_encoding: str = "",
+) -> tuple[dict[str, Any] | None, list[CompatibilityIssue]]:
+    body, errors = await load_json_body(chunks, content_encoding, MAX_COMPARE_BODY_BYTES)
+    if errors:
+        return None, errors
+
+    missing = [key for key in ("oldSchema", "newSchema", "mode") if not isinstance(body, dict) or key not in body]
+    if missing:
+        return None, [
+            issue(
+                path="request",
+                issue_type="INVALID_REQUEST_BODY",
+                writer_type=type(body).__name__,
+                reader_type='{"oldSchema", "newSchema", "mode"}',
+                description=f"Request body is missing: {', '.join(missing)}.",
+            )
+        ]
+    if not isinstance(body["mode"], str):
+        return None, [
+            issue(
+                path="mode",
+                issue_type="INVALID_MODE",
+                writer_type=type(body["mode"]).__name__,
+                reader_type="backward|forward|full",
+                description="Mode must be a string.",
+            )
+        ]
+    for key, label in (("oldSchema", "OldSchema"), ("newSchema", "NewSchema")):
+        too_large = inline_schema_size_issue(body[key], label)
+        if too_large is not None:
+            return None, [too_large]
+
+    return body, []
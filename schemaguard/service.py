@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any
+
+from schemaguard import shared_cache
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE, VERDICT_VERSION, schema_fingerprint, verdict_key
+from schemaguard.compatibility_engine import SchemaRegistry, check_compatibility
+from schemaguard.hooks import EngineHook
+from schemaguard.instrumentation import SCHEMA_NODES, phase
+from schemaguard.parallel import SHARD_WORKERS
+from schemaguard.reporter import CompatibilityIssue
+from schemaguard.schema_loader import validate_avro_schema
+from schemaguard.type_pool import TYPE_POOL
+
+
+# Cache-aware steps shared by every entry point that compares parsed schemas.
+
+
+def compile_schema(
+    schema: Any,
+    schema_label: str,
+    fingerprint: str | None = None,
+) -> tuple[SchemaRegistry | None, list[CompatibilityIssue]]:
+    fingerprint = fingerprint or schema_fingerprint(schema)
+    registry = SCHEMA_CACHE.get(fingerprint)
+    if registry is not None:
+        return registry, []
+
+    # A fingerprint in the shared tier was validated by some worker already.
+    shared = shared_cache.SHARED_CACHE
+    if shared is None or not shared.has_schema(fingerprint):
+        validation_errors = validate_avro_schema(schema, schema_label)
+        if validation_errors:
+            return None, validation_errors
+        if shared is not None:
+            shared.put_schema(fingerprint, schema)
+
+    return install_schema(fingerprint, schema), []
+
+
+def install_schema(fingerprint: str, schema: Any) -> SchemaRegistry:
+    # Callers vouch that the schema is valid Avro.
+    with phase("registry"):
+        if TYPE_POOL is not None:
+            schema = TYPE_POOL.intern(schema)
+        registry = SchemaRegistry(schema, pool=TYPE_POOL)
+    SCHEMA_NODES.observe(registry.node_count)
+    SCHEMA_CACHE.put(fingerprint, registry)
+    return registry
+
+
+def compare_compiled(
+    old_registry: SchemaRegistry,
+    new_registry: SchemaRegistry,
+    *,
+    old_fingerprint: str,
+    new_fingerprint: str,
+    mode: str,
+    hook: EngineHook | None = None,
+    workers: int = SHARD_WORKERS,
+) -> list[CompatibilityIssue]:
+    # Hooked runs must actually walk the schemas, so they bypass (but still fill) the cache.
+    if hook is None:
+        cached = cached_verdict(old_fingerprint, new_fingerprint, mode)
+        if cached is not None:
+            return cached
+
+    errors = check_compatibility(
+        old_schema=old_registry.schema,
+        new_schema=new_registry.schema,
+        mode=mode,
+        hook=hook,
+        old_registry=old_registry,
+        new_registry=new_registry,
+        workers=workers,
+    )
+    store_verdict(old_fingerprint, new_fingerprint, mode, errors)
+    return errors
+
+
+def store_verdict(old_fingerprint: str, new_fingerprint: str, mode: str, errors: list[CompatibilityIssue]) -> None:
+    VERDICT_CACHE.put(verdict_key(old_fingerprint, new_fingerprint, mode), errors)
+    if shared_cache.SHARED_CACHE is not None:
+        shared_cache.SHARED_CACHE.put_verdict(VERDICT_VERSION, old_fingerprint, new_fingerprint, mode, errors)
+
+
+def cached_verdict(old_fingerprint: str, new_fingerprint: str, mode: str) -> list[CompatibilityIssue] | None:
+    key = verdict_key(old_fingerprint, new_fingerprint, mode)
+    errors = VERDICT_CACHE.get(key)
+    if errors is None and shared_cache.SHARED_CACHE is not None:
+        errors = shared_cache.SHARED_CACHE.get_verdict(VERDICT_VERSION, old_fingerprint, new_fingerprint, mode)
+        if errors is not None:
+            VERDICT_CACHE.put(key, errors)
+    return errors
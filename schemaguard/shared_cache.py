@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+from typing import Any
+
+from schemaguard.instrumentation import record_cache_lookups
+from schemaguard.reporter import CompatibilityIssue
+
+
+# Cross-worker cache tier: a local sqlite database in WAL mode, so readers on every worker
+# proceed concurrently with the single writer. Workers still keep their in-process LRUs in
+# front of it; this tier only turns one worker's cold miss into another worker's hit.
+
+SHARED_CACHE_PATH = os.environ.get("SCHEMAGUARD_SHARED_CACHE", "")
+SHARED_CACHE_MAX_ENTRIES = int(os.environ.get("SCHEMAGUARD_SHARED_CACHE_MAX_ENTRIES", "100000"))
+BUSY_TIMEOUT_SECONDS = 1.0
+PRUNE_EVERY_WRITES = 256
+
+logger = logging.getLogger("uvicorn.error")
+
+_SCHEMA_DDL = (
+    "CREATE TABLE IF NOT EXISTS schemas ("
+    "fingerprint TEXT PRIMARY KEY, body TEXT NOT NULL, stored REAL NOT NULL)"
+)
+_VERDICT_DDL = (
+    "CREATE TABLE IF NOT EXISTS verdicts ("
+    "version TEXT NOT NULL, old TEXT NOT NULL, new TEXT NOT NULL, mode TEXT NOT NULL, "
+    "issues TEXT NOT NULL, stored REAL NOT NULL, PRIMARY KEY (version, old, new, mode))"
+)
+
+
+def encode_issues(errors: list[CompatibilityIssue]) -> str:
+    rows = [[err.path, err.issueType, err.writerType, err.readerType, err.description] for err in errors]
+    return json.dumps(rows, separators=(",", ":"))
+
+
+def decode_issues(payload: str) -> list[CompatibilityIssue]:
+    return [CompatibilityIssue(*row) for row in json.loads(payload)]
+
+
+class SharedCache:
+    def __init__(self, path: str, max_entries: int = SHARED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process; uvicorn workers never inherit one.
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(_SCHEMA_DDL)
+        connection.execute(_VERDICT_DDL)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def has_schema(self, fingerprint: str) -> bool:
+        try:
+            row = self._connect().execute("SELECT 1 FROM schemas WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        record_cache_lookups("shared_schema", hits=int(row is not None), misses=int(row is None))
+        return row is not None
+
+    def get_schema(self, fingerprint: str) -> Any | None:
+        try:
+            row = self._connect().execute("SELECT body FROM schemas WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    def put_schema(self, fingerprint: str, schema: Any) -> None:
+        body = json.dumps(schema, separators=(",", ":"))
+        self._write(
+            "INSERT OR REPLACE INTO schemas (fingerprint, body, stored) VALUES (?, ?, ?)",
+            (fingerprint, body, time.time()),
+        )
+
+    def get_verdict(self, version: str, old: str, new: str, mode: str) -> list[CompatibilityIssue] | None:
+        try:
+            row = self._connect().execute(
+                "SELECT issues FROM verdicts WHERE version = ? AND old = ? AND new = ? AND mode = ?",
+                (version, old, new, mode),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        record_cache_lookups("shared_verdict", hits=int(row is not None), misses=int(row is None))
+        return decode_issues(row[0]) if row is not None else None
+
+    def put_verdict(self, version: str, old: str, new: str, mode: str, errors: list[CompatibilityIssue]) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO verdicts (version, old, new, mode, issues, stored) VALUES (?, ?, ?, ?, ?, ?)",
+            (version, old, new, mode, encode_issues(errors), time.time()),
+        )
+
+    def _write(self, statement: str, params: tuple) -> None:
+        # Writes are best effort: a busy or read-only store only costs a future miss.
+        try:
+            connection = self._connect()
+            connection.execute(statement, params)
+            self._writes += 1
+            if self._writes % PRUNE_EVERY_WRITES == 0:
+                self.prune()
+        except sqlite3.Error:
+            pass
+
+    def prune(self) -> None:
+        connection = self._connect()
+        for table in ("schemas", "verdicts"):
+            connection.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY stored DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        connection = self._connect()
+        connection.execute("DELETE FROM schemas")
+        connection.execute("DELETE FROM verdicts")
+
+
+def private_cache_dir() -> str:
+    # Entries are trusted without revalidation, so the file must live where no other local
+    # user can create or swap it: a per-user 0700 directory, never a predictable /tmp name.
+    import tempfile
+
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    path = os.path.join(base, f"schemaguard-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory (owned by this user, mode 0700).")
+    return path
+
+
+def default_cache_path(port: int) -> str:
+    return os.path.join(private_cache_dir(), f"cache-{port}.sqlite3")
+
+
+def open_shared_cache(path: str) -> SharedCache | None:
+    # Best effort like every other access: an unusable path means no shared tier, not a failed import.
+    try:
+        return SharedCache(path)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Shared cache %s unavailable, continuing without it: %s", path, exc)
+        return None
+
+
+SHARED_CACHE: SharedCache | None = open_shared_cache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import marshal
+import os
+import struct
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from schemaguard import shared_cache
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE, VERDICT_VERSION
+from schemaguard.instrumentation import WARMUP_ENTRIES, WARMUP_SECONDS
+from schemaguard.reporter import CompatibilityIssue
+from schemaguard.schema_loader import parse_json_bytes
+from schemaguard.service import compile_schema, install_schema, store_verdict
+
+
+# Snapshots carry schemas that already passed validation plus their cached verdicts, so a
+# fresh worker can fill its caches without running fastavro again. Layout: a fixed header
+# (magic, format, marshal version) followed by a zlib-compressed marshal payload of plain
+# lists, dicts and strings. Only load snapshots this service wrote: their schemas are trusted.
+
+SNAPSHOT_MAGIC = b"SGSNAP"
+SNAPSHOT_FORMAT = 1
+_HEADER = struct.Struct("!6sBB")
+
+WARM_FROM = [path for path in os.environ.get("SCHEMAGUARD_WARM_FROM", "").split(os.pathsep) if path]
+SNAPSHOT_TO = os.environ.get("SCHEMAGUARD_SNAPSHOT_TO", "")
+
+# (source, entries done, entries total); called about ten times per source.
+WarmProgress = Callable[[str, int, int], None]
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+@dataclass
+class WarmReport:
+    schemas: int = 0
+    verdicts: int = 0
+    failed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schemas": self.schemas,
+            "verdicts": self.verdicts,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def encode_snapshot(schemas: list[tuple[str, Any]], verdicts: list[tuple[tuple[str, str, str], list]]) -> bytes:
+    payload = {
+        "verdictVersion": VERDICT_VERSION,
+        "schemas": [[fingerprint, schema] for fingerprint, schema in schemas],
+        "verdicts": [
+            [old, new, mode, [[err.path, err.issueType, err.writerType, err.readerType, err.description] for err in errors]]
+            for (old, new, mode), errors in verdicts
+        ],
+    }
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, marshal.version)
+    return header + zlib.compress(marshal.dumps(payload), 6)
+
+
+def decode_snapshot(data: bytes) -> dict[str, Any]:
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Not a SchemaGuard snapshot (file too short).")
+    magic, snapshot_format, marshal_version = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a SchemaGuard snapshot (bad magic).")
+    if snapshot_format != SNAPSHOT_FORMAT or marshal_version > marshal.version:
+        raise SnapshotError(f"Unsupported snapshot format {snapshot_format}/{marshal_version}.")
+    try:
+        payload = marshal.loads(zlib.decompress(data[_HEADER.size :]))
+    except (zlib.error, ValueError, EOFError, TypeError) as exc:
+        raise SnapshotError(f"Corrupt snapshot: {exc}") from exc
+    if not isinstance(payload, dict) or not isinstance(payload.get("schemas"), list):
+        raise SnapshotError("Corrupt snapshot: unexpected payload.")
+    if not isinstance(payload.get("verdicts", []), list):
+        raise SnapshotError("Corrupt snapshot: verdicts is not a list.")
+    return payload
+
+
+def _schema_entry(entry: Any) -> tuple[str, Any]:
+    if not (isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str)):
+        raise SnapshotError("not a [fingerprint, schema] pair")
+    return entry[0], entry[1]
+
+
+def _verdict_entry(entry: Any) -> tuple[str, str, str, list[CompatibilityIssue]]:
+    if not (
+        isinstance(entry, list)
+        and len(entry) == 4
+        and all(isinstance(part, str) for part in entry[:3])
+        and isinstance(entry[3], list)
+    ):
+        raise SnapshotError("not an [old, new, mode, issues] row")
+    errors = []
+    for row in entry[3]:
+        if not (isinstance(row, list) and len(row) == 5 and all(isinstance(part, str) for part in row)):
+            raise SnapshotError("issue is not [path, issueType, writerType, readerType, description]")
+        errors.append(CompatibilityIssue(*row))
+    return entry[0], entry[1], entry[2], errors
+
+
+def is_snapshot(path: Path) -> bool:
+    try:
+        with path.open("rb") as handle:
+            return handle.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except OSError:
+        return False
+
+
+def capture_snapshot() -> bytes:
+    # LRU order (least recent first), so loading into a smaller cache keeps the hottest entries.
+    schemas = [(fingerprint, registry.schema) for fingerprint, registry in SCHEMA_CACHE.items()]
+    return encode_snapshot(schemas, VERDICT_CACHE.items())
+
+
+def write_snapshot(path: str | Path) -> int:
+    target = Path(path)
+    data = capture_snapshot()
+    # Several workers may write the same path at shutdown; each replace is atomic.
+    handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(handle, "wb") as temp:
+            temp.write(data)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, target)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return len(data)
+
+
+def _progress_points(total: int) -> int:
+    return max(1, total // 10)
+
+
+def load_snapshot(data: bytes, report: WarmReport, source: str, progress: WarmProgress | None = None) -> None:
+    payload = decode_snapshot(data)
+    # Verdicts from an older rule set would be wrong; the schemas themselves stay valid.
+    verdicts = payload.get("verdicts", []) if payload.get("verdictVersion") == VERDICT_VERSION else []
+    total = len(payload["schemas"]) + len(verdicts)
+    every = _progress_points(total)
+    shared = shared_cache.SHARED_CACHE
+    done = 0
+    # A malformed entry is reported and skipped; the rest of the snapshot still loads.
+    for index, entry in enumerate(payload["schemas"]):
+        try:
+            fingerprint, schema = _schema_entry(entry)
+            install_schema(fingerprint, schema)
+        except Exception as exc:
+            report.failed.append(f"{source}: schemas[{index}]: {exc}")
+        else:
+            if shared is not None:
+                shared.put_schema(fingerprint, schema)
+            report.schemas += 1
+        done += 1
+        if progress is not None and (done % every == 0 or done == total):
+            progress(source, done, total)
+    for index, entry in enumerate(verdicts):
+        try:
+            old, new, mode, errors = _verdict_entry(entry)
+        except SnapshotError as exc:
+            report.failed.append(f"{source}: verdicts[{index}]: {exc}")
+        else:
+            store_verdict(old, new, mode, errors)
+            report.verdicts += 1
+        done += 1
+        if progress is not None and (done % every == 0 or done == total):
+            progress(source, done, total)
+
+
+def load_schema_directory(
+    files: list[Path],
+    report: WarmReport,
+    source: str,
+    progress: WarmProgress | None = None,
+) -> None:
+    every = _progress_points(len(files))
+    for done, path in enumerate(files, start=1):
+        try:
+            schema, parse_error = parse_json_bytes(path.read_bytes())
+        except OSError as exc:
+            schema, parse_error = None, str(exc)
+        if parse_error is None:
+            registry, errors = compile_schema(schema, path.name)
+            if registry is None:
+                parse_error = errors[0].description
+        if parse_error is None:
+            report.schemas += 1
+        else:
+            report.failed.append(f"{path}: {parse_error}")
+        if progress is not None and (done % every == 0 or done == len(files)):
+            progress(source, done, len(files))
+
+
+def warm_caches(sources: list[str], progress: WarmProgress | None = None) -> WarmReport:
+    report = WarmReport()
+    started = time.perf_counter()
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            load_schema_directory(sorted(path.rglob("*.avsc")), report, source, progress)
+        elif is_snapshot(path):
+            try:
+                load_snapshot(path.read_bytes(), report, source, progress)
+            except (OSError, SnapshotError) as exc:
+                report.failed.append(f"{path}: {exc}")
+        elif path.is_file():
+            load_schema_directory([path], report, source, progress)
+        else:
+            report.failed.append(f"{path}: no such file or directory")
+    report.seconds = time.perf_counter() - started
+    WARMUP_SECONDS.set(report.seconds)
+    WARMUP_ENTRIES.inc(report.schemas, kind="schema")
+    WARMUP_ENTRIES.inc(report.verdicts, kind="verdict")
+    WARMUP_ENTRIES.inc(len(report.failed), kind="failed")
+    return report
@@ -3,12 +3,51 @@ const compareButton = document.getElementById("compare-button");
 const resultSection = document.getElementById("result-section");
 const summary = document.getElementById("result-summary");
 const errorList = document.getElementById("error-list");
+const errorDetail = document.getElementById("error-detail");
 const toggleRawButton = document.getElementById("toggle-raw-button");
 const rawJson = document.getElementById("raw-json");
 
+const NDJSON_TYPE = "application/x-ndjson";
+// Rows share one height so the visible window can be computed from scrollTop alone.
+const ROW_HEIGHT = 34;
+const OVERSCAN_ROWS = 10;
+// Reports up to this size open every group; larger ones start collapsed.
+const EXPAND_ALL_LIMIT = 200;
+
+const view = {
+  report: null,
+  errors: [],
+  groups: new Map(),
+  expanded: new Set(),
+  rows: [],
+  selected: null,
+  renderQueued: false,
+};
+
+const spacer = document.createElement("div");
+spacer.className = "virtual-spacer";
+const windowEl = document.createElement("div");
+windowEl.className = "virtual-window";
+spacer.appendChild(windowEl);
+
+function resetView() {
+  view.report = null;
+  view.errors = [];
+  view.groups = new Map();
+  view.expanded = new Set();
+  view.rows = [];
+  view.selected = null;
+}
+
 function clearResults() {
+  resetView();
   summary.innerHTML = "";
   errorList.innerHTML = "";
+  errorList.classList.add("hidden");
+  errorList.scrollTop = 0;
+  errorDetail.innerHTML = "";
+  errorDetail.classList.add("hidden");
+  windowEl.innerHTML = "";
   rawJson.textContent = "";
   rawJson.classList.add("hidden");
   toggleRawButton.textContent = "Show Raw JSON";
@@ -30,9 +69,8 @@ function renderCompatible() {
   summary.appendChild(message);
 }
 
-function renderErrors(data) {
-  const totalErrors = typeof data.totalErrors === "number" ? data.totalErrors : (data.errors || []).length;
-
+function renderSummary(totalErrors) {
+  summary.innerHTML = "";
   const badge = createParagraph("Incompatible", "badge badge-bad");
   const total = document.createElement("p");
   total.append("Total Errors: ");
@@ -41,84 +79,253 @@ function renderErrors(data) {
   total.appendChild(strong);
   summary.appendChild(badge);
   summary.appendChild(total);
+}
 
-  (data.errors || []).forEach((err, index) => {
-    const wrapper = document.createElement("details");
-    wrapper.className = "error-card";
-    if (index < 2) {
-      wrapper.open = true;
+function pathPrefix(path) {
+  // Group by the first two path segments: "Record.field[3].child" -> "Record.field".
+  return (path || "unknown path").replace(/\[\d+\]/g, "").split(".").slice(0, 2).join(".");
+}
+
+function addErrors(errors) {
+  const expandNew = (view.report ? view.report.totalErrors : view.errors.length) <= EXPAND_ALL_LIMIT;
+  errors.forEach((err) => {
+    view.errors.push(err);
+    const issueType = err.issueType || "UNKNOWN";
+    const prefix = pathPrefix(err.path);
+    const key = `${issueType}\u0000${prefix}`;
+    let group = view.groups.get(key);
+    if (!group) {
+      group = { key, issueType, prefix, errors: [] };
+      view.groups.set(key, group);
+      if (expandNew || view.groups.size === 1) {
+        view.expanded.add(key);
+      }
     }
+    group.errors.push(err);
+  });
+  scheduleRender();
+}
 
-    const summaryEl = document.createElement("summary");
+function rebuildRows() {
+  const rows = [];
+  view.groups.forEach((group) => {
+    rows.push({ kind: "group", group });
+    if (view.expanded.has(group.key)) {
+      group.errors.forEach((err) => rows.push({ kind: "error", err }));
+    }
+  });
+  view.rows = rows;
+  spacer.style.height = `${rows.length * ROW_HEIGHT}px`;
+}
 
+function scheduleRender() {
+  if (view.renderQueued) {
+    return;
+  }
+  view.renderQueued = true;
+  requestAnimationFrame(() => {
+    view.renderQueued = false;
+    rebuildRows();
+    renderWindow();
+  });
+}
+
+function renderRow(row, index) {
+  const el = document.createElement("div");
+  el.style.top = `${index * ROW_HEIGHT}px`;
+  el.dataset.index = String(index);
+
+  if (row.kind === "group") {
+    const open = view.expanded.has(row.group.key);
+    el.className = "virtual-row group-row";
+    const marker = document.createElement("span");
+    marker.className = "group-marker";
+    marker.textContent = open ? "▾" : "▸";
     const issueSpan = document.createElement("span");
     issueSpan.className = "issue";
-    issueSpan.textContent = err.issueType || "UNKNOWN";
-
+    issueSpan.textContent = row.group.issueType;
     const pathSpan = document.createElement("span");
     pathSpan.className = "path";
-    pathSpan.textContent = err.path || "unknown path";
-
-    summaryEl.appendChild(issueSpan);
-    summaryEl.appendChild(pathSpan);
-    wrapper.appendChild(summaryEl);
-
-    const body = document.createElement("div");
-    body.className = "error-body";
-
-    const description = document.createElement("p");
-    const descriptionStrong = document.createElement("strong");
-    descriptionStrong.textContent = "Description:";
-    description.appendChild(descriptionStrong);
-    description.append(` ${err.description || ""}`);
-
-    const writer = document.createElement("p");
-    const writerStrong = document.createElement("strong");
-    writerStrong.textContent = "Writer Type:";
-    const writerCode = document.createElement("code");
-    writerCode.textContent = err.writerType || "unknown";
-    writer.appendChild(writerStrong);
-    writer.append(" ");
-    writer.appendChild(writerCode);
-
-    const reader = document.createElement("p");
-    const readerStrong = document.createElement("strong");
-    readerStrong.textContent = "Reader Type:";
-    const readerCode = document.createElement("code");
-    readerCode.textContent = err.readerType || "unknown";
-    reader.appendChild(readerStrong);
-    reader.append(" ");
-    reader.appendChild(readerCode);
-
-    body.appendChild(description);
-    body.appendChild(writer);
-    body.appendChild(reader);
-
-    wrapper.appendChild(body);
-    errorList.appendChild(wrapper);
-  });
+    pathSpan.textContent = row.group.prefix;
+    const count = document.createElement("span");
+    count.className = "group-count";
+    count.textContent = String(row.group.errors.length);
+    el.append(marker, issueSpan, pathSpan, count);
+    return el;
+  }
+
+  el.className = "virtual-row error-row";
+  if (row.err === view.selected) {
+    el.classList.add("selected");
+  }
+  const pathSpan = document.createElement("span");
+  pathSpan.className = "path";
+  pathSpan.textContent = row.err.path || "unknown path";
+  const types = document.createElement("span");
+  types.className = "row-types";
+  types.textContent = `${row.err.writerType || "unknown"} → ${row.err.readerType || "unknown"}`;
+  el.append(pathSpan, types);
+  return el;
 }
 
-function renderData(data) {
-  if (data.compatible) {
-    renderCompatible();
+function renderWindow() {
+  const first = Math.max(0, Math.floor(errorList.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+  const visible = Math.ceil((errorList.clientHeight || 480) / ROW_HEIGHT) + OVERSCAN_ROWS * 2;
+  const last = Math.min(view.rows.length, first + visible);
+  const fragment = document.createDocumentFragment();
+  for (let index = first; index < last; index += 1) {
+    fragment.appendChild(renderRow(view.rows[index], index));
+  }
+  windowEl.replaceChildren(fragment);
+}
+
+function labeledCode(label, value) {
+  const p = document.createElement("p");
+  const strong = document.createElement("strong");
+  strong.textContent = label;
+  const code = document.createElement("code");
+  code.textContent = value || "unknown";
+  p.appendChild(strong);
+  p.append(" ");
+  p.appendChild(code);
+  return p;
+}
+
+function renderDetail(err) {
+  errorDetail.innerHTML = "";
+  const heading = document.createElement("p");
+  const issueSpan = document.createElement("span");
+  issueSpan.className = "issue";
+  issueSpan.textContent = err.issueType || "UNKNOWN";
+  const pathSpan = document.createElement("span");
+  pathSpan.className = "path";
+  pathSpan.textContent = ` ${err.path || "unknown path"}`;
+  heading.append(issueSpan, pathSpan);
+
+  const description = document.createElement("p");
+  const descriptionStrong = document.createElement("strong");
+  descriptionStrong.textContent = "Description:";
+  description.appendChild(descriptionStrong);
+  description.append(` ${err.description || ""}`);
+
+  errorDetail.append(
+    heading,
+    description,
+    labeledCode("Writer Type:", err.writerType),
+    labeledCode("Reader Type:", err.readerType),
+  );
+  errorDetail.classList.remove("hidden");
+}
+
+errorList.addEventListener("scroll", () => {
+  requestAnimationFrame(renderWindow);
+});
+
+errorList.addEventListener("click", (event) => {
+  const rowEl = event.target.closest(".virtual-row");
+  if (!rowEl) {
+    return;
+  }
+  const row = view.rows[Number(rowEl.dataset.index)];
+  if (!row) {
+    return;
+  }
+  if (row.kind === "group") {
+    if (view.expanded.has(row.group.key)) {
+      view.expanded.delete(row.group.key);
+    } else {
+      view.expanded.add(row.group.key);
+    }
   } else {
-    renderErrors(data);
+    view.selected = row.err;
+    renderDetail(row.err);
+  }
+  scheduleRender();
+});
+
+function beginReport(report) {
+  view.report = report;
+  if (report.compatible) {
+    renderCompatible();
+    return;
+  }
+  const totalErrors = typeof report.totalErrors === "number" ? report.totalErrors : (report.errors || []).length;
+  renderSummary(totalErrors);
+  errorList.replaceChildren(spacer);
+  errorList.classList.remove("hidden");
+}
+
+function renderData(data) {
+  const { errors, ...report } = data;
+  beginReport(report);
+  if (!data.compatible) {
+    addErrors(errors || []);
+  }
+}
+
+function rawReport() {
+  // Built on demand: stringifying a 20k-issue report up front would block the first paint.
+  if (!view.report) {
+    return "";
   }
-  rawJson.textContent = JSON.stringify(data, null, 2);
+  if (view.report.compatible && view.errors.length === 0) {
+    return JSON.stringify(view.report, null, 2);
+  }
+  return JSON.stringify({ ...view.report, errors: view.errors }, null, 2);
 }
 
 toggleRawButton.addEventListener("click", () => {
   const hidden = rawJson.classList.contains("hidden");
   if (hidden) {
+    rawJson.textContent = rawReport();
     rawJson.classList.remove("hidden");
     toggleRawButton.textContent = "Hide Raw JSON";
   } else {
     rawJson.classList.add("hidden");
+    rawJson.textContent = "";
     toggleRawButton.textContent = "Show Raw JSON";
   }
 });
 
+async function consumeNdjson(response) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let headerSeen = false;
+
+  const handleLines = (lines) => {
+    const batch = [];
+    lines.forEach((line) => {
+      if (!line.trim()) {
+        return;
+      }
+      const parsed = JSON.parse(line);
+      if (!headerSeen) {
+        headerSeen = true;
+        summary.innerHTML = "";
+        beginReport(parsed);
+      } else {
+        batch.push(parsed);
+      }
+    });
+    if (batch.length) {
+      addErrors(batch);
+    }
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    handleLines(lines);
+  }
+  handleLines([buffered + decoder.decode()]);
+}
+
 form.addEventListener("submit", async (event) => {
   event.preventDefault();
   compareButton.disabled = true;
@@ -131,10 +338,18 @@ form.addEventListener("submit", async (event) => {
     const response = await fetch("/compare", {
       method: "POST",
       body: new FormData(form),
+      headers: { Accept: `${NDJSON_TYPE}, application/json` },
     });
-    const data = await response.json();
-    renderData(data);
+    const contentType = response.headers.get("content-type") || "";
+    if (contentType.startsWith(NDJSON_TYPE) && response.body) {
+      await consumeNdjson(response);
+    } else {
+      const data = await response.json();
+      summary.innerHTML = "";
+      renderData(data);
+    }
   } catch (error) {
+    clearResults();
     renderData({
       compatible: false,
       totalErrors: 1,
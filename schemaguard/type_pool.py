@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from schemaguard.cache import LRUCache
+from schemaguard.compatibility_engine import (
+    COMPLEX_TYPES,
+    NameInfo,
+    SchemaRegistry,
+    check_nesting_depth,
+)
+from schemaguard.instrumentation import TYPE_POOL_ENTRIES, record_cache_lookups
+from schemaguard.reporter import CompatibilityIssue
+
+
+# A schema fleet embeds the same named types (Envelope, Money, Address) verbatim in hundreds
+# of subjects. Compiled schemas are rebuilt around one shared dict per (fullname, structural
+# digest) with interned strings, so cached registries share those subtrees and their NameInfo.
+# A pooled type is "closed" when every name it references is defined inside it; comparing two
+# closed types then means the same thing in any top-level schema, so their verdicts are reused.
+
+TYPE_POOL_ENABLED = os.environ.get("SCHEMAGUARD_TYPE_POOL", "1") != "0"
+TYPE_POOL_SIZE = int(os.environ.get("SCHEMAGUARD_TYPE_POOL_SIZE", "16384"))
+TYPE_VERDICT_CACHE_SIZE = int(os.environ.get("SCHEMAGUARD_TYPE_VERDICT_CACHE_SIZE", "65536"))
+
+PRIMITIVES = frozenset({"null", "boolean", "int", "long", "float", "double", "bytes", "string"})
+NAMED_TYPES = frozenset({"record", "enum", "fixed"})
+_NO_NAMES: frozenset[str] = frozenset()
+
+# (writer fullname, writer digest, reader fullname, reader digest, direction)
+VerdictKey = tuple[str, bytes, str, bytes, str]
+
+
+@dataclass(frozen=True)
+class PooledType:
+    node: dict[str, Any]
+    info: NameInfo
+    digest: bytes
+    closed: bool
+
+
+# Canonical JSON text of a subtree, with each named type inside replaced by <digest>.
+_encode = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+
+
+def _object(encodings: dict[str, str]) -> str:
+    return "{" + ",".join(f"{_encode(key)}:{encodings[key]}" for key in sorted(encodings)) + "}"
+
+
+def _first_candidate(name: str, namespace: str | None) -> str:
+    # The name SchemaRegistry.resolve_reference tries first.
+    if "." in name or not namespace:
+        return name
+    return f"{namespace}.{name}"
+
+
+class NamedTypePool:
+    def __init__(self, max_types: int = TYPE_POOL_SIZE, max_verdicts: int = TYPE_VERDICT_CACHE_SIZE):
+        self.max_types = max_types
+        self._types: OrderedDict[tuple[str, bytes], PooledType] = OrderedDict()
+        # Only pooled dicts are keys here, and the pool keeps them alive, so ids are stable.
+        self._by_id: dict[int, PooledType] = {}
+        self._lock = threading.Lock()
+        self.verdicts: LRUCache[VerdictKey, tuple[bool, tuple[CompatibilityIssue, ...]]] = LRUCache(
+            "type_verdict", max_verdicts
+        )
+        self._records: dict[tuple[str, bytes], frozenset[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._types.clear()
+            self._by_id.clear()
+            self._records.clear()
+        self.verdicts.clear()
+
+    def lookup(self, node: Any) -> PooledType | None:
+        return self._by_id.get(id(node))
+
+    def intern(self, schema: Any) -> Any:
+        check_nesting_depth(schema)
+        interner = _Interner(self)
+        interned, _, _ = interner.schema(schema, None)
+        record_cache_lookups("type_pool", hits=interner.hits, misses=interner.misses)
+        TYPE_POOL_ENTRIES.set(len(self._types))
+        return interned
+
+    def _pooled(self, node: dict[str, Any], info: NameInfo, digest: bytes, closed: bool) -> tuple[dict[str, Any], bool]:
+        key = (info.fullname, digest)
+        with self._lock:
+            entry = self._types.get(key)
+            if entry is not None:
+                self._types.move_to_end(key)
+                return entry.node, True
+            if self.max_types <= 0:
+                return node, False
+            entry = PooledType(node, info, digest, closed)
+            self._types[key] = entry
+            self._by_id[id(node)] = entry
+            while len(self._types) > self.max_types:
+                evicted_key, evicted = self._types.popitem(last=False)
+                # Registries that still hold the evicted dict keep working; they just stop sharing.
+                self._by_id.pop(id(evicted.node), None)
+                self._records.pop(evicted_key, None)
+        return node, False
+
+    def pair_key(self, writer_node: Any, reader_node: Any, direction: str) -> VerdictKey | None:
+        writer = self._by_id.get(id(writer_node))
+        reader = self._by_id.get(id(reader_node))
+        if writer is None or reader is None or not (writer.closed and reader.closed):
+            return None
+        return (writer.info.fullname, writer.digest, reader.info.fullname, reader.digest, direction)
+
+    def verdict(self, key: VerdictKey) -> tuple[bool, tuple[CompatibilityIssue, ...]] | None:
+        if key[:2] == key[2:4]:
+            # A closed type read by itself: every field, branch and symbol matches.
+            return True, ()
+        return self.verdicts.get(key)
+
+    def records_within(self, node: dict[str, Any], registry: SchemaRegistry) -> frozenset[str]:
+        # Full names of the records defined inside a closed pooled type: the only records a
+        # comparison starting at it can reach.
+        entry = self._by_id.get(id(node))
+        key = (entry.info.fullname, entry.digest) if entry is not None else None
+        names = self._records.get(key) if key is not None else None
+        if names is not None:
+            return names
+        found: set[str] = set()
+        pending: list[Any] = [node]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                info = registry.node_name_info.get(id(item)) if item.get("type") == "record" else None
+                if info is not None:
+                    found.add(info.fullname)
+                pending.extend(item.values())
+            elif isinstance(item, list):
+                pending.extend(item)
+        names = frozenset(found)
+        if key is not None:
+            self._records[key] = names
+        return names
+
+
+class _Interner:
+    def __init__(self, pool: NamedTypePool):
+        self.pool = pool
+        self.hits = 0
+        self.misses = 0
+        # Pre-order index of each named type's definition: a reference is satisfied inside a
+        # named type iff its target was defined at or after that type's own index.
+        self.defined_at: dict[str, int] = {}
+
+    @staticmethod
+    def data(value: Any) -> tuple[Any, str]:
+        # Docs, defaults, symbols: only strings and string lists are worth interning.
+        if isinstance(value, str):
+            value = sys.intern(value)
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = [sys.intern(item) for item in value]
+        return value, _encode(value)
+
+    def schema(self, node: Any, namespace: str | None) -> tuple[Any, str, frozenset[str]]:
+        # -> (interned node, canonical encoding, references not defined inside it)
+        if isinstance(node, str):
+            value, encoded = self.data(node)
+            if value in PRIMITIVES:
+                return value, encoded, _NO_NAMES
+            return value, encoded, frozenset({_first_candidate(value, namespace)})
+        if isinstance(node, list):
+            branches = [self.schema(branch, namespace) for branch in node]
+            unresolved = _NO_NAMES
+            for _, _, branch_unresolved in branches:
+                if branch_unresolved:
+                    unresolved = unresolved | branch_unresolved
+            encoded = "[" + ",".join(branch[1] for branch in branches) + "]"
+            return [branch[0] for branch in branches], encoded, unresolved
+        if not isinstance(node, dict):
+            value, encoded = self.data(node)
+            return value, encoded, _NO_NAMES
+
+        node_type = node.get("type")
+        fullname = None
+        if node_type in NAMED_TYPES:
+            fullname = SchemaRegistry._resolve_name(
+                name=node.get("name"),
+                explicit_namespace=node.get("namespace"),
+                default_namespace=namespace,
+            )
+        inner_namespace = namespace
+        if fullname is not None:
+            inner_namespace = SchemaRegistry._namespace_for_fullname(fullname)
+            start = self.defined_at[fullname] = len(self.defined_at)
+
+        unresolved = _NO_NAMES
+        rebuilt: dict[str, Any] = {}
+        encodings: dict[str, str] = {}
+        for key, value in node.items():
+            key = sys.intern(key)
+            inner_unresolved = _NO_NAMES
+            if key == "type" and isinstance(value, (list, dict)):
+                value, encoded, inner_unresolved = self.schema(value, namespace)
+            elif key == "type" and isinstance(value, str) and value not in PRIMITIVES and value not in COMPLEX_TYPES:
+                value, encoded, inner_unresolved = self.schema(value, namespace)
+            elif (key == "items" and node_type == "array") or (key == "values" and node_type == "map"):
+                value, encoded, inner_unresolved = self.schema(value, namespace)
+            elif key == "fields" and node_type == "record" and isinstance(value, list):
+                fields = []
+                field_encodings = []
+                for field in value:
+                    if not isinstance(field, dict):
+                        field, encoded = self.data(field)
+                    elif isinstance(field.get("type"), str) and field["type"] in PRIMITIVES:
+                        # The common leaf field: nothing named inside, one C-level encode.
+                        encoded = _encode(field)
+                        field = {sys.intern(name): self.data(item)[0] for name, item in field.items()}
+                    else:
+                        field, encoded, field_unresolved = self._field(field, inner_namespace)
+                        if field_unresolved:
+                            inner_unresolved = inner_unresolved | field_unresolved
+                    fields.append(field)
+                    field_encodings.append(encoded)
+                value, encoded = fields, "[" + ",".join(field_encodings) + "]"
+            else:
+                value, encoded = self.data(value)
+            if inner_unresolved:
+                unresolved = unresolved | inner_unresolved
+            rebuilt[key] = value
+            encodings[key] = encoded
+        encoded = _object(encodings)
+        if fullname is None:
+            return rebuilt, encoded, unresolved
+
+        if unresolved:
+            unresolved = frozenset(name for name in unresolved if self.defined_at.get(name, -1) < start)
+        info = NameInfo(
+            fullname=sys.intern(fullname),
+            namespace=sys.intern(inner_namespace) if inner_namespace else None,
+            aliases=SchemaRegistry._resolve_aliases(rebuilt.get("aliases", []), inner_namespace),
+        )
+        # ASCII-only: the encoder escapes everything else.
+        digest = hashlib.blake2b(encoded.encode("ascii"), digest_size=16).digest()
+        pooled, hit = self.pool._pooled(rebuilt, info, digest, closed=not unresolved)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        # Not valid JSON, so a digest can never collide with literal schema text.
+        return pooled, f"<{digest.hex()}>", unresolved
+
+    def _field(self, field: dict[str, Any], namespace: str | None) -> tuple[Any, str, frozenset[str]]:
+        unresolved = _NO_NAMES
+        rebuilt: dict[str, Any] = {}
+        encodings: dict[str, str] = {}
+        for key, value in field.items():
+            key = sys.intern(key)
+            if key == "type":
+                value, encoded, unresolved = self.schema(value, namespace)
+            else:
+                value, encoded = self.data(value)
+            rebuilt[key] = value
+            encodings[key] = encoded
+        return rebuilt, _object(encodings), unresolved
+
+
+TYPE_POOL: NamedTypePool | None = NamedTypePool() if TYPE_POOL_ENABLED else None
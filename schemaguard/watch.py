@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+from schemaguard.cache import schema_fingerprint
+from schemaguard.reporter import CompatibilityIssue, issue
+from schemaguard.schema_loader import parse_json_bytes
+from schemaguard.service import compare_compiled, compile_schema
+
+
+# Local development loop: watch a directory of .avsc files, keep each file's baseline (its
+# content when watching started, or the same relative path under --against) and re-check
+# only files whose canonical fingerprint changed. Compiled schemas and verdicts live in the
+# service caches, so flipping back to an earlier version costs a cache lookup.
+
+WATCH_SUFFIX = ".avsc"
+WATCH_DEBOUNCE_SECONDS = 0.2
+WATCH_POLL_SECONDS = 0.5
+# A steady stream of events still gets checked at least this often.
+WATCH_MAX_DELAY_SECONDS = 2.0
+# How often an idle loop checks whether it should stop.
+WATCH_IDLE_SECONDS = 1.0
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of NUL-padded name
+
+
+class InotifyWatcher:
+    # Linux inotify through ctypes; one watch per directory, added as directories appear.
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self._dirs: dict[int, Path] = {}
+        self._watch_tree(root)
+
+    def _watch_tree(self, directory: Path) -> None:
+        for current, _, _ in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {current}")
+            self._dirs[wd] = Path(current)
+
+    def wait(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if mask & _IN_Q_OVERFLOW:
+                # Events were dropped: let the caller rescan everything.
+                changed.add(self.root)
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, root: Path, interval: float = WATCH_POLL_SECONDS):
+        self.root = root
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int, int]]:
+        stats = {}
+        for path in self.root.rglob(f"*{WATCH_SUFFIX}"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            stats[path] = (info.st_mtime_ns, info.st_size, info.st_ino)
+        return stats
+
+    def wait(self, timeout: float) -> set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0.0, min(self.interval, deadline - time.monotonic())))
+            current = self._scan()
+            paths = current.keys() | self._stats.keys()
+            changed = {path for path in paths if current.get(path) != self._stats.get(path)}
+            self._stats = current
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    root: Path,
+    polling: bool = False,
+    interval: float = WATCH_POLL_SECONDS,
+) -> InotifyWatcher | PollingWatcher:
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            # No inotify (other libc, container limits, exhausted max_user_watches).
+            pass
+    return PollingWatcher(root, interval)
+
+
+@dataclass
+class WatchedFile:
+    baseline: Any = None
+    baseline_fingerprint: str | None = None
+    fingerprint: str | None = None
+    issues: list[CompatibilityIssue] = field(default_factory=list)
+    # Deleted for now; the baseline stays so a recreated file is still checked against it.
+    removed: bool = False
+
+
+@dataclass
+class FileDiff:
+    path: Path
+    added: list[CompatibilityIssue]
+    resolved: list[CompatibilityIssue]
+    total: int
+    removed: bool = False
+
+
+def _read(path: Path) -> tuple[Any | None, str | None, list[CompatibilityIssue]]:
+    try:
+        payload = path.read_bytes()
+    except OSError as exc:
+        return None, None, [
+            issue(
+                path=path.name,
+                issue_type="INVALID_UPLOAD",
+                writer_type="file",
+                reader_type="readable-file",
+                description=f"Failed to read schema file: {exc}",
+            )
+        ]
+    schema, parse_error = parse_json_bytes(payload)
+    if parse_error:
+        return None, None, [
+            issue(
+                path=path.name,
+                issue_type="INVALID_SCHEMA_JSON",
+                writer_type="file",
+                reader_type="valid-json",
+                description=parse_error,
+            )
+        ]
+    return schema, schema_fingerprint(schema), []
+
+
+class WatchSession:
+    def __init__(self, root: Path, mode: str, against: Path | None = None):
+        self.root = root
+        self.mode = mode
+        self.against = against
+        self.files: dict[Path, WatchedFile] = {}
+        self.checks = 0
+
+    def start(self) -> list[FileDiff]:
+        return self.refresh({self.root})
+
+    def _baseline(self, path: Path, schema: Any, fingerprint: str | None) -> WatchedFile:
+        if self.against is None:
+            return WatchedFile(baseline=schema, baseline_fingerprint=fingerprint)
+        baseline, baseline_fingerprint, _ = _read(self.against / path.relative_to(self.root))
+        # A file missing from the baseline tree is new: it is its own baseline.
+        if baseline_fingerprint is None:
+            return WatchedFile(baseline=schema, baseline_fingerprint=fingerprint)
+        return WatchedFile(baseline=baseline, baseline_fingerprint=baseline_fingerprint)
+
+    def _expand(self, paths: set[Path]) -> set[Path]:
+        expanded: set[Path] = set()
+        for path in paths:
+            if path.is_dir():
+                expanded.update(path.rglob(f"*{WATCH_SUFFIX}"))
+            elif path.suffix == WATCH_SUFFIX:
+                expanded.add(path)
+            else:
+                # A removed or renamed directory: every file known under it.
+                expanded.update(known for known in self.files if path in known.parents)
+        return expanded
+
+    def refresh(self, paths: set[Path]) -> list[FileDiff]:
+        diffs = []
+        for path in sorted(self._expand(paths)):
+            diff = self._check(path)
+            if diff is not None:
+                diffs.append(diff)
+        return diffs
+
+    def _check(self, path: Path) -> FileDiff | None:
+        watched = self.files.get(path)
+        if not path.exists():
+            if watched is None or watched.removed:
+                return None
+            resolved = watched.issues
+            watched.removed, watched.fingerprint, watched.issues = True, None, []
+            return FileDiff(path, [], resolved, 0, removed=True)
+
+        schema, fingerprint, errors = _read(path)
+        if watched is None:
+            watched = self.files[path] = self._baseline(path, schema, fingerprint)
+        elif watched.removed:
+            # Deleted and written again (git checkout, editors that replace files): same baseline.
+            watched.removed = False
+        elif fingerprint is not None and fingerprint == watched.fingerprint:
+            # Touched or reformatted, same canonical schema: nothing to re-check.
+            return None
+        watched.fingerprint = fingerprint
+
+        if not errors:
+            errors = self._compare(path, watched, schema, fingerprint)
+        previous = watched.issues
+        watched.issues = errors
+        added = [entry for entry in errors if entry not in previous]
+        resolved = [entry for entry in previous if entry not in errors]
+        return FileDiff(path, added, resolved, len(errors))
+
+    def _compare(self, path: Path, watched: WatchedFile, schema: Any, fingerprint: str) -> list[CompatibilityIssue]:
+        new_registry, errors = compile_schema(schema, path.name, fingerprint)
+        if errors:
+            return errors
+        if watched.baseline_fingerprint is None:
+            # The baseline itself never parsed; the first valid version becomes the baseline.
+            watched.baseline, watched.baseline_fingerprint = schema, fingerprint
+        if fingerprint == watched.baseline_fingerprint:
+            return []
+        old_registry, errors = compile_schema(watched.baseline, f"{path.name} (baseline)", watched.baseline_fingerprint)
+        if errors:
+            return errors
+        self.checks += 1
+        return compare_compiled(
+            old_registry,
+            new_registry,
+            old_fingerprint=watched.baseline_fingerprint,
+            new_fingerprint=fingerprint,
+            mode=self.mode,
+        )
+
+
+def format_diffs(diffs: list[FileDiff], root: Path, elapsed: float) -> str:
+    lines = []
+    stamp = time.strftime("%H:%M:%S")
+    for diff in diffs:
+        name = diff.path.relative_to(root)
+        if diff.removed:
+            lines.append(f"{stamp} {name}: removed")
+            continue
+        status = "ok" if diff.total == 0 else f"{diff.total} issue{'s' if diff.total != 1 else ''}"
+        lines.append(f"{stamp} {name}: {status} (+{len(diff.added)} -{len(diff.resolved)}) {elapsed * 1000:.0f} ms")
+        lines.extend(f"  + {entry.path} {entry.issueType}: {entry.description}" for entry in diff.added)
+        lines.extend(f"  - {entry.path} {entry.issueType}" for entry in diff.resolved)
+    return "\n".join(lines)
+
+
+def collect_burst(
+    watcher: InotifyWatcher | PollingWatcher,
+    debounce: float,
+    max_delay: float = WATCH_MAX_DELAY_SECONDS,
+) -> set[Path]:
+    # Wait for the first change, then keep collecting until `debounce` passes quietly.
+    changed = watcher.wait(WATCH_IDLE_SECONDS)
+    if not changed:
+        return changed
+    deadline = time.monotonic() + max_delay
+    while time.monotonic() < deadline:
+        more = watcher.wait(min(debounce, deadline - time.monotonic()))
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def run_watch(
+    root: Path,
+    mode: str,
+    *,
+    against: Path | None = None,
+    debounce: float = WATCH_DEBOUNCE_SECONDS,
+    polling: bool = False,
+    poll_interval: float = WATCH_POLL_SECONDS,
+    out: TextIO = sys.stdout,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> WatchSession:
+    session = WatchSession(root, mode, against)
+    watcher = open_watcher(root, polling, poll_interval)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else f"polling every {poll_interval:g}s"
+    try:
+        started = time.perf_counter()
+        diffs = session.start()
+        print(f"watching {root} ({len(session.files)} schemas, {mode}, {kind})", file=out)
+        # At startup only files that already have issues are worth a line.
+        report = format_diffs([diff for diff in diffs if diff.total], root, time.perf_counter() - started)
+        if report:
+            print(report, file=out)
+        out.flush()
+        while not should_stop():
+            changed = collect_burst(watcher, debounce)
+            if not changed:
+                continue
+            started = time.perf_counter()
+            report = format_diffs(session.refresh(changed), root, time.perf_counter() - started)
+            if report:
+                print(report, file=out)
+                out.flush()
+    finally:
+        watcher.close()
+    return session
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from schemaguard import main
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE
+from schemaguard.compatibility_engine import json_node_count
+from schemaguard.main import app
+from schemaguard.memory_budget import MEMORY_BUDGET, estimate_request_bytes
+from schemaguard.schema_loader import MAX_SCHEMA_BYTES
+from schemaguard.reporter import NDJSON_MEDIA_TYPE
+
+
+OLD_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "long"}]}
+NEW_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "int"}]}
+
+
+@dataclass
+class Reply:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+async def _call_app(method: str, path: str, body: bytes, headers: dict[str, str], fail_send: bool = False) -> Reply:
+    # A bare ASGI round trip: one request body message, then wait for the response to finish.
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+    finished = asyncio.Event()
+    messages: list[dict] = []
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if fail_send:
+            raise OSError("client went away")
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    start = messages[0]
+    return Reply(
+        status=start["status"],
+        headers={name.decode(): value.decode() for name, value in start["headers"]},
+        body=b"".join(message.get("body", b"") for message in messages[1:]),
+    )
+
+
+def call(method: str, path: str, body: bytes = b"", headers: dict[str, str] | None = None) -> Reply:
+    return asyncio.run(_call_app(method, path, body, headers or {}))
+
+
+def post_json(path: str, payload, headers: dict[str, str] | None = None) -> Reply:
+    return call("POST", path, json.dumps(payload).encode(), {"content-type": "application/json", **(headers or {})})
+
+
+def post_upload(path: str, old, new, mode: str, headers: dict[str, str] | None = None) -> Reply:
+    boundary = "schemaguard-test-boundary"
+    parts = [
+        ("old_schema_file", "old.avsc", json.dumps(old)),
+        ("new_schema_file", "new.avsc", json.dumps(new)),
+        ("mode", None, mode),
+    ]
+    body = ""
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n{content}\r\n"
+    body += f"--{boundary}--\r\n"
+    content_type = f"multipart/form-data; boundary={boundary}"
+    return call("POST", path, body.encode(), {"content-type": content_type, **(headers or {})})
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> None:
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+
+def test_compare_json_etag_round_trip_and_wildcard() -> None:
+    body = {"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"}
+    first = post_json("/compare/json", body)
+    assert first.status == 200
+    assert first.json()["compatible"] is False
+    etag = first.headers["etag"]
+
+    repeat = post_json("/compare/json", body, {"if-none-match": f'"other", {etag}'})
+    assert (repeat.status, repeat.body, repeat.headers["etag"]) == (304, b"", etag)
+
+    # A wildcard is not a validator of this verdict: an invalid schema still gets its 400.
+    invalid = post_json("/compare/json", {**body, "newSchema": {"type": "nope"}}, {"if-none-match": "*"})
+    assert invalid.status == 400
+    assert invalid.json()["errors"][0]["issueType"] == "INVALID_AVRO_SCHEMA"
+
+
+def test_resolution_plan_is_its_own_representation() -> None:
+    body = {"oldSchema": OLD_SCHEMA, "newSchema": OLD_SCHEMA, "mode": "backward"}
+    plain = post_json("/compare/json", body)
+    planned = post_json("/compare/json?plan=true", body)
+
+    assert plain.status == planned.status == 200
+    assert "resolutionPlan" not in plain.json()
+    assert planned.json()["resolutionPlan"]["directions"]["backward"]["compatible"] is True
+    assert planned.headers["etag"] != plain.headers["etag"]
+
+    # The plain report's validator must not let a plan request skip its plan.
+    stale = post_json("/compare/json?plan=true", body, {"if-none-match": plain.headers["etag"]})
+    assert stale.status == 200 and "resolutionPlan" in stale.json()
+    fresh = post_json("/compare/json?plan=true", body, {"if-none-match": planned.headers["etag"]})
+    assert (fresh.status, fresh.headers["etag"]) == (304, planned.headers["etag"])
+
+
+def test_compare_upload_returns_a_resolution_plan() -> None:
+    plain = post_upload("/compare", OLD_SCHEMA, NEW_SCHEMA, "backward")
+    planned = post_upload("/compare?plan=true", OLD_SCHEMA, NEW_SCHEMA, "backward")
+
+    assert plain.status == planned.status == 200
+    assert planned.json()["errors"] == plain.json()["errors"]
+    assert planned.json()["resolutionPlan"]["directions"]["backward"]["compatible"] is False
+    assert planned.headers["etag"] != plain.headers["etag"]
+
+    stale = post_upload(
+        "/compare?plan=true", OLD_SCHEMA, NEW_SCHEMA, "backward", {"if-none-match": plain.headers["etag"]}
+    )
+    assert stale.status == 200 and "resolutionPlan" in stale.json()
+    fresh = post_upload(
+        "/compare?plan=true", OLD_SCHEMA, NEW_SCHEMA, "backward", {"if-none-match": planned.headers["etag"]}
+    )
+    assert fresh.status == 304
+
+
+def test_compare_json_decodes_gzip_and_survives_lone_surrogates() -> None:
+    body = {"oldSchema": OLD_SCHEMA, "newSchema": OLD_SCHEMA, "mode": "full"}
+    reply = call("POST", "/compare/json", gzip.compress(json.dumps(body).encode()), {"content-encoding": "gzip"})
+    assert reply.status == 200 and reply.json()["compatible"] is True
+
+    # "\ud800" is valid JSON text but not encodable as UTF-8.
+    odd = {"type": "record", "name": "User", "doc": "\ud800", "fields": [{"name": "\ud800", "type": "long"}]}
+    narrowed = {**odd, "fields": [{"name": "\ud800", "type": "int"}]}
+    reply = post_json("/compare/json", {"oldSchema": odd, "newSchema": narrowed, "mode": "backward"})
+    assert reply.status == 200
+    assert reply.json()["errors"][0]["path"] == "User.\ud800"
+
+    bad_mode = post_json("/compare/json", {**body, "mode": "sideways"})
+    assert bad_mode.status == 400 and bad_mode.json()["errors"][0]["issueType"] == "INVALID_MODE"
+
+
+def test_compare_verdict_answers_from_cached_fingerprints() -> None:
+    compared = post_json("/compare/json", {"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"})
+    old, new = compared.headers["x-old-schema-fingerprint"], compared.headers["x-new-schema-fingerprint"]
+
+    verdict = call("GET", f"/compare/verdict?old={old}&new={new}&mode=backward")
+    assert verdict.status == 200
+    assert verdict.json() == {"compatible": False, "totalErrors": 1}
+    assert verdict.headers["x-schema-compatible"] == "false"
+
+    head = call("HEAD", f"/compare/verdict?old={old}&new={new}&mode=backward")
+    assert head.status == 200 and head.headers["x-total-errors"] == "1"
+    unknown = call("GET", f"/compare/verdict?old={new}&new={old}&mode=forward")
+    assert unknown.status == 404 and unknown.json()["errors"][0]["issueType"] == "VERDICT_UNKNOWN"
+
+
+def test_compare_batch_streams_one_line_per_pair_and_a_summary() -> None:
+    pairs = [
+        {"id": "a", "oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"},
+        {"id": "b", "oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "forward"},
+    ]
+    reply = post_json("/compare/batch", {"pairs": pairs})
+
+    assert reply.status == 200 and reply.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    lines = [json.loads(line) for line in reply.body.splitlines()]
+    assert {line["id"]: line["compatible"] for line in lines[:-1]} == {"a": False, "b": True}
+    assert lines[-1]["batch"]["pairs"] == 2
+
+    invalid = post_json("/compare/batch", {"pairs": "nope"})
+    assert invalid.status == 400 and invalid.json()["errors"][0]["issueType"] == "INVALID_REQUEST_BODY"
+
+
+def test_jobs_submit_poll_and_not_found() -> None:
+    submitted = post_json("/jobs", {"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"})
+    assert submitted.status == 202
+    location = submitted.headers["location"]
+
+    deadline = time.monotonic() + 10
+    job = call("GET", location).json()
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+        job = call("GET", location).json()
+    assert job["status"] == "succeeded" and job["compatible"] is False
+
+    assert call("GET", "/jobs/missing").status == 404
+    assert call("DELETE", "/jobs/missing").status == 404
+    assert post_json("/jobs", {"kind": "transitive", "schemas": [OLD_SCHEMA]}).status == 400
+
+
+def test_compare_batch_releases_its_reservation_on_every_path(monkeypatch) -> None:
+    body = json.dumps({"pairs": [{"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "full"}]}).encode()
+
+    # The client is gone before the first byte: the stream is never iterated.
+    with pytest.raises(OSError):
+        asyncio.run(_call_app("POST", "/compare/batch", body, {}, fail_send=True))
+    assert MEMORY_BUDGET.in_use == 0
+
+    def broken(body):
+        raise RuntimeError("parse failed")
+
+    monkeypatch.setattr(main, "parse_batch_request", broken)
+    with pytest.raises(RuntimeError):
+        call("POST", "/compare/batch", body)
+    assert MEMORY_BUDGET.in_use == 0
+
+
+def test_compare_batch_caps_each_inline_schema() -> None:
+    padded = {**OLD_SCHEMA, "doc": "x" * MAX_SCHEMA_BYTES}
+    pairs = [
+        {"id": "big", "oldSchema": padded, "newSchema": NEW_SCHEMA, "mode": "backward"},
+        {"id": "small", "oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"},
+    ]
+    reply = post_json("/compare/batch", {"pairs": pairs})
+
+    by_id = {line.get("id"): line for line in map(json.loads, reply.body.splitlines())}
+    assert by_id["big"]["status"] == 413
+    assert by_id["big"]["errors"][0]["issueType"] == "FILE_TOO_LARGE"
+    assert by_id["small"]["status"] == 200
+    assert MEMORY_BUDGET.in_use == 0
+
+
+def test_jobs_are_admitted_against_the_memory_budget(monkeypatch) -> None:
+    monkeypatch.setattr(MEMORY_BUDGET, "limit_bytes", 1024)
+
+    rejected = post_json("/jobs", {"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"})
+
+    assert rejected.status == 503 and rejected.headers["retry-after"] == "1"
+    assert rejected.json()["errors"][0]["issueType"] == "MEMORY_BUDGET_EXCEEDED"
+    assert MEMORY_BUDGET.in_use == 0
+
+
+def test_compiled_size_is_admitted_before_compiling(monkeypatch) -> None:
+    held: list[int] = []
+    original = main.compile_schema
+
+    def spying(schema, label, fingerprint=None):
+        held.append(MEMORY_BUDGET.in_use)
+        return original(schema, label, fingerprint)
+
+    monkeypatch.setattr(main, "compile_schema", spying)
+    body = json.dumps({"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"}).encode()
+    reply = call("POST", "/compare/json", body, {"content-length": str(len(body))})
+
+    assert reply.status == 200
+    assert held[0] == estimate_request_bytes(len(body), json_node_count(OLD_SCHEMA) + json_node_count(NEW_SCHEMA))
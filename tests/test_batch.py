@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from schemaguard import batch
+from schemaguard.batch import BatchStats, parse_batch_request, run_batch
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE, schema_fingerprint
+
+
+OLD_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "long"}]}
+NEW_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "int"}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> None:
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+
+def _run(body: dict) -> tuple[list[dict], dict]:
+    request, errors = parse_batch_request(body)
+    assert errors == []
+    stats = BatchStats()
+
+    async def collect() -> list[dict]:
+        return [result async for result in run_batch(request, stats)]
+
+    return asyncio.run(collect()), stats.as_dict()
+
+
+def test_identical_schemas_are_compiled_once_across_pairs(monkeypatch) -> None:
+    compiled: list[str] = []
+    original = batch.compile_schema
+
+    def counting(schema, label, fingerprint=None):
+        compiled.append(fingerprint)
+        return original(schema, label, fingerprint)
+
+    monkeypatch.setattr(batch, "compile_schema", counting)
+    pairs = [
+        {"id": index, "oldSchema": dict(OLD_SCHEMA), "newSchema": dict(NEW_SCHEMA), "mode": mode}
+        for index, mode in enumerate(["backward", "forward", "full"])
+    ]
+    pairs.append({"id": "by-id", "old": "user-v1", "new": "user-v1"})
+    results, summary = _run({"schemas": {"user-v1": OLD_SCHEMA}, "mode": "backward", "pairs": pairs})
+
+    assert sorted(compiled) == sorted({schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)})
+    by_id = {result["id"]: result for result in results}
+    assert by_id[0]["compatible"] is False and by_id[1]["compatible"] is True
+    assert by_id["by-id"]["compatible"] is True and by_id["by-id"]["mode"] == "backward"
+    assert summary["pairs"] == 4 and summary["uniqueSchemas"] == 2
+    assert (summary["compatible"], summary["incompatible"], summary["invalid"]) == (2, 2, 0)
+
+
+def test_fingerprints_from_earlier_runs_and_per_pair_errors() -> None:
+    _run({"pairs": [{"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "backward"}]})
+    VERDICT_CACHE.clear()
+    old_fp, new_fp = schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)
+
+    results, summary = _run(
+        {
+            "mode": "backward",
+            "pairs": [
+                {"id": "known", "old": old_fp, "new": new_fp},
+                {"id": "unknown", "old": "0" * 64, "new": new_fp},
+                {"id": "bad-mode", "old": old_fp, "new": new_fp, "mode": "sideways"},
+                {"id": "invalid", "oldSchema": {"type": "record"}, "newSchema": NEW_SCHEMA},
+                {"id": "missing", "old": old_fp},
+            ],
+        }
+    )
+
+    by_id = {result["id"]: result for result in results}
+    assert by_id["known"]["status"] == 200 and by_id["known"]["compatible"] is False
+    assert by_id["unknown"]["status"] == 404
+    assert by_id["unknown"]["errors"][0]["issueType"] == "UNKNOWN_SCHEMA_ID"
+    assert by_id["bad-mode"]["errors"][0]["issueType"] == "INVALID_MODE"
+    assert by_id["invalid"]["status"] == 400
+    assert by_id["missing"]["errors"][0]["issueType"] == "INVALID_REQUEST_BODY"
+    assert summary["invalid"] == 4
+
+
+def test_cached_verdicts_answer_first_and_limits_are_enforced(monkeypatch) -> None:
+    _run({"pairs": [{"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "full"}]})
+    results, summary = _run(
+        {"pairs": [{"oldSchema": OLD_SCHEMA, "newSchema": NEW_SCHEMA, "mode": "full"}] * 3}
+    )
+    assert summary["cachedVerdicts"] == 3 and summary["schemasResolved"] == 0
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+
+    monkeypatch.setattr(batch, "BATCH_MAX_PAIRS", 2)
+    _, errors = parse_batch_request({"pairs": [{}] * 3})
+    assert [err.issueType for err in errors] == ["BATCH_TOO_LARGE"]
+    _, errors = parse_batch_request({"pairs": "nope"})
+    assert [err.issueType for err in errors] == ["INVALID_REQUEST_BODY"]
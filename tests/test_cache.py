@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from schemaguard.cache import VERDICT_CACHE, LRUCache, schema_fingerprint, verdict_etag, verdict_key
+from schemaguard.service import compare_compiled, compile_schema
+
+
+OLD_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "long"}]}
+NEW_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "int"}]}
+
+
+def test_fingerprint_ignores_key_order_but_not_content() -> None:
+    reordered = {"fields": [{"type": "long", "name": "id"}], "name": "User", "type": "record"}
+    assert schema_fingerprint(OLD_SCHEMA) == schema_fingerprint(reordered)
+    assert schema_fingerprint(OLD_SCHEMA) != schema_fingerprint(NEW_SCHEMA)
+
+
+def test_etag_is_strong_and_varies_by_mode_and_representation() -> None:
+    old, new = schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)
+    etag = verdict_etag(old, new, "backward")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == verdict_etag(old, new, "backward")
+    assert etag != verdict_etag(old, new, "forward")
+    assert etag != verdict_etag(old, new, "backward", "gzip")
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache("test", max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert len(cache) == 2
+
+
+def test_compare_compiled_reuses_cached_verdict() -> None:
+    old_fp, new_fp = schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)
+    old_registry, old_errors = compile_schema(OLD_SCHEMA, "OldSchema", old_fp)
+    new_registry, new_errors = compile_schema(NEW_SCHEMA, "NewSchema", new_fp)
+    assert old_errors == [] and new_errors == []
+    assert compile_schema(OLD_SCHEMA, "OldSchema", old_fp)[0] is old_registry
+
+    first = compare_compiled(
+        old_registry, new_registry, old_fingerprint=old_fp, new_fingerprint=new_fp, mode="backward"
+    )
+    assert [err.issueType for err in first] == ["TYPE_MISMATCH"]
+    assert VERDICT_CACHE.peek(verdict_key(old_fp, new_fp, "backward")) is first
+    second = compare_compiled(
+        old_registry, new_registry, old_fingerprint=old_fp, new_fingerprint=new_fp, mode="backward"
+    )
+    assert second is first
+
+
+def test_invalid_schema_is_not_cached() -> None:
+    invalid = {"type": "record", "name": "Broken", "fields": [{"name": "x", "type": "Missing"}]}
+    registry, errors = compile_schema(invalid, "OldSchema")
+    assert registry is None
+    assert errors
+    assert compile_schema(invalid, "OldSchema")[1]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from schemaguard.cli import EXIT_COMPATIBLE, EXIT_INCOMPATIBLE, EXIT_INVALID_INPUT, main
+
+
+def _write(path: Path, schema: object) -> str:
+    path.write_text(json.dumps(schema), encoding="utf-8")
+    return str(path)
+
+
+def test_compare_reports_incompatibility_with_explain(tmp_path: Path, capsys) -> None:
+    old_path = _write(tmp_path / "old.avsc", {"type": "record", "name": "User", "fields": [{"name": "id", "type": "int"}]})
+    new_path = _write(
+        tmp_path / "new.avsc", {"type": "record", "name": "User", "fields": [{"name": "id", "type": "string"}]}
+    )
+
+    exit_code = main(["compare", old_path, new_path, "--mode", "backward", "--explain"])
+    payload = json.loads(capsys.readouterr().out)
+
+    assert exit_code == EXIT_INCOMPATIBLE
+    assert payload["errors"][0]["path"] == "User.id"
+    assert {entry["path"] for entry in payload["explain"]} == {"User", "User.id"}
+
+
+def test_compare_rejects_invalid_json(tmp_path: Path, capsys) -> None:
+    broken = tmp_path / "broken.avsc"
+    broken.write_text("{", encoding="utf-8")
+    valid = _write(tmp_path / "ok.avsc", "string")
+
+    assert main(["compare", str(broken), valid]) == EXIT_INVALID_INPUT
+    assert json.loads(capsys.readouterr().out)["errors"][0]["issueType"] == "INVALID_SCHEMA_JSON"
+    assert main(["compare", valid, valid]) == EXIT_COMPATIBLE
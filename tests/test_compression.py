@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+from schemaguard.compression import available_encodings, compress, iter_compressed, negotiate_encoding
+
+
+def test_negotiation_honours_quality_values() -> None:
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") == available_encodings()[0]
+
+
+def test_gzip_round_trip_is_deterministic() -> None:
+    body = b'{"compatible":false}' * 200
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+def test_streaming_gzip_matches_input() -> None:
+    chunks = [b"line-%d\n" % index for index in range(1000)]
+    assert gzip.decompress(b"".join(iter_compressed(iter(chunks), "gzip"))) == b"".join(chunks)
+
+
+def test_unknown_encoding_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        compress(b"x", "deflate")
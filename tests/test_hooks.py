@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from schemaguard.compatibility_engine import CompatibilityEngine, check_compatibility
+from schemaguard.hooks import EngineHook, ExplainHook
+
+
+def _record(fields: list[dict]) -> dict:
+    return {"type": "record", "name": "User", "fields": fields}
+
+
+def test_engine_without_hook_uses_unwrapped_compare() -> None:
+    engine = CompatibilityEngine({"type": "string"}, {"type": "string"}, "backward")
+
+    assert "_compare" not in vars(engine)
+
+
+def test_hook_sees_enter_exit_pairs_for_every_node() -> None:
+    events: list[tuple[str, str]] = []
+
+    class Recorder(EngineHook):
+        def on_enter(self, path, writer_node, reader_node) -> None:
+            events.append(("enter", path))
+
+        def on_exit(self, path, compatible) -> None:
+            events.append(("exit", path))
+
+    old_schema = _record([{"name": "id", "type": "int"}])
+    new_schema = _record([{"name": "id", "type": "long"}])
+    check_compatibility(old_schema, new_schema, "backward", hook=Recorder())
+
+    assert events == [("enter", "User"), ("enter", "User.id"), ("exit", "User.id"), ("exit", "User")]
+
+
+def test_explain_counts_union_trials_and_sorts_by_cost() -> None:
+    old_schema = _record([{"name": "payload", "type": ["null", "string"], "default": None}])
+    new_schema = _record([{"name": "payload", "type": ["null", "int", "string"], "default": None}])
+    hook = ExplainHook()
+
+    errors = check_compatibility(old_schema, new_schema, "backward", hook=hook)
+    report = hook.report()
+
+    assert errors == []
+    assert report[0]["path"] == "User"
+    by_path = {entry["path"]: entry for entry in report}
+    assert by_path["User.payload[1]"]["unionTrials"] == 3
+    costs = [entry["cumulativeMs"] for entry in report]
+    assert costs == sorted(costs, reverse=True)
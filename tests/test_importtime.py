@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.importtime import IMPORT_BUDGETS_US, check_budget, measure_import, parse_importtime
+
+
+def test_parse_importtime_reads_top_level_cumulative() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   schemaguard.rules\n"
+        "import time:       300 |        420 | schemaguard\n"
+        "import time:        50 |         50 |   fastavro\n"
+    )
+    profile = parse_importtime(stderr, "schemaguard")
+
+    assert profile.total_us == 420
+    assert profile.modules["schemaguard.rules"] == (120, 120)
+    assert profile.heavy_imports() == ["fastavro"]
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_US))
+def test_core_imports_stay_stdlib_only_and_within_budget(module: str) -> None:
+    profile = measure_import(module, runs=3)
+
+    assert check_budget(profile, IMPORT_BUDGETS_US[module]) == []
+
+
+def test_validation_imports_fastavro_when_needed() -> None:
+    import sys
+
+    from schemaguard.schema_loader import validate_avro_schema
+
+    assert validate_avro_schema({"type": "string"}, "OldSchema") == []
+    assert "fastavro" in sys.modules
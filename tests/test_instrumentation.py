@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from schemaguard import instrumentation
+from schemaguard.compatibility_engine import check_compatibility
+from schemaguard.instrumentation import MetricsRegistry, collect_timings, phase, start_memory_tracing
+
+
+def test_phase_is_noop_without_active_collector() -> None:
+    with phase("parse"):
+        pass
+
+    with collect_timings() as timings:
+        with phase("parse"):
+            pass
+
+    assert list(timings.phases) == ["parse"]
+
+
+def test_server_timing_header_lists_phases_and_total() -> None:
+    with collect_timings() as timings:
+        check_compatibility({"type": "string"}, {"type": "string"}, "full")
+
+    header = timings.server_timing_header()
+    names = [entry.split(";")[0] for entry in header.split(", ")]
+    assert names == ["registry", "compare", "total"]
+    assert all(";dur=" in entry for entry in header.split(", "))
+
+
+def test_histogram_renders_cumulative_prometheus_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0), labelnames=("phase",))
+    histogram.observe(0.05, phase="parse")
+    histogram.observe(0.5, phase="parse")
+    histogram.observe(5.0, phase="parse")
+
+    lines = registry.render().splitlines()
+
+    assert 'demo_seconds_bucket{phase="parse",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{phase="parse",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{phase="parse",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{phase="parse"} 3' in lines
+
+
+def test_trace_memory_records_phase_peaks_only_when_enabled(monkeypatch) -> None:
+    with collect_timings() as untraced:
+        with phase("parse"):
+            pass
+    assert untraced.peak_bytes == {}
+
+    monkeypatch.setattr(instrumentation, "TRACE_MEMORY", True)
+    start_memory_tracing()
+    try:
+        with collect_timings() as traced:
+            with phase("parse"):
+                payload = [bytes(1024) for _ in range(64)]
+    finally:
+        tracemalloc.stop()
+
+    assert traced.peak_bytes["parse"] >= 64 * 1024
+    assert "parse-mem" in traced.server_timing_header()
+    del payload
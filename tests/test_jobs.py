@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.synthetic import schema_pair
+from schemaguard.cache import VERDICT_CACHE
+from schemaguard.jobs import (
+    CANCEL_CHECK_NODES,
+    CANCELLED,
+    FAILED,
+    SUCCEEDED,
+    Job,
+    JobCancelled,
+    JobManager,
+    JobQueueFull,
+    JobRequest,
+    ProgressHook,
+    parse_job_request,
+)
+from schemaguard.memory_budget import MemoryBudget
+
+
+def _wait(job: Job, timeout: float = 10.0) -> Job:
+    deadline = time.monotonic() + timeout
+    while job.status not in (SUCCEEDED, FAILED, CANCELLED) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_parse_job_request_accepts_compare_and_transitive() -> None:
+    compare, errors = parse_job_request({"oldSchema": "int", "newSchema": "long", "mode": "Backward"})
+    assert errors == []
+    assert compare.kind == "compare" and compare.mode == "backward" and compare.pairs() == [(0, 1)]
+
+    transitive, _ = parse_job_request({"kind": "transitive", "schemas": ["int", "int", "long"], "mode": "full"})
+    assert transitive.pairs() == [(0, 2), (1, 2)]
+
+    _, bad_priority = parse_job_request({"oldSchema": "int", "newSchema": "long", "mode": "full", "priority": 12})
+    _, bad_mode = parse_job_request({"oldSchema": "int", "newSchema": "long", "mode": "sideways"})
+    assert [err.issueType for err in bad_priority] == ["INVALID_REQUEST_BODY"]
+    assert [err.issueType for err in bad_mode] == ["INVALID_MODE"]
+
+
+def test_transitive_job_reports_progress_and_per_pair_results() -> None:
+    VERDICT_CACHE.clear()
+    base, evolved = schema_pair("wide_record", variant=1, fields=200)
+    _, broken = schema_pair("wide_record", variant=2, fields=200)
+    manager = JobManager(workers=1)
+    job = manager.submit(JobRequest(kind="transitive", schemas=[base, evolved, broken], mode="backward"))
+
+    payload = _wait(job).as_dict()
+    manager.shutdown(timeout=5)
+
+    assert payload["status"] == SUCCEEDED
+    assert payload["progress"]["pairsDone"] == payload["progress"]["pairsTotal"] == 2
+    assert payload["progress"]["nodesVisited"] > 0
+    assert payload["compatible"] is False
+    assert all(pair["done"] and pair["totalErrors"] > 0 for pair in payload["pairs"])
+
+
+def test_priorities_order_queue_and_queued_jobs_cancel_immediately() -> None:
+    # No worker threads, so submissions stay queued until popped by hand.
+    manager = JobManager(workers=0, queue_limit=2)
+    low = manager.submit(JobRequest(kind="compare", schemas=["int", "long"], mode="backward", priority=9))
+    high = manager.submit(JobRequest(kind="compare", schemas=["int", "long"], mode="backward", priority=0))
+
+    with pytest.raises(JobQueueFull):
+        manager.submit(JobRequest(kind="compare", schemas=["int", "long"], mode="backward"))
+
+    assert manager._next_job() is high
+    assert manager.cancel(low.id).status == CANCELLED
+    assert manager._queue == []
+
+
+def test_running_job_stops_at_next_cancellation_check() -> None:
+    job = Job(id="job", request=JobRequest(kind="compare", schemas=["int", "int"], mode="backward"))
+    hook = ProgressHook(job)
+    job.cancel_requested.set()
+
+    with pytest.raises(JobCancelled):
+        for _ in range(CANCEL_CHECK_NODES):
+            hook.on_enter("Root", "int", "int")
+    assert job.nodes_visited == CANCEL_CHECK_NODES
+
+
+def test_invalid_schema_fails_job_and_finished_jobs_expire() -> None:
+    manager = JobManager(workers=1, ttl_seconds=0.05)
+    job = manager.submit(JobRequest(kind="compare", schemas=[{"type": "nope"}, "int"], mode="backward"))
+
+    _wait(job)
+    assert job.status == FAILED
+    assert job.as_dict()["error"]["issueType"] == "INVALID_AVRO_SCHEMA"
+
+    time.sleep(0.1)
+    assert manager.get(job.id) is None
+    manager.shutdown(timeout=5)
+
+
+def test_finished_jobs_release_memory_and_only_the_newest_are_kept() -> None:
+    budget = MemoryBudget(limit_bytes=1000)
+    manager = JobManager(workers=1, max_retained=2)
+    jobs = []
+    for _ in range(3):
+        reservation = budget.admit(100)
+        asyncio.run(reservation.__aenter__())
+        request = JobRequest(kind="compare", schemas=["int", "long"], mode="backward")
+        jobs.append(_wait(manager.submit(request, reservation)))
+
+    assert budget.in_use == 0
+    assert all(job.status == SUCCEEDED and job.request.schemas == [] for job in jobs)
+    assert jobs[0].as_dict()["pairs"][0]["done"] is True
+    assert manager.get(jobs[0].id) is None
+    assert manager.get(jobs[2].id) is jobs[2]
+    manager.shutdown(timeout=5)
+
+
+def test_shutdown_cancels_queued_jobs_and_releases_their_memory() -> None:
+    budget = MemoryBudget(limit_bytes=1000)
+    manager = JobManager(workers=0)
+    reservation = budget.admit(100)
+    asyncio.run(reservation.__aenter__())
+    job = manager.submit(JobRequest(kind="compare", schemas=["int", "long"], mode="backward"), reservation)
+
+    manager.shutdown(timeout=5)
+
+    assert job.status == CANCELLED and budget.in_use == 0 and manager._queue == []
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks.loadtest import main, percentile
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_in_process_run_writes_machine_readable_report(tmp_path: Path) -> None:
+    output = tmp_path / "report.json"
+
+    exit_code = main(
+        [
+            "--requests",
+            "12",
+            "--concurrency",
+            "3",
+            "--mix",
+            "recursive_types",
+            "--modes",
+            "backward,full",
+            "--scale",
+            "0.1",
+            "--output",
+            str(output),
+        ]
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert exit_code == 0
+    assert report["requests"] == 12
+    assert report["error_rate"] == 0.0
+    assert set(report["cases"]) == {"recursive_types/backward", "recursive_types/full"}
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(report["latency"])
+    assert report["server"]["includes_client"] is True
+
+
+def test_body_formats_are_run_and_summarized_separately(tmp_path: Path) -> None:
+    output = tmp_path / "report.json"
+
+    main(
+        [
+            "--requests",
+            "6",
+            "--concurrency",
+            "2",
+            "--mix",
+            "recursive_types",
+            "--scale",
+            "0.1",
+            "--bodies",
+            "multipart,json,json-gzip",
+            "--output",
+            str(output),
+        ]
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert report["error_rate"] == 0.0
+    assert set(report["body_formats"]) == {"multipart", "json", "json-gzip"}
+    assert all(summary["requests"] == 6 for summary in report["body_formats"].values())
+    assert "recursive_types/backward/json-gzip" in report["cases"]
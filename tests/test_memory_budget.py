@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from schemaguard.memory_budget import (
+    BYTES_PER_NODE,
+    UPLOAD_AMPLIFICATION,
+    MemoryBudget,
+    MemoryBudgetExceeded,
+    estimate_request_bytes,
+)
+
+
+def test_estimate_grows_with_upload_size_and_node_count() -> None:
+    assert estimate_request_bytes(1000) == 1000 * UPLOAD_AMPLIFICATION
+    assert estimate_request_bytes(1000, 10) == 1000 * UPLOAD_AMPLIFICATION + 10 * BYTES_PER_NODE
+
+
+def test_request_larger_than_budget_is_rejected_immediately() -> None:
+    budget = MemoryBudget(limit_bytes=100, queue_seconds=10)
+
+    async def scenario() -> None:
+        async with budget.admit(101):
+            pass
+
+    with pytest.raises(MemoryBudgetExceeded):
+        asyncio.run(scenario())
+    assert budget.in_use == 0
+
+
+def test_queued_request_is_admitted_when_budget_frees_up() -> None:
+    budget = MemoryBudget(limit_bytes=100, queue_seconds=5)
+    order: list[str] = []
+
+    async def holder() -> None:
+        async with budget.admit(80):
+            order.append("first-admitted")
+            await asyncio.sleep(0.05)
+        order.append("first-released")
+
+    async def waiter() -> None:
+        await asyncio.sleep(0.01)
+        async with budget.admit(50):
+            order.append("second-admitted")
+
+    async def scenario() -> None:
+        await asyncio.gather(holder(), waiter())
+
+    asyncio.run(scenario())
+
+    assert order == ["first-admitted", "first-released", "second-admitted"]
+    assert budget.in_use == 0
+
+
+def test_resize_past_budget_times_out_and_releases_reservation() -> None:
+    budget = MemoryBudget(limit_bytes=100, queue_seconds=0.05)
+
+    async def scenario() -> None:
+        async with budget.admit(40):
+            async with budget.admit(40) as reservation:
+                await reservation.resize(70)
+
+    with pytest.raises(MemoryBudgetExceeded):
+        asyncio.run(scenario())
+    assert budget.in_use == 0
+
+
+def test_concurrent_growers_queue_instead_of_blocking_each_other() -> None:
+    budget = MemoryBudget(limit_bytes=100, queue_seconds=2)
+    grown: list[int] = []
+
+    async def request() -> None:
+        async with budget.admit(40) as reservation:
+            await asyncio.sleep(0.01)
+            await reservation.resize(70)
+            grown.append(reservation.held)
+            await asyncio.sleep(0.01)
+
+    async def scenario() -> None:
+        await asyncio.gather(request(), request())
+
+    asyncio.run(scenario())
+
+    assert grown == [70, 70]
+    assert budget.in_use == 0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.synthetic import schema_pair
+from schemaguard import parallel
+from schemaguard.compatibility_engine import check_compatibility, compile_registries
+
+
+def _run_in_process(old_registry, new_registry, shards):
+    errors = []
+    for shard in shards:
+        engine = parallel._engine(shard.direction, old_registry, new_registry)
+        errors.extend(engine.run_shard(shard.fields, shard.branches))
+    return errors
+
+
+@pytest.mark.parametrize(
+    ("case", "size"),
+    [("wide_record", {"fields": 400}), ("large_union", {"branches": 150}), ("recursive_types", {"width": 6})],
+)
+@pytest.mark.parametrize("mode", ["backward", "forward", "full"])
+def test_shards_reproduce_sequential_issues_in_order(monkeypatch, case, size, mode) -> None:
+    monkeypatch.setattr(parallel, "SHARD_MIN_UNITS", 1)
+    old_schema, new_schema = schema_pair(case, variant=2, **size)
+    old_registry, new_registry = compile_registries(old_schema, new_schema)
+
+    shards = parallel.plan_shards(old_registry, new_registry, mode, workers=3)
+
+    assert shards is not None and len(shards) > 1
+    expected = check_compatibility(old_schema, new_schema, mode)
+    assert _run_in_process(old_registry, new_registry, shards) == expected
+
+
+def test_large_union_field_is_split_by_branch_range(monkeypatch) -> None:
+    monkeypatch.setattr(parallel, "SHARD_MIN_UNITS", 1)
+    old_registry, new_registry = compile_registries(*schema_pair("large_union", variant=2, branches=200))
+
+    shards = parallel.plan_shards(old_registry, new_registry, "backward", workers=2)
+
+    branch_ranges = [shard.branches for shard in shards if shard.branches is not None]
+    assert branch_ranges[0][0] == 0
+    assert branch_ranges[-1][1] == 201  # "null" plus 200 records
+    assert all(low < high for low, high in branch_ranges)
+
+
+def test_small_comparisons_are_not_sharded() -> None:
+    old_registry, new_registry = compile_registries(*schema_pair("wide_record", variant=2, fields=50))
+
+    assert parallel.plan_shards(old_registry, new_registry, "full", workers=4) is None
+    assert parallel.check_compatibility_sharded(old_registry, new_registry, "full", workers=4) is None
+
+
+def test_process_pool_matches_sequential(monkeypatch) -> None:
+    monkeypatch.setattr(parallel, "SHARD_MIN_UNITS", 1)
+    old_schema, new_schema = schema_pair("wide_record", variant=2, fields=300)
+
+    expected = check_compatibility(old_schema, new_schema, "full")
+
+    assert check_compatibility(old_schema, new_schema, "full", workers=2) == expected
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import fastavro
+
+from schemaguard.cli import EXIT_COMPATIBLE, EXIT_INCOMPATIBLE, main
+from schemaguard.replay import ReplayChunk, init_worker, replay, replay_chunk
+
+
+OLD_SCHEMA = {
+    "type": "record",
+    "name": "User",
+    "namespace": "acme",
+    "fields": [
+        {"name": "id", "type": "int"},
+        {
+            "name": "address",
+            "type": {
+                "type": "record",
+                "name": "Address",
+                "fields": [
+                    {"name": "zip", "type": "string"},
+                    {"name": "kind", "type": {"type": "enum", "name": "Kind", "symbols": ["HOME", "WORK", "OTHER"]}},
+                ],
+            },
+        },
+    ],
+}
+NEW_SCHEMA = json.loads(json.dumps(OLD_SCHEMA).replace('["HOME", "WORK", "OTHER"]', '["HOME"]'))
+NEW_SCHEMA["fields"][0]["type"] = "long"
+
+
+def test_generated_records_map_failures_to_engine_paths() -> None:
+    report = replay(OLD_SCHEMA, NEW_SCHEMA, "full", samples=200, chunk_records=64)
+
+    failures = {(item.path, item.readerType) for item in report.issues}
+    assert failures == {("User.address.kind", "new"), ("User.id", "old")}
+    assert report.records == 400
+    assert report.sources == {"backward:generated": 200, "forward:generated": 200}
+    assert report.as_dict()["recordsPerSecond"] > 0
+
+
+def test_compatible_pair_replays_cleanly_and_is_reproducible() -> None:
+    first = replay(OLD_SCHEMA, OLD_SCHEMA, "full", samples=50, seed=7)
+    second = replay(OLD_SCHEMA, NEW_SCHEMA, "backward", samples=50, seed=7)
+    again = replay(OLD_SCHEMA, NEW_SCHEMA, "backward", samples=50, seed=7)
+
+    assert first.issues == [] and first.failures == 0
+    assert second.failures == again.failures > 0
+
+
+def test_container_files_are_streamed_in_chunks_up_to_the_record_limit(tmp_path: Path) -> None:
+    parsed = fastavro.parse_schema(OLD_SCHEMA)
+    records = [{"id": index, "address": {"zip": str(index), "kind": "WORK"}} for index in range(1000)]
+    data = tmp_path / "users.avro"
+    with data.open("wb") as handle:
+        fastavro.writer(handle, parsed, records, codec="deflate", sync_interval=2048)
+
+    report = replay(OLD_SCHEMA, NEW_SCHEMA, "backward", data_files=[str(data)], max_records=700, chunk_records=128)
+
+    assert report.records == 700
+    assert report.failures == 700
+    assert [item.path for item in report.issues] == ["User.address.kind"]
+    assert "700 of 700" in report.issues[0].description
+
+
+def test_cli_replay_reports_throughput(tmp_path: Path, capsys) -> None:
+    old_path = tmp_path / "old.avsc"
+    new_path = tmp_path / "new.avsc"
+    old_path.write_text(json.dumps(OLD_SCHEMA), encoding="utf-8")
+    new_path.write_text(json.dumps(NEW_SCHEMA), encoding="utf-8")
+
+    assert main(["replay", str(old_path), str(old_path), "--samples", "20"]) == EXIT_COMPATIBLE
+    capsys.readouterr()
+    assert main(["replay", str(old_path), str(new_path), "--samples", "20"]) == EXIT_INCOMPATIBLE
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["errors"][0]["issueType"] == "REPLAY_DECODE_FAILED"
+    assert payload["replay"]["records"] == 20
+
+
+def test_corrupt_records_are_reported_and_the_global_rng_is_left_alone() -> None:
+    init_worker(json.dumps({"old": OLD_SCHEMA, "new": NEW_SCHEMA}).encode("utf-8"))
+    # id=1, then a string length far past the end of the payload.
+    chunk = ReplayChunk("backward", "data.avro", "old", "new", first=0, count=3, payload=b"\x02\xfe\xff\xff\xff\x0f")
+
+    result = replay_chunk(chunk)
+
+    assert result.records == 1
+    assert [(index, path) for index, path, _ in result.failures] == [(0, "User")]
+    assert "undecodable with the writer schema" in result.failures[0][2]
+
+    random.seed(7)
+    expected = [random.random() for _ in range(3)]
+    random.seed(7)
+    replay(OLD_SCHEMA, NEW_SCHEMA, "full", samples=20, workers=0)
+    assert [random.random() for _ in range(3)] == expected
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+
+from schemaguard.reporter import NDJSON_LINES_PER_CHUNK, build_report, issue, iter_report_ndjson
+
+
+def _issues(count: int) -> list:
+    return [
+        issue(path=f"User.f{i}", issue_type="TYPE_MISMATCH", writer_type="int", reader_type="string", description="x")
+        for i in range(count)
+    ]
+
+
+def test_ndjson_stream_matches_json_report() -> None:
+    errors = _issues(NDJSON_LINES_PER_CHUNK + 3)
+
+    chunks = list(iter_report_ndjson(errors, {"explain": []}))
+    lines = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+
+    assert len(chunks) == 3
+    assert lines[0] == {"compatible": False, "totalErrors": len(errors), "explain": []}
+    assert lines[1:] == build_report(errors)["errors"]
+
+
+def test_ndjson_stream_for_compatible_report_is_header_only() -> None:
+    lines = b"".join(iter_report_ndjson([])).decode("utf-8").splitlines()
+
+    assert [json.loads(line) for line in lines] == [{"compatible": True, "totalErrors": 0}]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from schemaguard.cli import EXIT_COMPATIBLE, main
+from schemaguard.compatibility_engine import SchemaRegistry, check_compatibility
+from schemaguard.resolution_plan import PLAN_VERSION, build_resolution_plan
+
+
+WRITER = {
+    "type": "record",
+    "name": "User",
+    "namespace": "acme",
+    "fields": [
+        {"name": "id", "type": "int"},
+        {"name": "legacy", "type": "string"},
+        {"name": "contact", "type": ["null", "string", "long"]},
+        {"name": "kind", "type": {"type": "enum", "name": "Kind", "symbols": ["A", "B"]}},
+        {"name": "next", "type": ["null", "User"]},
+    ],
+}
+READER = {
+    "type": "record",
+    "name": "User",
+    "namespace": "acme",
+    "fields": [
+        {"name": "kind", "type": {"type": "enum", "name": "Kind", "symbols": ["B", "A", "C"], "default": "C"}},
+        {"name": "id", "type": "long"},
+        {"name": "contact", "type": ["long", "null", "string"]},
+        {"name": "next", "type": ["null", "User"]},
+        {"name": "score", "type": "double", "default": 0.5},
+    ],
+}
+
+
+def _plan(writer, reader, mode="backward"):
+    return build_resolution_plan(SchemaRegistry(writer), SchemaRegistry(reader), mode)
+
+
+def test_record_plan_maps_fields_skips_removed_ones_and_fills_defaults() -> None:
+    plan = _plan(WRITER, READER)
+    backward = plan["directions"]["backward"]
+    record = backward["records"]["acme.User=>acme.User"]
+
+    assert plan["planVersion"] == PLAN_VERSION
+    assert backward["compatible"] is True
+    assert backward["root"] == {"kind": "record", "plan": "acme.User=>acme.User"}
+    assert record["fieldMap"] == [1, -1, 2, 0, 3]
+    assert record["skip"] == [1]
+    assert record["defaults"] == [{"reader": 4, "name": "score", "value": 0.5}]
+    resolve = {entry["name"]: entry["resolve"] for entry in record["fields"]}
+    assert resolve["id"] == {"kind": "primitive", "type": "int", "promote": "long"}
+    assert resolve["contact"]["branches"] == [1, 2, 0]
+    assert resolve["kind"] == {"kind": "enum", "symbolMap": [1, 0], "default": 2}
+    # The recursive reference points back at the plan being built.
+    assert resolve["next"]["resolve"][1] == {"kind": "record", "plan": "acme.User=>acme.User"}
+
+
+def test_plan_compatibility_matches_the_engine_in_both_directions() -> None:
+    forward = _plan(WRITER, READER, "forward")["directions"]["forward"]
+    record = forward["records"]["acme.User=>acme.User"]
+
+    assert forward["compatible"] is False
+    assert check_compatibility(WRITER, READER, "forward")
+    assert record["missing"] == ["legacy"]
+    assert {"kind": "error", "writer": "long", "reader": "int"} in [entry["resolve"] for entry in record["fields"]]
+    assert _plan(WRITER, WRITER, "full")["directions"].keys() == {"backward", "forward"}
+
+
+def test_cli_compare_includes_plan_on_request(tmp_path: Path, capsys) -> None:
+    old_path = tmp_path / "old.avsc"
+    new_path = tmp_path / "new.avsc"
+    old_path.write_text(json.dumps(WRITER), encoding="utf-8")
+    new_path.write_text(json.dumps(READER), encoding="utf-8")
+
+    assert main(["compare", str(old_path), str(new_path)]) == EXIT_COMPATIBLE
+    assert "resolutionPlan" not in json.loads(capsys.readouterr().out)
+    assert main(["compare", str(old_path), str(new_path), "--plan"]) == EXIT_COMPATIBLE
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["resolutionPlan"]["directions"]["backward"]["compatible"] is True
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
+import json
+import sys
 from io import BytesIO
+from typing import AsyncIterator
 
+import pytest
 from starlette.datastructures import UploadFile
 
-from schemaguard.schema_loader import MAX_SCHEMA_BYTES, load_schema_upload
+from schemaguard.compatibility_engine import MAX_NESTING_DEPTH, SchemaRegistry, SchemaTooDeep
+from schemaguard.schema_loader import (
+    MAX_COMPARE_BODY_BYTES,
+    MAX_SCHEMA_BYTES,
+    load_compare_body,
+    load_schema_upload,
+    validate_avro_schema,
+)
 
 
 def _upload_file(content: bytes, filename: str = "schema.json") -> UploadFile:
     return UploadFile(filename=filename, file=BytesIO(content))
 
 
+async def _chunks(payload: bytes, size: int = 4096) -> AsyncIterator[bytes]:
+    for start in range(0, len(payload), size):
+        yield payload[start : start + size]
+
+
 def test_load_schema_upload_rejects_oversized_file() -> None:
     oversized_payload = b"{" + (b" " * MAX_SCHEMA_BYTES) + b"}"
     schema, errors = asyncio.run(load_schema_upload(_upload_file(oversized_payload), "OldSchema"))
@@ -26,3 +43,77 @@ def test_load_schema_upload_accepts_valid_small_json() -> None:
 
     assert errors == []
     assert schema == {"type": "string"}
+
+
+def test_load_compare_body_decodes_gzip_stream() -> None:
+    body = {"oldSchema": {"type": "string"}, "newSchema": {"type": "string"}, "mode": "full"}
+    payload = gzip.compress(json.dumps(body).encode("utf-8"))
+    parsed, errors = asyncio.run(load_compare_body(_chunks(payload, 7), "gzip"))
+
+    assert errors == []
+    assert parsed == body
+
+
+def test_load_compare_body_limits_decompressed_size() -> None:
+    # Compresses to a few KiB but expands well past the body limit.
+    bomb = gzip.compress(b'{"oldSchema":"' + b"a" * (MAX_COMPARE_BODY_BYTES * 4) + b'"}')
+    parsed, errors = asyncio.run(load_compare_body(_chunks(bomb), "gzip"))
+
+    assert parsed is None
+    assert [err.issueType for err in errors] == ["FILE_TOO_LARGE"]
+
+
+def test_load_compare_body_limits_each_schema() -> None:
+    # The whole body fits its 2 MiB limit, but one schema alone is over 1 MiB.
+    padded = {"type": "string", "doc": "x" * MAX_SCHEMA_BYTES}
+    body = json.dumps({"oldSchema": padded, "newSchema": "int", "mode": "full"}).encode("utf-8")
+    parsed, errors = asyncio.run(load_compare_body(_chunks(body)))
+
+    assert parsed is None
+    assert [(err.path, err.issueType) for err in errors] == [("OldSchema", "FILE_TOO_LARGE")]
+
+
+def test_load_compare_body_bounds_and_checks_zstd() -> None:
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor()
+    body = json.dumps({"oldSchema": "int", "newSchema": "long", "mode": "full"}).encode("utf-8")
+    # A few hundred bytes of RLE blocks that would expand to 64 MiB.
+    bomb = compressor.compress(b'{"oldSchema":"' + b"a" * (64 * MAX_SCHEMA_BYTES) + b'"}')
+
+    parsed, errors = asyncio.run(load_compare_body(_chunks(compressor.compress(body), 5), "zstd"))
+    _, too_large = asyncio.run(load_compare_body(_chunks(bomb), "zstd"))
+    _, truncated = asyncio.run(load_compare_body(_chunks(compressor.compress(body)[:-4]), "zstd"))
+
+    assert errors == [] and parsed["newSchema"] == "long"
+    assert len(bomb) < 4096
+    assert [err.issueType for err in too_large] == ["FILE_TOO_LARGE"]
+    assert [err.issueType for err in truncated] == ["INVALID_UPLOAD"]
+    assert "Truncated" in truncated[0].description
+
+
+def test_load_compare_body_rejects_bad_encodings_and_shapes() -> None:
+    _, unsupported = asyncio.run(load_compare_body(_chunks(b"{}"), "compress"))
+    _, corrupt = asyncio.run(load_compare_body(_chunks(b"not gzip"), "gzip"))
+    _, missing = asyncio.run(load_compare_body(_chunks(b'{"oldSchema": "int"}')))
+
+    assert [err.issueType for err in unsupported] == ["UNSUPPORTED_CONTENT_ENCODING"]
+    assert [err.issueType for err in corrupt] == ["INVALID_UPLOAD"]
+    assert [err.issueType for err in missing] == ["INVALID_REQUEST_BODY"]
+
+
+def test_load_schema_upload_rejects_nesting_beyond_the_fixed_limit() -> None:
+    limit = sys.getrecursionlimit()
+    payload = b'{"type":"array","items":' * 24000 + b'"int"' + b"}" * 24000
+
+    schema, errors = asyncio.run(load_schema_upload(_upload_file(payload), "OldSchema"))
+
+    assert schema is None
+    assert [error.issueType for error in errors] == ["INVALID_SCHEMA_JSON"]
+    assert str(MAX_NESTING_DEPTH) in errors[0].description
+    assert sys.getrecursionlimit() == limit
+    with pytest.raises(SchemaTooDeep):
+        SchemaRegistry(json.loads(b'{"type":"array","items":' * 6000 + b'"int"' + b"}" * 6000))
+    deep = {"type": "array", "items": "int"}
+    for _ in range(MAX_NESTING_DEPTH):
+        deep = {"type": "array", "items": deep}
+    assert [error.issueType for error in validate_avro_schema(deep, "OldSchema")] == ["SCHEMA_TOO_DEEP"]
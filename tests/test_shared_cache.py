@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from schemaguard import shared_cache
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE, VERDICT_VERSION, schema_fingerprint
+from schemaguard.reporter import issue
+from schemaguard.service import cached_verdict, compare_compiled, compile_schema
+from schemaguard.shared_cache import SharedCache
+
+
+OLD_SCHEMA = {"type": "record", "name": "Order", "fields": [{"name": "id", "type": "long"}]}
+NEW_SCHEMA = {"type": "record", "name": "Order", "fields": [{"name": "id", "type": "string"}]}
+
+
+@pytest.fixture
+def shared(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SharedCache:
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE", cache)
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+    return cache
+
+
+def test_verdicts_round_trip_through_sqlite(shared: SharedCache) -> None:
+    errors = [issue(path="Order.id", issue_type="TYPE_MISMATCH", writer_type="long", reader_type="string", description="x")]
+    shared.put_verdict(VERDICT_VERSION, "a", "b", "backward", errors)
+
+    assert shared.get_verdict(VERDICT_VERSION, "a", "b", "backward") == errors
+    assert shared.get_verdict(VERDICT_VERSION, "a", "b", "forward") is None
+    assert shared.get_verdict("0", "a", "b", "backward") is None
+
+
+def test_cold_worker_is_served_from_shared_tier(shared: SharedCache) -> None:
+    old_fp, new_fp = schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)
+    old_registry, _ = compile_schema(OLD_SCHEMA, "OldSchema", old_fp)
+    new_registry, _ = compile_schema(NEW_SCHEMA, "NewSchema", new_fp)
+    computed = compare_compiled(old_registry, new_registry, old_fingerprint=old_fp, new_fingerprint=new_fp, mode="full")
+
+    # A second worker starts with empty in-process caches.
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+    assert shared.has_schema(old_fp)
+    assert shared.get_schema(new_fp) == NEW_SCHEMA
+    assert cached_verdict(old_fp, new_fp, "full") == computed
+    assert VERDICT_CACHE.peek((old_fp, new_fp, "full")) == computed
+
+
+def test_prune_keeps_newest_entries(tmp_path: Path) -> None:
+    cache = SharedCache(str(tmp_path / "cache.sqlite3"), max_entries=3)
+    for index in range(5):
+        cache.put_verdict(VERDICT_VERSION, str(index), "new", "full", [])
+    cache.prune()
+
+    assert cache.get_verdict(VERDICT_VERSION, "0", "new", "full") is None
+    assert cache.get_verdict(VERDICT_VERSION, "4", "new", "full") == []
+
+
+def test_default_path_is_in_a_private_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = Path(shared_cache.default_cache_path(8000))
+
+    assert path.parent.parent == tmp_path and path.name == "cache-8000.sqlite3"
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+    # A directory someone else could write into is refused rather than used.
+    path.parent.chmod(0o777)
+    with pytest.raises(PermissionError):
+        shared_cache.default_cache_path(8000)
+
+
+def test_unusable_path_disables_the_tier_instead_of_raising(tmp_path: Path) -> None:
+    assert shared_cache.open_shared_cache(str(tmp_path / "missing" / "cache.sqlite3")) is None
+    assert isinstance(shared_cache.open_shared_cache(str(tmp_path / "cache.sqlite3")), SharedCache)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import marshal
+import zlib
+from pathlib import Path
+
+import pytest
+
+from schemaguard import service, snapshot
+from schemaguard.cache import SCHEMA_CACHE, VERDICT_CACHE, schema_fingerprint
+from schemaguard.cli import EXIT_COMPATIBLE, EXIT_INCOMPATIBLE, main
+from schemaguard.service import cached_verdict, compare_compiled, compile_schema
+
+
+OLD_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "long"}]}
+NEW_SCHEMA = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "int"}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> None:
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+
+def _compare_once() -> tuple[str, str, list]:
+    old_fp, new_fp = schema_fingerprint(OLD_SCHEMA), schema_fingerprint(NEW_SCHEMA)
+    old_registry, _ = compile_schema(OLD_SCHEMA, "OldSchema", old_fp)
+    new_registry, _ = compile_schema(NEW_SCHEMA, "NewSchema", new_fp)
+    errors = compare_compiled(
+        old_registry, new_registry, old_fingerprint=old_fp, new_fingerprint=new_fp, mode="backward"
+    )
+    return old_fp, new_fp, errors
+
+
+def test_snapshot_round_trip_restores_schemas_and_verdicts_without_validation(tmp_path: Path, monkeypatch) -> None:
+    old_fp, new_fp, errors = _compare_once()
+    path = tmp_path / "caches.sgs"
+    snapshot.write_snapshot(path)
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+    def fail_validation(*args, **kwargs):
+        raise AssertionError("snapshot schemas must not be validated again")
+
+    monkeypatch.setattr(service, "validate_avro_schema", fail_validation)
+    progress: list[tuple[str, int, int]] = []
+    report = snapshot.warm_caches([str(path)], progress=lambda *event: progress.append(event))
+
+    assert (report.schemas, report.verdicts, report.failed) == (2, 1, [])
+    assert progress[-1] == (str(path), 3, 3)
+    assert SCHEMA_CACHE.peek(old_fp).schema == OLD_SCHEMA
+    assert cached_verdict(old_fp, new_fp, "backward") == errors
+    assert compile_schema(NEW_SCHEMA, "NewSchema")[1] == []
+
+
+def test_bad_snapshots_are_reported_not_loaded(tmp_path: Path) -> None:
+    _compare_once()
+    data = snapshot.capture_snapshot()
+    truncated = tmp_path / "truncated.sgs"
+    truncated.write_bytes(data[:-10])
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode_snapshot(b"not a snapshot at all")
+    SCHEMA_CACHE.clear()
+    report = snapshot.warm_caches([str(truncated), str(tmp_path / "missing")])
+
+    assert report.schemas == 0
+    assert len(report.failed) == 2
+    assert len(SCHEMA_CACHE) == 0
+
+
+def test_malformed_entries_are_skipped_and_reported(tmp_path: Path) -> None:
+    old_fp, new_fp, errors = _compare_once()
+    payload = snapshot.decode_snapshot(snapshot.capture_snapshot())
+    payload["schemas"] += [["only-a-fingerprint"], "not-a-list", ["broken", {"type": "record", "name": "X", "fields": [7]}]]
+    payload["verdicts"] += [["a", "b", "full"], ["a", "b", "full", "not-rows"], ["a", "b", "full", [["x", "y"]]]]
+    header = snapshot._HEADER.pack(snapshot.SNAPSHOT_MAGIC, snapshot.SNAPSHOT_FORMAT, marshal.version)
+    path = tmp_path / "malformed.sgs"
+    path.write_bytes(header + zlib.compress(marshal.dumps(payload)))
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+
+    report = snapshot.warm_caches([str(path)])
+
+    assert (report.schemas, report.verdicts) == (2, 1)
+    assert [failure.split(": ")[1] for failure in report.failed] == [
+        "schemas[2]",
+        "schemas[3]",
+        "schemas[4]",
+        "verdicts[1]",
+        "verdicts[2]",
+        "verdicts[3]",
+    ]
+    assert cached_verdict(old_fp, new_fp, "backward") == errors
+
+
+def test_stale_verdict_version_keeps_schemas_only(monkeypatch) -> None:
+    _compare_once()
+    data = snapshot.capture_snapshot()
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+    monkeypatch.setattr(snapshot, "VERDICT_VERSION", "stale")
+
+    report = snapshot.WarmReport()
+    snapshot.load_snapshot(data, report, "memory")
+
+    assert (report.schemas, report.verdicts) == (2, 0)
+    assert len(VERDICT_CACHE) == 0
+
+
+def test_cli_builds_snapshot_from_directory_and_compare_warms_from_it(tmp_path: Path, capsys) -> None:
+    schemas = tmp_path / "schemas"
+    (schemas / "nested").mkdir(parents=True)
+    (schemas / "old.avsc").write_text(json.dumps(OLD_SCHEMA), encoding="utf-8")
+    (schemas / "nested" / "new.avsc").write_text(json.dumps(NEW_SCHEMA), encoding="utf-8")
+    (schemas / "broken.avsc").write_text("{", encoding="utf-8")
+    output = tmp_path / "caches.sgs"
+
+    assert main(["snapshot", str(output), "--warm-from", str(schemas)]) != EXIT_COMPATIBLE
+    built = json.loads(capsys.readouterr().out)
+    assert built["schemas"] == 2 and len(built["failed"]) == 1
+    assert output.read_bytes().startswith(snapshot.SNAPSHOT_MAGIC)
+
+    SCHEMA_CACHE.clear()
+    exit_code = main(
+        [
+            "compare",
+            str(schemas / "old.avsc"),
+            str(schemas / "nested" / "new.avsc"),
+            "--warm-from",
+            str(output),
+            "--snapshot-to",
+            str(output),
+        ]
+    )
+    captured = capsys.readouterr()
+    assert exit_code == EXIT_INCOMPATIBLE
+    assert "warmed 2 schemas" in captured.err
+
+    SCHEMA_CACHE.clear()
+    VERDICT_CACHE.clear()
+    assert snapshot.warm_caches([str(output)]).verdicts == 1
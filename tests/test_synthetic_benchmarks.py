@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from benchmarks.suite import Measurement, collect_benchmarks, find_regressions, scaled_sizes
+from benchmarks.synthetic import CASES, schema_pair
+from schemaguard.compatibility_engine import check_compatibility
+from schemaguard.schema_loader import validate_avro_schema
+
+
+def test_generators_are_deterministic_and_valid_avro() -> None:
+    for case in CASES:
+        first = schema_pair(case, variant=1, **scaled_sizes(case, 0.05))
+        second = schema_pair(case, variant=1, **scaled_sizes(case, 0.05))
+        assert first == second
+        assert validate_avro_schema(first[0], case) == []
+        assert validate_avro_schema(first[1], case) == []
+
+
+def test_recursive_types_compare_without_unbounded_recursion() -> None:
+    old_schema, new_schema = schema_pair("recursive_types", variant=2, width=4)
+
+    errors = check_compatibility(old_schema, new_schema, "backward")
+
+    assert [err.path for err in errors] == ["Node.attr0", "Node.attr2"]
+    assert check_compatibility(old_schema, old_schema, "full") == []
+
+
+def test_deep_nesting_beyond_default_recursion_limit() -> None:
+    old_schema, new_schema = schema_pair("deep_record", variant=2, depth=1500)
+
+    errors = check_compatibility(old_schema, new_schema, "backward")
+
+    assert len(errors) == 1
+    assert errors[0].path.endswith(".child.value")
+
+
+def test_regressions_are_flagged_only_beyond_threshold() -> None:
+    baseline = {"a": {"min_s": 1.0}, "b": {"min_s": 1.0}}
+    measurements = [Measurement("a", 1.2, 1.2, 1), Measurement("b", 1.3, 1.3, 1), Measurement("c", 9.0, 9.0, 1)]
+
+    regressions = find_regressions(measurements, baseline, threshold=0.25)
+
+    assert [(m.name, round(ratio, 2)) for m, ratio in regressions] == [("b", 1.3)]
+
+
+def test_suite_covers_every_case_and_operation_at_small_scale() -> None:
+    benchmarks = collect_benchmarks(scale=0.01)
+
+    names = {benchmark.name for benchmark in benchmarks}
+    assert len(names) == len(CASES) * 6
+    for benchmark in benchmarks:
+        benchmark.run()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import copy
+
+from benchmarks.memory import measure_fleet
+from benchmarks.synthetic import recursive_types, shared_type_fleet
+from schemaguard.compatibility_engine import CompatibilityEngine, SchemaRegistry, check_compatibility
+from schemaguard.type_pool import NamedTypePool
+
+
+MONEY = {
+    "type": "record",
+    "name": "Money",
+    "namespace": "com.acme",
+    "fields": [{"name": "units", "type": "long"}, {"name": "currency", "type": "string"}],
+}
+
+
+def _subject(name: str, money: dict, extra: str = "int") -> dict:
+    return {
+        "type": "record",
+        "name": name,
+        "namespace": "com.acme",
+        "fields": [{"name": "id", "type": extra}, {"name": "amount", "type": copy.deepcopy(money)}],
+    }
+
+
+def _compare(pool: NamedTypePool, writer: dict, reader: dict, direction: str = "backward") -> list:
+    writer_registry = SchemaRegistry(pool.intern(copy.deepcopy(writer)), pool=pool)
+    reader_registry = SchemaRegistry(pool.intern(copy.deepcopy(reader)), pool=pool)
+    return CompatibilityEngine(
+        None, None, direction, writer_registry=writer_registry, reader_registry=reader_registry
+    ).run()
+
+
+def test_identical_named_types_are_shared_across_schemas() -> None:
+    pool = NamedTypePool()
+    first = pool.intern(_subject("Order", MONEY))
+    second = pool.intern(_subject("Refund", MONEY, extra="long"))
+
+    assert first["fields"][1]["type"] is second["fields"][1]["type"]
+    assert pool.lookup(first["fields"][1]["type"]).info.fullname == "com.acme.Money"
+    assert first == _subject("Order", MONEY)
+
+    # Same content under another namespace, or one extra field, is a different type.
+    moved = pool.intern(_subject("Order", {**MONEY, "namespace": "com.other"}))
+    revised = pool.intern(_subject("Order", {**MONEY, "fields": MONEY["fields"] + [{"name": "n", "type": "int"}]}))
+    assert moved["fields"][1]["type"] is not first["fields"][1]["type"]
+    assert revised["fields"][1]["type"] is not first["fields"][1]["type"]
+
+    registry = SchemaRegistry(first, pool=pool)
+    assert registry.node_name_info[id(first["fields"][1]["type"])] is pool.lookup(first["fields"][1]["type"]).info
+
+
+def test_pair_verdicts_are_reused_under_other_paths() -> None:
+    pool = NamedTypePool()
+    narrowed = {**MONEY, "fields": [{"name": "units", "type": "int"}, MONEY["fields"][1]]}
+
+    lookup = pool.verdicts.get
+    found: list[bool] = []
+
+    def get(key):
+        cached = lookup(key)
+        found.append(cached is not None)
+        return cached
+
+    pool.verdicts.get = get
+    first = _compare(pool, _subject("Order", MONEY), _subject("Order", narrowed))
+    second = _compare(pool, _subject("Refund", MONEY), _subject("Refund", narrowed))
+
+    # Root pair, then Money; the second schema's root is new but its Money pair is not.
+    assert found == [False, False, False, True]
+    assert [entry.path for entry in first] == ["Order.amount.units"]
+    assert [entry.path for entry in second] == ["Refund.amount.units"]
+    assert second == check_compatibility(_subject("Refund", MONEY), _subject("Refund", narrowed), "backward")
+
+
+def test_only_self_contained_types_share_verdicts() -> None:
+    pool = NamedTypePool()
+    holder = {
+        "type": "record",
+        "name": "Holder",
+        "fields": [
+            {"name": "code", "type": {"type": "enum", "name": "Code", "symbols": ["A", "B"]}},
+            {
+                "name": "wrapper",
+                "type": {"type": "record", "name": "Wrapper", "fields": [{"name": "c", "type": "Code"}]},
+            },
+        ],
+    }
+    interned = pool.intern(holder)
+
+    # Wrapper's meaning depends on whichever Code the enclosing schema defines.
+    assert pool.lookup(interned["fields"][1]["type"]).closed is False
+    assert pool.lookup(interned).closed is True
+    node = pool.intern(recursive_types(width=3))
+    assert pool.lookup(node).closed is True
+
+
+def test_pooled_results_match_unpooled_results() -> None:
+    pool = NamedTypePool()
+    for writer, reader in zip(shared_type_fleet(5), shared_type_fleet(5, variant=2)):
+        # Twice: the second run answers nested pairs from the pool.
+        for _ in range(2):
+            assert _compare(pool, writer, reader, "backward") == check_compatibility(writer, reader, "backward")
+            assert _compare(pool, reader, writer, "forward") == check_compatibility(writer, reader, "forward")
+    old, new = recursive_types(width=4), recursive_types(width=4, variant=2)
+    assert _compare(pool, old, new, "backward") == check_compatibility(old, new, "backward")
+
+
+def _mutually_recursive(x_type) -> dict:
+    # P and Q reference each other; R reaches Q both through P and directly.
+    inner = {
+        "type": "record",
+        "name": "Q",
+        "fields": [{"name": "p", "type": ["null", "P"]}, {"name": "x", "type": x_type}],
+    }
+    outer = {"type": "record", "name": "P", "fields": [{"name": "q", "type": inner}]}
+    return {"type": "record", "name": "R", "fields": [{"name": "a", "type": outer}, {"name": "b", "type": "Q"}]}
+
+
+def test_pooled_verdicts_are_not_replayed_inside_an_enclosing_pair() -> None:
+    pool = NamedTypePool()
+    old, new = _mutually_recursive(["int", "string"]), _mutually_recursive("int")
+    unpooled = CompatibilityEngine(
+        None,
+        None,
+        "backward",
+        writer_registry=SchemaRegistry(copy.deepcopy(old), pool=None),
+        reader_registry=SchemaRegistry(copy.deepcopy(new), pool=None),
+    ).run()
+
+    # Under R.b the pair Q is on the stack, so the P verdict stored under R.a does not apply.
+    for _ in range(2):
+        pooled = _compare(pool, old, new, "backward")
+        assert [entry.path for entry in pooled] == [entry.path for entry in unpooled] == ["R.a.q.x[1]", "R.b.x[1]"]
+        assert pooled == unpooled
+
+
+def test_memory_benchmark_shows_the_pool_shrinking_a_fleet() -> None:
+    plain = measure_fleet(20, pooled=False)
+    pooled = measure_fleet(20, pooled=True)
+
+    assert pooled.issues == plain.issues > 0
+    assert pooled.retained_bytes < plain.retained_bytes * 0.6
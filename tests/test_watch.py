@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from schemaguard import watch
+from schemaguard.watch import InotifyWatcher, PollingWatcher, WatchSession, collect_burst, format_diffs, run_watch
+
+
+USER = {"type": "record", "name": "User", "fields": [{"name": "id", "type": "long"}]}
+
+
+def _write(path: Path, schema: object, indent: int | None = None) -> None:
+    path.write_text(json.dumps(schema, indent=indent), encoding="utf-8")
+
+
+def test_session_reports_added_and_resolved_issues_per_changed_file(tmp_path: Path) -> None:
+    user = tmp_path / "user.avsc"
+    _write(user, USER)
+    (tmp_path / "nested").mkdir()
+    _write(tmp_path / "nested" / "other.avsc", "string")
+    session = WatchSession(tmp_path, "backward")
+
+    assert [diff.total for diff in session.start()] == [0, 0]
+    assert session.checks == 0
+
+    narrowed = {**USER, "fields": [{"name": "id", "type": "int"}]}
+    _write(user, narrowed)
+    [diff] = session.refresh({user})
+    assert diff.total == 1 and [entry.path for entry in diff.added] == ["User.id"] and diff.resolved == []
+
+    # Same canonical schema, different bytes: not checked again.
+    _write(user, narrowed, indent=2)
+    assert session.refresh({user}) == []
+    assert session.checks == 1
+
+    _write(user, USER)
+    [diff] = session.refresh({user})
+    assert diff.total == 0 and [entry.path for entry in diff.resolved] == ["User.id"]
+    assert "user.avsc: ok (+0 -1)" in format_diffs([diff], tmp_path, 0.001)
+
+    user.write_text("{", encoding="utf-8")
+    [diff] = session.refresh({user})
+    assert diff.added[0].issueType == "INVALID_SCHEMA_JSON"
+    user.unlink()
+    [diff] = session.refresh({user})
+    assert diff.removed and session.files[user].removed
+    assert session.refresh({user}) == []
+
+
+def test_recreated_file_is_checked_against_its_original_baseline(tmp_path: Path) -> None:
+    user = tmp_path / "user.avsc"
+    _write(user, USER)
+    session = WatchSession(tmp_path, "backward")
+    session.start()
+
+    # git checkout / stash, or an editor that deletes and writes in separate debounce windows.
+    user.unlink()
+    [diff] = session.refresh({user})
+    assert diff.removed
+    _write(user, {**USER, "fields": [{"name": "id", "type": "int"}]})
+    [diff] = session.refresh({user})
+
+    assert not diff.removed and diff.total == 1 and diff.added[0].path == "User.id"
+    assert "user.avsc: 1 issue (+1 -0)" in format_diffs([diff], tmp_path, 0.001)
+
+
+def test_against_directory_sets_the_baseline(tmp_path: Path) -> None:
+    (tmp_path / "main").mkdir()
+    (tmp_path / "work").mkdir()
+    _write(tmp_path / "main" / "user.avsc", USER)
+    _write(tmp_path / "work" / "user.avsc", {**USER, "fields": [{"name": "id", "type": "int"}]})
+
+    session = WatchSession(tmp_path / "work", "full", against=tmp_path / "main")
+    [diff] = session.start()
+
+    assert diff.total == 1 and diff.added[0].path == "User.id"
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+def test_watchers_see_writes_renames_and_new_directories(tmp_path: Path, kind: str) -> None:
+    if kind == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux-only")
+    user = tmp_path / "user.avsc"
+    _write(user, USER)
+    watcher = InotifyWatcher(tmp_path) if kind == "inotify" else PollingWatcher(tmp_path, interval=0.02)
+    try:
+        # Polling compares stats, so give the mtime a chance to move.
+        time.sleep(0.01)
+        _write(user, "string")
+        (tmp_path / "sub").mkdir()
+        staged = tmp_path / "sub" / "staged.tmp"
+        _write(staged, USER)
+        staged.rename(tmp_path / "sub" / "order.avsc")
+        changed = collect_burst(watcher, debounce=0.1)
+        if kind == "inotify":
+            _write(tmp_path / "sub" / "later.avsc", USER)
+            changed |= collect_burst(watcher, debounce=0.1)
+    finally:
+        watcher.close()
+
+    session = WatchSession(tmp_path, "backward")
+    expanded = {path.name for path in session._expand(changed)}
+    assert {"user.avsc", "order.avsc"} <= expanded
+    if kind == "inotify":
+        assert "later.avsc" in expanded
+
+
+def test_run_watch_prints_a_compact_diff_after_a_debounced_burst(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(watch, "WATCH_IDLE_SECONDS", 0.05)
+    user = tmp_path / "user.avsc"
+    _write(user, USER)
+    out = io.StringIO()
+    done = threading.Event()
+
+    def edit() -> None:
+        time.sleep(0.3)
+        for field_type in ("string", "int"):
+            _write(user, {**USER, "fields": [{"name": "id", "type": field_type}]})
+        deadline = time.monotonic() + 5
+        while "issue" not in out.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        done.set()
+
+    editor = threading.Thread(target=edit)
+    editor.start()
+    session = run_watch(
+        tmp_path, "backward", debounce=0.1, polling=True, poll_interval=0.02, out=out, should_stop=done.is_set
+    )
+    editor.join()
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith(f"watching {tmp_path} (1 schemas, backward, polling")
+    assert any("user.avsc: 1 issue (+1 -0)" in line for line in lines)
+    # The burst was debounced into one check of the final content.
+    assert session.checks == 1